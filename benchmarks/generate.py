@@ -0,0 +1,131 @@
+import argparse
+import os
+
+import numpy as np
+
+from engine.constants import MAKS_POIN_DEFAULT, SHEET_FREK_ALAT, SHEET_REFERENSI
+
+# Judul peraturan di baris pertama setiap sheet, seperti workbook asli
+JUDUL = ("PERATURAN MENTERI KOMUNIKASI DAN INFORMATIKA\n"
+         "REPUBLIK INDONESIA NOMOR 9 TAHUN 2023")
+SUBJUDUL = "Penggunaan Spektrum Frekuensi Radio tanpa Perizinan Berusaha dan/atau persetujuan dari Menteri"
+
+# Header sheet FREK & ALAT (baris ke-6, sama dengan workbook asli)
+FREK_ALAT_HEADER = [
+    'DINAS', 'KATEGORI', 'BAND', 'ZONA', 'INDEKS PELANGGARAN PERTAMA', 'INDEKS PELANGGARAN BERULANG',
+    'JML BULAN', '%', 'JENIS IZIN', 'MAKS POIN', 'TOTAL POIN', 'TARIF DENDA', 'DENDA',
+    'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT', 'TOTAL TAGIHAN DENDA', 'SATUAN PELANGGARAN',
+]
+
+DINAS = ['Penyiaran', 'Tetap', 'Bergerak Darat (Private)', 'Bergerak Darat (Publik)',
+         'Satelit', 'Dinas Lainnya', 'Radio Amatir / KRAP']
+KATEGORI = ['TV', 'Radio', 'Microwave Link', 'BTS', 'VSAT', 'Konvensional', 'Trunking']
+BRACKETS = [('0-12', 0.33), ('13-24', 0.67), ('>25', 1.0)]
+JENIS_IZIN = list(MAKS_POIN_DEFAULT)
+ZONA_COUNT = 5
+
+# Ukuran standar suite benchmark
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+# Fungsi untuk membuat isi tabel FREK & ALAT sintetis (dictionary kolom -> array)
+def synthetic_frek_alat(rows, seed=0):
+    """
+    Setiap kombinasi (JENIS IZIN, DINAS, KATEGORI, BAND, ZONA) unik per bracket
+    JML BULAN, sehingga pencarian tepat selalu mengembalikan satu baris per bracket.
+    Kolom turunan (TOTAL POIN, DENDA) dihitung dengan rumus yang sama seperti sheet asli.
+    """
+    rng = np.random.default_rng(seed)
+    i = np.arange(rows)
+
+    zona = i % ZONA_COUNT + 1
+    bracket = (i // ZONA_COUNT) % len(BRACKETS)
+    group = i // (ZONA_COUNT * len(BRACKETS))
+    jenis_izin = np.asarray(JENIS_IZIN, dtype=object)[group % len(JENIS_IZIN)]
+    band = group // len(JENIS_IZIN)
+
+    pertama = np.round(rng.uniform(0.05, 1.0, rows), 3)
+    persen = np.asarray([p for _, p in BRACKETS])[bracket]
+    maks_poin = np.asarray([MAKS_POIN_DEFAULT[j] for j in JENIS_IZIN])[group % len(JENIS_IZIN)]
+    tarif = np.full(rows, 100_000)
+    total_poin = pertama * persen * maks_poin
+
+    return {
+        'DINAS': np.asarray(DINAS, dtype=object)[band % len(DINAS)],
+        'KATEGORI': np.asarray(KATEGORI, dtype=object)[band % len(KATEGORI)],
+        'BAND': np.char.add('B', band.astype(str)).astype(object),
+        'ZONA': zona,
+        'INDEKS PELANGGARAN PERTAMA': pertama,
+        'INDEKS PELANGGARAN BERULANG': np.round(pertama * 1.5, 3),
+        'JML BULAN': np.asarray([b for b, _ in BRACKETS], dtype=object)[bracket],
+        '%': persen,
+        'JENIS IZIN': jenis_izin,
+        'MAKS POIN': maks_poin,
+        'TOTAL POIN': total_poin,
+        'TARIF DENDA': tarif,
+        'DENDA': total_poin * tarif,
+        'JUMLAH FREKUENSI': np.full(rows, None, dtype=object),
+        'JUMLAH PERANGKAT': np.full(rows, None, dtype=object),
+        'TOTAL TAGIHAN DENDA': np.zeros(rows, dtype=int),
+        'SATUAN PELANGGARAN': np.full(rows, 'Per 1 Frekuensi Radio', dtype=object),
+    }
+
+
+# Fungsi untuk menulis workbook sintetis dengan tata letak seperti Data/SIMULASI PERHITUNGAN DENDA data.xlsx
+def write_synthetic_workbook(path, rows, seed=0):
+    import xlsxwriter
+
+    columns = synthetic_frek_alat(rows, seed)
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        # Sheet FREK & ALAT: judul, baris kosong, sub judul, header di baris ke-6, lalu data
+        sheet = workbook.add_worksheet(SHEET_FREK_ALAT)
+        sheet.write(0, 0, JUDUL)
+        sheet.write(3, 0, SUBJUDUL)
+        sheet.write_row(5, 0, FREK_ALAT_HEADER)
+        values = [columns[name].tolist() for name in FREK_ALAT_HEADER]
+        for offset, row in enumerate(zip(*values)):
+            sheet.write_row(6 + offset, 0, row)
+
+        # Sheet Referensi: tabel indeks dan blok bracket JML BULAN / MAKS POIN di kolom H-O
+        ref = workbook.add_worksheet(SHEET_REFERENSI)
+        ref.write(2, 0, SUBJUDUL)
+        ref.write_row(4, 0, ['DINAS', 'KATEGORI', 'BAND', 'ZONA', 'INDEKS PELANGGARAN PERTAMA',
+                             'INDEKS PELANGGARAN BERULANG', 'SATUAN PELANGGARAN'])
+        for zona in range(1, ZONA_COUNT + 1):
+            row = [DINAS[0], KATEGORI[0], 'B0', zona, columns['INDEKS PELANGGARAN PERTAMA'][zona - 1],
+                   columns['INDEKS PELANGGARAN BERULANG'][zona - 1]]
+            if zona == 4:
+                row += [None, DINAS[0]] + [b for b, _ in BRACKETS] + [None] + JENIS_IZIN
+            elif zona == 5:
+                row += [None, DINAS[1]] + [p if p < 1 else 100 for _, p in BRACKETS] + [None] + \
+                       [MAKS_POIN_DEFAULT[j] for j in JENIS_IZIN]
+            ref.write_row(4 + zona, 0, row)
+    finally:
+        workbook.close()
+
+    return path
+
+
+# Fungsi untuk mengambil path workbook sintetis, membuatnya jika belum ada
+def synthetic_workbook(rows, data_dir, seed=0):
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{rows}_{seed}.xlsx")
+    if not os.path.exists(path):
+        write_synthetic_workbook(path, rows, seed)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat workbook FREK & ALAT/Referensi sintetis untuk benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for rows in args.sizes:
+        print(synthetic_workbook(rows, args.data_dir, args.seed))
+
+
+if __name__ == "__main__":
+    main()
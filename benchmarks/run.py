@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from engine import (
+    SHEET_FREK_ALAT, build_lookup_index, calculate_denda, filter_data, load_excel,
+    process_frek_alat_data, process_referensi_data, to_excel,
+)
+
+from .generate import DEFAULT_SIZES, synthetic_workbook
+
+# Batas rasio waktu terhadap hasil pembanding sebelum dianggap regresi
+DEFAULT_TOLERANCE = 1.25
+
+
+# Fungsi untuk mengukur waktu eksekusi func sebanyak repeat kali (detik)
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'repeat': repeat,
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+    }
+
+
+# Fungsi untuk mengukur latensi per panggilan untuk sekumpulan argumen (detik per panggilan)
+def measure_calls(func, arguments):
+    timings = []
+    for argument in arguments:
+        start = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - start)
+    return {
+        'repeat': len(timings),
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+        'p95_s': float(np.percentile(timings, 95)),
+    }
+
+
+# Fungsi untuk menjalankan seluruh benchmark untuk satu ukuran workbook
+def run_size(path, rows, repeat, lookups, seed=0):
+    # Workbook besar cukup dibaca sekali; ukuran kecil diulang agar hasil stabil
+    load_repeat = repeat if rows <= 100_000 else 1
+    results = {}
+
+    sheets = load_excel(path)
+    results['load_excel'] = measure(lambda: load_excel(path), load_repeat)
+    results['process_frek_alat_data'] = measure(lambda: process_frek_alat_data(sheets[SHEET_FREK_ALAT]), repeat)
+    results['process_referensi_data'] = measure(lambda: process_referensi_data(sheets), repeat)
+
+    frek_alat_df = process_frek_alat_data(sheets[SHEET_FREK_ALAT])
+    index = build_lookup_index(frek_alat_df)
+    results['build_lookup_index'] = measure(lambda: build_lookup_index(frek_alat_df), repeat)
+
+    # Filter tepat untuk baris acak (semua kunci terisi, seperti pilihan lengkap di sidebar)
+    rng = np.random.default_rng(seed)
+    sample = frek_alat_df.iloc[rng.integers(0, len(frek_alat_df), lookups)]
+    filters = [
+        {'JENIS IZIN': row['JENIS IZIN'], 'DINAS': row['DINAS'], 'KATEGORI': row['KATEGORI'],
+         'BAND': row['BAND'], 'ZONA': str(int(row['ZONA']))}
+        for _, row in sample.iterrows()
+    ]
+    results['filter_data'] = measure_calls(lambda f: filter_data(frek_alat_df, f, index), filters)
+    results['filter_data_scan'] = measure_calls(lambda f: filter_data(frek_alat_df, f), filters[:max(1, lookups // 10)])
+
+    persentase_data = process_referensi_data(sheets)
+    results['calculate_denda'] = measure_calls(
+        lambda row: calculate_denda(row, 3, 2, persentase_data['13-24'], "Pelanggaran Berulang"),
+        [row for _, row in sample.iterrows()],
+    )
+
+    results['to_excel'] = measure(lambda: to_excel(frek_alat_df), load_repeat)
+
+    return [{'benchmark': name, 'rows': rows, **timing} for name, timing in results.items()]
+
+
+# Fungsi untuk membandingkan hasil dengan file JSON sebelumnya; mengembalikan daftar regresi
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    previous = {(item['benchmark'], item['rows']): item['median_s'] for item in baseline['results']}
+    regressions = []
+    for item in results:
+        before = previous.get((item['benchmark'], item['rows']))
+        if before and item['median_s'] > before * tolerance:
+            regressions.append({**item, 'baseline_median_s': before, 'ratio': item['median_s'] / before})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pemuatan, pencarian, perhitungan dan ekspor denda.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    parser.add_argument("--output", default=None, help="File JSON hasil (default benchmarks/results/<waktu>.json)")
+    parser.add_argument("--compare", default=None, help="File JSON hasil sebelumnya sebagai pembanding")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    created = datetime.now(timezone.utc)
+    results = []
+    for rows in args.sizes:
+        path = synthetic_workbook(rows, args.data_dir, args.seed)
+        for item in run_size(path, rows, args.repeat, args.lookups, args.seed):
+            print(f"{item['benchmark']:<24} {rows:>9} rows  median {item['median_s'] * 1000:12.3f} ms")
+            results.append(item)
+
+    report = {
+        'created': created.isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+
+    output = args.output or os.path.join("benchmarks", "results", created.strftime("%Y%m%dT%H%M%SZ") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan di {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for item in regressions:
+            print(f"REGRESI {item['benchmark']} ({item['rows']} rows): "
+                  f"{item['baseline_median_s'] * 1000:.3f} ms -> {item['median_s'] * 1000:.3f} ms "
+                  f"(x{item['ratio']:.2f})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
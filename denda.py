@@ -1,13 +1,20 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from io import BytesIO
 import os
-import glob
-import openpyxl
-import xlsxwriter
+import json
+from engine import (
+    MAKS_POIN_DEFAULT, JENIS_PELANGGARAN, CASE_COLUMNS, STATUS_COLUMN, STATUS_OK,
+    find_excel_files, TariffWatcher, get_percentage,
+    get_maks_poin, filter_data, facet_options,
+    calculate_denda, lookup_denda, price_cases, sweep_denda, sweep_matrix, sweep_frame, read_cases, to_csv, to_excel,
+    excel_available, stage, start_collecting, flush_metrics,
+    chart_key, component_bar_json, proportion_pie_json, sankey_json,
+    EXPOSURE_DIMENSIONS, exposure_report, exposure_summary,
+    ingest_folder, query_catalog, catalog_sources,
+    validation_summary,
+    MAX_INVOICE_ROWS, price_selection, invoice_labels, invoice_subtotals, invoice_total,
+    invoice_chart_key, invoice_bar_json, invoice_pie_json,
+)
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -113,306 +120,50 @@ st.markdown("""
 # Judul aplikasi
 st.markdown("<div class='main-header'>Aplikasi Simulasi Perhitungan Denda Pelanggaran Frekuensi Radio & Perangkat Telekomunikasi</div>", unsafe_allow_html=True)
 
-# Konstanta untuk nilai maksimum poin berdasarkan jenis izin
-MAKS_POIN_DEFAULT = {
-    "IPFR": 600000,
-    "ISR": 7000,
-    "APT": 5000
-}
-
-# Fungsi untuk menemukan semua file Excel dalam folder Data
-def find_excel_files(data_folder="Data"):
-    # Pastikan folder Data ada
-    if not os.path.exists(data_folder):
-        try:
-            os.makedirs(data_folder)
-            st.info(f"Folder {data_folder} telah dibuat. Silakan tambahkan file Excel ke folder tersebut.")
-            return []
-        except Exception as e:
-            st.error(f"Error saat membuat folder {data_folder}: {e}")
-            return []
-    
-    # Cari semua file Excel dalam folder Data
-    excel_files = glob.glob(os.path.join(data_folder, "*.xlsx")) + glob.glob(os.path.join(data_folder, "*.xls"))
-    
-    return excel_files
-
-# Fungsi untuk membaca file Excel
-@st.cache_data
-def load_excel(file_path):
-    try:
-        # Baca data dari file Excel
-        excel_data = pd.ExcelFile(file_path)
-        
-        # Buat dictionary untuk menyimpan semua sheet
-        sheets = {}
-        
-        # Baca setiap sheet
-        for sheet_name in excel_data.sheet_names:
-            sheets[sheet_name] = pd.read_excel(excel_data, sheet_name=sheet_name)
-            
-        return sheets, True
-    except Exception as e:
-        st.error(f"Error saat membaca file Excel {os.path.basename(file_path)}: {e}")
-        return None, False
-
-# Fungsi untuk menemukan header berdasarkan nilai tertentu dalam dataframe
-def find_header_row(df, header_values):
-    for i, row in df.iterrows():
-        # Periksa jika semua nilai yang dicari ada dalam baris saat ini
-        if all(value in row.values for value in header_values):
-            return i
-    return None
-
-# Fungsi untuk memproses data dari sheet FREK & ALAT
-def process_frek_alat_data(df):
-    # Cari baris header
-    header_values = ["DINAS", "KATEGORI", "BAND"]
-    header_row = find_header_row(df, header_values)
-    
-    if header_row is None:
-        st.error("Tidak dapat menemukan baris header di sheet FREK & ALAT")
-        return None
-    
-    # Reset header dengan baris yang ditemukan
-    header = df.iloc[header_row]
-    processed_df = df.iloc[header_row+1:].reset_index(drop=True)
-    processed_df.columns = header.values
-    
-    # Filter kolom yang tidak diinginkan (NaN atau unnamed)
-    valid_columns = [col for col in processed_df.columns if not (pd.isna(col) or 'Unnamed' in str(col))]
-    processed_df = processed_df[valid_columns]
-    
-    # Konversi kolom numerik
-    numeric_cols = ['ZONA', 'MAKS POIN', 'INDEKS PELANGGARAN PERTAMA', 'INDEKS PELANGGARAN BERULANG',
-                    '%', 'TOTAL POIN', 'TARIF DENDA', 'DENDA', 
-                    'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT']
-    
-    for col in numeric_cols:
-        if col in processed_df.columns:
-            processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')
-    
-    # Pastikan kolom JENIS IZIN ada
-    if 'JENIS IZIN' not in processed_df.columns:
-        st.warning("Kolom JENIS IZIN tidak ditemukan. Aplikasi akan mencoba menggunakan nilai default.")
-    else:
-        # Normalisasi nilai JENIS IZIN (uppercase dan strip whitespace)
-        processed_df['JENIS IZIN'] = processed_df['JENIS IZIN'].astype(str).str.strip().str.upper()
-    
-    return processed_df
+# Satu thread pemantau folder Data per proses: workbook baru/berubah diparsing di latar belakang
+# dan store tarifnya dipakai bersama oleh semua sesi. Sesi hanya menyimpan (path, versi).
+@st.cache_resource
+def get_tariff_watcher():
+    return TariffWatcher("Data").start()
 
-# Fungsi untuk memproses data dari sheet Referensi untuk mendapatkan faktor persentase
-def process_referensi_data(sheets):
-    try:
-        # Default persentase data
-        persentase_data = {"0-12": 1.0, "13-24": 0.5, ">25": 0.25}
-        
-        # Sheet Referensi (jika ada)
-        if 'Referensi' in sheets:
-            ref_df = sheets['Referensi']
-            
-            # Cari baris dengan nilai "0-12", "13-24", ">25"
-            period_values = ["0-12", "13-24", ">25"]
-            
-            for i, row in ref_df.iterrows():
-                row_str = [str(val).strip() if not pd.isna(val) else "" for val in row.values]
-                row_str = " ".join(row_str).lower()
-                
-                # Cek jika baris ini mengandung referensi ke periode
-                if any(period.lower() in row_str for period in period_values):
-                    row_values = [str(val).strip() if not pd.isna(val) else "" for val in row.values]
-                    
-                    # Temukan indeks kolom untuk periode
-                    period_indices = {}
-                    for j, value in enumerate(row_values):
-                        for period in period_values:
-                            if period == value:
-                                period_indices[period] = j
-                    
-                    # Jika periode ditemukan dan baris berikutnya tersedia
-                    if period_indices and i+1 < ref_df.shape[0]:
-                        next_row = ref_df.iloc[i+1]
-                        
-                        # Ambil nilai persentase dari baris berikutnya
-                        for period, idx in period_indices.items():
-                            try:
-                                percentage = next_row.iloc[idx]
-                                if isinstance(percentage, (int, float)):
-                                    # Normalisasi persentase
-                                    if percentage > 1:
-                                        percentage = percentage / 100
-                                    persentase_data[period] = percentage
-                                elif isinstance(percentage, str) and percentage.replace('.', '', 1).replace(',', '', 1).isdigit():
-                                    # Konversi string ke float
-                                    percentage = float(percentage.replace(',', '.'))
-                                    if percentage > 1:
-                                        percentage = percentage / 100
-                                    persentase_data[period] = percentage
-                            except:
-                                pass
-        
-        return persentase_data
-    
-    except Exception as e:
-        st.error(f"Error saat memproses data referensi: {e}")
-        return {"0-12": 1.0, "13-24": 0.5, ">25": 0.25}
-
-# Fungsi untuk mendapatkan persentase berdasarkan JML BULAN
-def get_percentage(persentase_data, jml_bulan):
-    # Default persentase
-    default_percentage = 1.0
-    
-    # Cek jika JML BULAN ada dalam data persentase
-    if isinstance(persentase_data, dict) and jml_bulan in persentase_data:
-        return persentase_data[jml_bulan]
-    
-    return default_percentage
+tariff_watcher = get_tariff_watcher()
 
-# Fungsi untuk memfilter data berdasarkan kriteria
-def filter_data(df, filters):
-    # Pastikan df adalah DataFrame
-    if not isinstance(df, pd.DataFrame):
-        return pd.DataFrame()
-    
-    filtered_df = df.copy()
-    
-    # Terapkan filter
-    for column, value in filters.items():
-        if column in filtered_df.columns and value and value != "Semua":
-            if column == 'ZONA' and isinstance(value, str) and value != "Semua":
-                try:
-                    filtered_df = filtered_df[filtered_df[column] == int(value)]
-                except:
-                    pass
-            else:
-                filtered_df = filtered_df[filtered_df[column] == value]
-    
-    return filtered_df
-
-# Fungsi untuk mendapatkan MAKS POIN berdasarkan JENIS IZIN
-def get_maks_poin(jenis_izin):
-    jenis_izin = str(jenis_izin).strip().upper()
-    return MAKS_POIN_DEFAULT.get(jenis_izin, 0)
-
-# Fungsi untuk menghitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA
-def calculate_denda(row, jumlah_frekuensi, jumlah_perangkat, persentase=1.0, jenis_pelanggaran="Pelanggaran Pertama"):
-    """
-    Menghitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA berdasarkan rumus:
-    TOTAL POIN = INDEKS PELANGGARAN * % * MAKS POIN
-    DENDA = TOTAL POIN * TARIF DENDA
-    TOTAL TAGIHAN DENDA = DENDA * JUMLAH FREKUENSI * JUMLAH PERANGKAT
-    
-    Menggunakan MAKS POIN berdasarkan JENIS IZIN jika tersedia.
-    """
-    try:
-        # Ambil JENIS IZIN dan tetapkan MAKS POIN sesuai jenisnya
-        jenis_izin = str(row.get('JENIS IZIN', '')).strip().upper()
-        
-        # Default nilai dari konstanta berdasarkan JENIS IZIN
-        default_maks_poin = get_maks_poin(jenis_izin)
-        
-        # Gunakan MAKS POIN dari data jika tersedia, jika tidak gunakan default berdasarkan JENIS IZIN
-        maks_poin_data = 0 if pd.isna(row.get('MAKS POIN')) else float(row.get('MAKS POIN', 0))
-        maks_poin = default_maks_poin if maks_poin_data == 0 else maks_poin_data
-        
-        # Jika MAKS POIN masih 0, gunakan nilai 1 untuk menghindari division by zero
-        if maks_poin == 0:
-            maks_poin = 1
-        
-        # Ambil INDEKS PELANGGARAN berdasarkan jenis pelanggaran
-        if jenis_pelanggaran == "Pelanggaran Pertama":
-            indeks = 0 if pd.isna(row.get('INDEKS PELANGGARAN PERTAMA')) else float(row.get('INDEKS PELANGGARAN PERTAMA', 0))
-        else:  # Pelanggaran Berulang
-            indeks = 0 if pd.isna(row.get('INDEKS PELANGGARAN BERULANG')) else float(row.get('INDEKS PELANGGARAN BERULANG', 0))
-        
-        # Ambil persentase dari data jika tersedia, jika tidak gunakan parameter
-        percentage_data = 0 if pd.isna(row.get('%')) else float(row.get('%', 0))
-        if percentage_data > 1:  # Normalisasi jika di atas 1
-            percentage_data = percentage_data / 100
-        
-        percentage = percentage_data if percentage_data > 0 else persentase
-        
-        # Ambil TARIF DENDA
-        tarif_denda = 0 if pd.isna(row.get('TARIF DENDA')) else float(row.get('TARIF DENDA', 0))
-        
-        # Ambil nilai yang sudah ada jika tersedia
-        existing_total_poin = None if pd.isna(row.get('TOTAL POIN')) else float(row.get('TOTAL POIN', 0))
-        existing_denda = None if pd.isna(row.get('DENDA')) else float(row.get('DENDA', 0))
-        
-        # Hitung TOTAL POIN
-        if existing_total_poin is not None and existing_total_poin > 0:
-            total_poin = existing_total_poin
-        else:
-            total_poin = indeks * percentage * maks_poin
-        
-        # Hitung DENDA
-        if existing_denda is not None and existing_denda > 0:
-            denda = existing_denda
+# Laporan eksposur dihitung sekali per versi workbook dan pilihan dimensi, lalu dipakai bersama
+@st.cache_resource(max_entries=32)
+def get_exposure_report(file_path, fingerprint, dimensions, _store):
+    return exposure_report(_store.frek_alat_df, _store.persentase_data, list(dimensions), _store.unit_fines)
+
+# Katalog gabungan diperbarui sekali per kombinasi versi workbook yang dimuat pemantau, bukan setiap rerun
+@st.cache_resource(max_entries=1)
+def get_catalog(versions):
+    catalog_summary = ingest_folder()
+    return catalog_summary, catalog_sources()
+
+# Hasil pencarian katalog dipakai ulang selama versi workbook dan filter masih sama
+@st.cache_data(max_entries=64)
+def search_catalog(versions, filter_items):
+    return query_catalog(dict(filter_items))
+
+# Tombol download Excel: file baru dibuat saat diminta, dan jika gagal ditampilkan error (bukan file kosong)
+def excel_download_button(label, df, file_name, key):
+    if st.button(f"Siapkan {label}", key=f"{key}_prepare"):
+        with st.spinner('Menyiapkan file Excel...'):
+            excel_data, _ = to_excel(df)
+        if excel_data is None:
+            st.error("File Excel tidak dapat dibuat (lihat log aplikasi). Silakan gunakan download CSV.")
         else:
-            denda = total_poin * tarif_denda
-        
-        # Hitung TOTAL TAGIHAN DENDA
-        jumlah_frekuensi = 1 if jumlah_frekuensi <= 0 else jumlah_frekuensi
-        jumlah_perangkat = 1 if jumlah_perangkat <= 0 else jumlah_perangkat
-        
-        total_tagihan_denda = denda * jumlah_frekuensi * jumlah_perangkat
-        
-        # Return semua nilai untuk debugging dan visualisasi
-        return {
-            'indeks': indeks,
-            'persentase': percentage,
-            'maks_poin': maks_poin,
-            'total_poin': total_poin,
-            'tarif_denda': tarif_denda,
-            'denda': denda,
-            'total_tagihan_denda': total_tagihan_denda
-        }
-    
-    except Exception as e:
-        st.error(f"Error saat menghitung denda: {e}")
-        return {
-            'indeks': 0,
-            'persentase': 0,
-            'maks_poin': 0,
-            'total_poin': 0,
-            'tarif_denda': 0,
-            'denda': 0,
-            'total_tagihan_denda': 0
-        }
-
-# Fungsi untuk mengonversi dataframe ke CSV (alternatif Excel untuk menghindari dependensi xlsxwriter)
-def to_csv(df):
-    output = BytesIO()
-    df.to_csv(output, index=False)
-    output.seek(0)
-    return output.getvalue()
-
-# Coba fungsi untuk mengonversi dataframe ke Excel
-def to_excel(df):
-    try:
-        # Coba dengan openpyxl
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Hasil Perhitungan', index=False)
-        output.seek(0)
-        return output.getvalue(), True
-    except ImportError:
-        try:
-            # Jika openpyxl tidak ada, coba dengan xlsxwriter
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='Hasil Perhitungan', index=False)
-            output.seek(0)
-            return output.getvalue(), True
-        except ImportError:
-            # Jika kedua engine tidak ada, kembalikan None
-            return None, False
-        except Exception as e:
-            st.error(f"Error saat membuat file Excel: {e}")
-            return None, False
-    except Exception as e:
-        st.error(f"Error saat membuat file Excel: {e}")
-        return None, False
+            # on_click="ignore": mengunduh tidak memicu rerun, sehingga tombol tetap ada sampai file diambil
+            st.download_button(
+                label=label,
+                data=excel_data,
+                file_name=file_name,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key=key,
+                on_click="ignore"
+            )
+
+# Catat waktu dan memori setiap tahap pada rerun ini (ditampilkan di Debug Info)
+stage_records = start_collecting()
 
 # Temukan semua file Excel di folder Data
 excel_files = find_excel_files()
@@ -455,50 +206,80 @@ with st.container():
         
         # Tombol untuk memuat data
         if st.button("Muat Data"):
-            with st.spinner(f'Memproses file {selected_file}...'):
-                # Baca data Excel
-                sheets, success = load_excel(selected_file_path)
+            # Ambil store tarif yang sudah diparsing oleh pemantau (tidak ada parsing di sesi ini)
+            store = tariff_watcher.get(selected_file_path)
+            success = store is not None
+            if not success:
+                load_error = tariff_watcher.error(selected_file_path)
+                if load_error:
+                    st.error(f"Error saat membaca file Excel {selected_file}: {load_error}")
+                else:
+                    st.info(f"File {selected_file} sedang diproses di latar belakang. Silakan klik Muat Data lagi sebentar lagi.")
+            
+            if success:
+                frek_alat_df, persentase_data = store.frek_alat_df, store.persentase_data
+                st.success(f"File berhasil dimuat. Sheet yang tersedia: {', '.join(store.sheet_names)}")
                 
-                if success:
-                    st.success(f"File berhasil dimuat. Sheet yang tersedia: {', '.join(sheets.keys())}")
+                if 'FREK & ALAT' in store.sheet_names:
+                    if frek_alat_df is None:
+                        st.error("Tidak dapat menemukan baris header di sheet FREK & ALAT")
+                    elif 'JENIS IZIN' not in frek_alat_df.columns:
+                        st.warning("Kolom JENIS IZIN tidak ditemukan. Aplikasi akan mencoba menggunakan nilai default.")
                     
-                    # Proses data dari berbagai sheet
-                    frek_alat_df = None
-                    if 'FREK & ALAT' in sheets:
-                        frek_alat_df = process_frek_alat_data(sheets['FREK & ALAT'])
+                    if store.validation is not None and not store.validation.empty:
+                        st.warning(f"Ditemukan {len(store.validation)} masalah data pada "
+                                   f"{store.validation['BARIS'].nunique()} baris tarif. "
+                                   "Lihat bagian Validasi Data Tarif.")
+                
+                # Simpan hanya handle versi dalam session state; data tetap di store bersama
+                st.session_state['tariff_version'] = (store.file_path, store.version)
+                st.session_state['selected_file'] = selected_file
+                
+                # Tampilkan debug info jika diperlukan
+                with debug_expander:
+                    st.markdown("### Data Persentase:")
+                    st.write(persentase_data)
                     
-                    # Proses data persentase dari Referensi
-                    persentase_data = process_referensi_data(sheets)
+                    st.markdown("### MAKS POIN Default berdasarkan JENIS IZIN:")
+                    st.write(MAKS_POIN_DEFAULT)
                     
-                    # Simpan dataframes dalam session state agar bisa diakses di bagian lain aplikasi
-                    st.session_state['frek_alat_df'] = frek_alat_df
-                    st.session_state['persentase_data'] = persentase_data
-                    st.session_state['selected_file'] = selected_file
+                    if store.memory_report is not None:
+                        st.markdown("### Memori Tabel FREK & ALAT:")
+                        st.write(f"Sebelum: {store.memory_report['bytes_before']:,} byte, "
+                                 f"sesudah: {store.memory_report['bytes_after']:,} byte "
+                                 f"({store.memory_report['ratio']*100:.0f}%)")
+                        st.write(store.memory_report['dtypes'])
                     
-                    # Tampilkan debug info jika diperlukan
-                    with debug_expander:
-                        st.markdown("### Data Persentase:")
-                        st.write(persentase_data)
-                        
-                        st.markdown("### MAKS POIN Default berdasarkan JENIS IZIN:")
-                        st.write(MAKS_POIN_DEFAULT)
+                    if frek_alat_df is not None:
+                        st.markdown("### Data FREK & ALAT (5 baris pertama):")
+                        st.write(frek_alat_df.head())
                         
-                        if frek_alat_df is not None:
-                            st.markdown("### Data FREK & ALAT (5 baris pertama):")
-                            st.write(frek_alat_df.head())
-                            
-                            st.markdown("### Kolom yang Tersedia:")
-                            st.write(frek_alat_df.columns.tolist())
+                        st.markdown("### Kolom yang Tersedia:")
+                        st.write(frek_alat_df.columns.tolist())
     else:
         st.warning(f"""
         Tidak ada file Excel ditemukan di folder 'Data'. 
-        Silakan tambahkan file Excel ke folder tersebut dan mulai ulang aplikasi.
+        Silakan tambahkan file Excel ke folder tersebut; file baru akan dibaca otomatis.
         """)
 
 # Section perhitungan denda
-if 'frek_alat_df' in st.session_state and st.session_state['frek_alat_df'] is not None:
-    frek_alat_df = st.session_state['frek_alat_df']
-    persentase_data = st.session_state['persentase_data']
+store = None
+if 'tariff_version' in st.session_state:
+    loaded_path, loaded_version = st.session_state['tariff_version']
+    store = tariff_watcher.get(loaded_path)
+    if store is None:
+        st.error("Data yang dimuat tidak lagi tersedia, silakan muat ulang.")
+        del st.session_state['tariff_version']
+    elif store.version != loaded_version:
+        # Pemantau sudah memuat versi baru file ini; sesi langsung beralih ke versi terbaru
+        st.session_state['tariff_version'] = (store.file_path, store.version)
+        st.info(f"File {os.path.basename(loaded_path)} telah diperbarui. Data versi terbaru sekarang digunakan.")
+
+if store is not None and store.frek_alat_df is not None:
+    frek_alat_df = store.frek_alat_df
+    persentase_data = store.persentase_data
+    lookup_index = store.lookup_index
+    facet_tree = store.facet_tree
     selected_file = st.session_state.get('selected_file', 'Data')
     
     # Tampilkan informasi persentase
@@ -508,60 +289,60 @@ if 'frek_alat_df' in st.session_state and st.session_state['frek_alat_df'] is no
         st.markdown(f"- Periode {period}: {percentage*100:.0f}%", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
     
+    # Laporan validasi data tarif (disusun sekali saat workbook dimuat)
+    if store.validation is not None and not store.validation.empty:
+        validation_df = store.validation
+        validasi = st.expander(f"Validasi Data Tarif ({validation_df['BARIS'].nunique()} baris bermasalah)",
+                               expanded=False)
+        with validasi:
+            if (validation_df['TINGKAT'] == 'ERROR').any():
+                st.warning("Baris dengan tingkat ERROR akan menghasilkan denda yang salah. "
+                           "Perbaiki data di workbook lalu muat ulang.")
+            st.dataframe(validation_summary(validation_df))
+            st.dataframe(validation_df)
+            
+            st.download_button(
+                label="Download Laporan Validasi (CSV)",
+                data=lambda: to_csv(validation_df),
+                file_name=f"validasi_{os.path.splitext(selected_file)[0]}.csv",
+                mime="text/csv",
+                key="validation_csv_download"
+            )
+            if excel_available():
+                excel_download_button("Download Laporan Validasi (Excel)", validation_df,
+                                      f"validasi_{os.path.splitext(selected_file)[0]}.xlsx", "validation_excel_download")
+    
     # Sidebar untuk filter
     st.sidebar.markdown("<div class='subtitle'>Filter Data</div>", unsafe_allow_html=True)
     
+    # Pilihan filter dibaca dari pohon facet yang disiapkan saat data dimuat
     # Filter untuk JENIS IZIN (prioritaskan sebelum filter lainnya jika tersedia)
-    if 'JENIS IZIN' in frek_alat_df.columns:
-        jenis_izin_values = frek_alat_df['JENIS IZIN'].dropna().unique()
-        # Normalisasi nilai JENIS IZIN
-        normalized_jenis_izin = [str(val).strip().upper() for val in jenis_izin_values]
-        
-        # Tambahkan pilihan IPFR, ISR, APT jika belum ada
-        for key_izin in MAKS_POIN_DEFAULT.keys():
-            if key_izin not in normalized_jenis_izin:
-                normalized_jenis_izin.append(key_izin)
-        
-        unique_jenis_izin = ["Semua"] + sorted(normalized_jenis_izin)
-        selected_jenis_izin = st.sidebar.selectbox("JENIS IZIN", unique_jenis_izin)
-    else:
-        # Jika kolom JENIS IZIN tidak ada, buat dropdown manual
-        unique_jenis_izin = ["Semua"] + sorted(list(MAKS_POIN_DEFAULT.keys()))
-        selected_jenis_izin = st.sidebar.selectbox("JENIS IZIN", unique_jenis_izin)
+    selected_jenis_izin = st.sidebar.selectbox("JENIS IZIN", facet_options(facet_tree, 'JENIS IZIN'))
     
     # Filter untuk DINAS
-    unique_dinas = ["Semua"] + sorted(list(frek_alat_df['DINAS'].dropna().unique()))
-    selected_dinas = st.sidebar.selectbox("DINAS", unique_dinas)
+    selected_dinas = st.sidebar.selectbox("DINAS", facet_options(facet_tree, 'DINAS'))
     
     # Filter untuk KATEGORI
-    filtered_kategori_df = frek_alat_df
-    if selected_dinas != "Semua":
-        filtered_kategori_df = frek_alat_df[frek_alat_df['DINAS'] == selected_dinas]
-    
-    unique_kategori = ["Semua"] + sorted(list(filtered_kategori_df['KATEGORI'].dropna().unique()))
-    selected_kategori = st.sidebar.selectbox("KATEGORI", unique_kategori)
+    selected_kategori = st.sidebar.selectbox("KATEGORI", facet_options(facet_tree, 'KATEGORI', selected_dinas))
     
     # Filter untuk BAND
-    filtered_band_df = filtered_kategori_df
-    if selected_kategori != "Semua":
-        filtered_band_df = filtered_kategori_df[filtered_kategori_df['KATEGORI'] == selected_kategori]
-    
-    unique_band = ["Semua"] + sorted(list(filtered_band_df['BAND'].dropna().unique()))
-    selected_band = st.sidebar.selectbox("BAND", unique_band)
+    selected_band = st.sidebar.selectbox("BAND", facet_options(facet_tree, 'BAND', selected_dinas, selected_kategori))
     
     # Filter untuk ZONA
-    unique_zona = ["Semua"] + sorted(list(map(str, frek_alat_df['ZONA'].dropna().unique())))
-    selected_zona = st.sidebar.selectbox("ZONA", unique_zona)
+    selected_zona = st.sidebar.selectbox("ZONA", facet_options(facet_tree, 'ZONA', selected_dinas, selected_kategori, selected_band))
     
     # Filter untuk JML BULAN
     unique_jml_bulan = ["Semua"] + sorted(list(persentase_data.keys()))
     selected_jml_bulan = st.sidebar.selectbox("JML BULAN", unique_jml_bulan)
+    # Jumlah bulan keterlambatan (opsional); jika diisi, bracket dipilih otomatis dari angka ini
+    jumlah_bulan = st.sidebar.number_input("Jumlah Bulan (opsional)", min_value=0, value=None, step=1,
+                                           help="Isi jumlah bulan untuk memilih bracket JML BULAN secara otomatis")
     
     # Pilihan untuk jenis pelanggaran
     st.markdown("<div class='subtitle'>Jenis Pelanggaran</div>", unsafe_allow_html=True)
     jenis_pelanggaran = st.radio(
         "Pilih Jenis Pelanggaran:",
-        ["Pelanggaran Pertama", "Pelanggaran Berulang"],
+        JENIS_PELANGGARAN,
         horizontal=True
     )
     
@@ -575,25 +356,34 @@ if 'frek_alat_df' in st.session_state and st.session_state['frek_alat_df'] is no
     with col2:
         jumlah_perangkat = st.number_input("JUMLAH PERANGKAT", min_value=0, value=1, step=1)
     
+    # Siapkan filter berdasarkan input pengguna
+    filters = {
+        'DINAS': selected_dinas,
+        'KATEGORI': selected_kategori,
+        'BAND': selected_band,
+        'ZONA': selected_zona
+    }
+    
+    # Tambahkan JENIS IZIN ke filter jika tersedia dan dipilih
+    if 'JENIS IZIN' in frek_alat_df.columns and selected_jenis_izin != "Semua":
+        filters['JENIS IZIN'] = selected_jenis_izin
+    
+    # Dapatkan persentase berdasarkan JML BULAN
+    if jumlah_bulan is not None:
+        persentase = get_percentage(persentase_data, jumlah_bulan)
+    else:
+        persentase = get_percentage(persentase_data, selected_jml_bulan) if selected_jml_bulan != "Semua" else 1.0
+    
     # Tombol untuk menghitung denda
     if st.button("Hitung Denda"):
-        # Siapkan filter berdasarkan input pengguna
-        filters = {
-            'DINAS': selected_dinas,
-            'KATEGORI': selected_kategori,
-            'BAND': selected_band,
-            'ZONA': selected_zona
-        }
-        
-        # Tambahkan JENIS IZIN ke filter jika tersedia dan dipilih
-        if 'JENIS IZIN' in frek_alat_df.columns and selected_jenis_izin != "Semua":
-            filters['JENIS IZIN'] = selected_jenis_izin
-        
+        st.session_state.pop('hasil_denda', None)
+
         # Filter data FREK & ALAT
-        filtered_df = filter_data(frek_alat_df, filters)
+        filtered_df = filter_data(frek_alat_df, filters, lookup_index)
         
         # Jika tidak ada data yang sesuai filter tapi JENIS IZIN dipilih, buat data dummy
-        if filtered_df.empty and selected_jenis_izin != "Semua":
+        dummy_used = filtered_df.empty and selected_jenis_izin != "Semua"
+        if dummy_used:
             # Buat data dummy dengan JENIS IZIN yang dipilih
             dummy_data = {
                 'JENIS IZIN': selected_jenis_izin,
@@ -618,11 +408,11 @@ if 'frek_alat_df' in st.session_state and st.session_state['frek_alat_df'] is no
             """)
         
         if not filtered_df.empty:
-            # Dapatkan persentase berdasarkan JML BULAN
-            persentase = get_percentage(persentase_data, selected_jml_bulan) if selected_jml_bulan != "Semua" else 1.0
-            
             # Ambil data pertama dari hasil filter
             selected_data = filtered_df.iloc[0]
+            if len(filtered_df) > 1:
+                st.info(f"{len(filtered_df)} baris tarif cocok dengan filter; hanya baris pertama yang dihitung. "
+                        "Gunakan Faktur Gabungan untuk menghitung beberapa baris sekaligus.")
             
             # Tambahkan JENIS IZIN ke selected_data jika belum ada
             if 'JENIS IZIN' not in selected_data and selected_jenis_izin != "Semua":
@@ -639,244 +429,497 @@ if 'frek_alat_df' in st.session_state and st.session_state['frek_alat_df'] is no
             if 'INDEKS PELANGGARAN BERULANG' not in selected_data:
                 selected_data['INDEKS PELANGGARAN BERULANG'] = 1.5
             
-            # Hitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA
-            hasil_perhitungan = calculate_denda(
-                selected_data, 
-                jumlah_frekuensi, 
-                jumlah_perangkat, 
-                persentase,
-                jenis_pelanggaran
-            )
-            
-            # Debug info
-            with debug_expander:
-                st.markdown("### Data Terpilih:")
-                st.write(selected_data)
+            # Baris dari tabel tarif: ambil DENDA satuan yang sudah dihitung saat data dimuat
+            hasil_perhitungan = None
+            try:
+                if not dummy_used and store.unit_fines is not None:
+                    hasil_perhitungan = lookup_denda(
+                        store.unit_fines,
+                        selected_data.name,
+                        jumlah_frekuensi,
+                        jumlah_perangkat,
+                        persentase,
+                        jenis_pelanggaran
+                    )
+
+                # Hitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA
+                if hasil_perhitungan is None:
+                    hasil_perhitungan = calculate_denda(
+                        selected_data, 
+                        jumlah_frekuensi, 
+                        jumlah_perangkat, 
+                        persentase,
+                        jenis_pelanggaran
+                    )
+            except Exception as e:
+                st.error(f"Error saat menghitung denda: {e}")
+                hasil_perhitungan = None
+            
+            if hasil_perhitungan is not None:
+                # Debug info
+                with debug_expander:
+                    st.markdown("### Data Terpilih:")
+                    st.write(selected_data)
                 
-                st.markdown("### Hasil Perhitungan:")
-                st.write(hasil_perhitungan)
+                    st.markdown("### Hasil Perhitungan:")
+                    st.write(hasil_perhitungan)
                 
-                st.markdown("### Parameter Input:")
-                st.write(f"JENIS IZIN: {selected_data.get('JENIS IZIN', 'N/A')}")
-                st.write(f"Jenis Pelanggaran: {jenis_pelanggaran}")
-                st.write(f"Persentase JML BULAN: {persentase}")
-                st.write(f"Jumlah Frekuensi: {jumlah_frekuensi}")
-                st.write(f"Jumlah Perangkat: {jumlah_perangkat}")
-            
-            # Tampilkan hasil
-            st.markdown("<div class='subtitle'>Hasil Perhitungan Denda</div>", unsafe_allow_html=True)
-            
-            # Tampilkan informasi JENIS IZIN dan MAKS POIN
-            jenis_izin_info = f"""
-            <div class='jenis-izin-box'>
-                <p><strong>JENIS IZIN:</strong> {jenis_izin}</p>
-                <p><strong>MAKS POIN Default:</strong> {get_maks_poin(jenis_izin)}</p>
-                <p><strong>MAKS POIN yang digunakan:</strong> {hasil_perhitungan['maks_poin']}</p>
-                <p><strong>Jenis Pelanggaran:</strong> {jenis_pelanggaran}</p>
-            </div>
-            """
-            st.markdown(jenis_izin_info, unsafe_allow_html=True)
-            
-            # Tampilkan informasi perhitungan
-            formula_text = f"""
-            <p><strong>Formula Perhitungan:</strong></p>
-            <ol>
-                <li>TOTAL POIN = INDEKS PELANGGARAN ({hasil_perhitungan['indeks']}) * % ({hasil_perhitungan['persentase']*100:.0f}%) * MAKS POIN ({hasil_perhitungan['maks_poin']}) = {hasil_perhitungan['total_poin']:.2f}</li>
-                <li>DENDA = TOTAL POIN ({hasil_perhitungan['total_poin']:.2f}) * TARIF DENDA ({hasil_perhitungan['tarif_denda']:.2f}) = {hasil_perhitungan['denda']:.2f}</li>
-                <li>TOTAL TAGIHAN DENDA = DENDA ({hasil_perhitungan['denda']:.2f}) * JUMLAH FREKUENSI ({jumlah_frekuensi}) * JUMLAH PERANGKAT ({jumlah_perangkat}) = {hasil_perhitungan['total_tagihan_denda']:.2f}</li>
-            </ol>
-            """
-            
-            st.markdown(f"""
-            <div class='calculation-info'>
-                {formula_text}
-                <p><strong>Filter yang Digunakan:</strong> {', '.join([f"{k}: {v}" for k, v in filters.items() if v != 'Semua'])}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Tambahkan kolom hasil ke dataframe untuk visualisasi
-            result_df = filtered_df.copy()
-            result_df['JENIS PELANGGARAN'] = jenis_pelanggaran
-            result_df['INDEKS YANG DIGUNAKAN'] = hasil_perhitungan['indeks']
-            result_df['PERSENTASE'] = hasil_perhitungan['persentase']
-            result_df['TOTAL POIN'] = hasil_perhitungan['total_poin']
-            result_df['DENDA'] = hasil_perhitungan['denda']
-            result_df['JUMLAH FREKUENSI'] = jumlah_frekuensi
-            result_df['JUMLAH PERANGKAT'] = jumlah_perangkat
-            result_df['TOTAL TAGIHAN DENDA'] = hasil_perhitungan['total_tagihan_denda']
-            
-            # Pastikan JENIS IZIN ada di result_df
-            if 'JENIS IZIN' not in result_df.columns and selected_jenis_izin != "Semua":
-                result_df['JENIS IZIN'] = selected_jenis_izin
+                    st.markdown("### Parameter Input:")
+                    st.write(f"JENIS IZIN: {selected_data.get('JENIS IZIN', 'N/A')}")
+                    st.write(f"Jenis Pelanggaran: {jenis_pelanggaran}")
+                    st.write(f"Persentase JML BULAN: {persentase}")
+                    st.write(f"Jumlah Frekuensi: {jumlah_frekuensi}")
+                    st.write(f"Jumlah Perangkat: {jumlah_perangkat}")
+            
+                # Simpan hasil agar tetap tampil saat halaman dijalankan ulang (misalnya saat grafik dibuka).
+                # Sesi hanya menyimpan posisi baris di store tarif bersama dan hasil skalar; tabel hasil
+                # disusun ulang dari store setiap rerun.
+                st.session_state['hasil_denda'] = {
+                    'hasil_perhitungan': hasil_perhitungan,
+                    'posisi': None if dummy_used else filtered_df.index.to_numpy(),
+                    'dummy_data': dummy_data if dummy_used else None,
+                    'tariff_version': (store.file_path, store.version),
+                    'selected_jenis_izin': selected_jenis_izin,
+                    'jenis_izin': jenis_izin,
+                    'jenis_pelanggaran': jenis_pelanggaran,
+                    'jumlah_frekuensi': jumlah_frekuensi,
+                    'jumlah_perangkat': jumlah_perangkat,
+                    'filters': dict(filters),
+                }
+        else:
+            st.warning("Tidak ada data yang sesuai dengan filter yang dipilih. Pilih JENIS IZIN untuk melanjutkan perhitungan.")
+    
+    # Hasil tersimpan menunjuk posisi baris di versi store tarif tertentu; buang bila store sudah berganti
+    if 'hasil_denda' in st.session_state and \
+            st.session_state['hasil_denda']['tariff_version'] != (store.file_path, store.version):
+        st.session_state.pop('hasil_denda')
+    
+    # Tampilkan hasil perhitungan terakhir
+    if 'hasil_denda' in st.session_state:
+        hasil_denda = st.session_state['hasil_denda']
+        hasil_perhitungan = hasil_denda['hasil_perhitungan']
+        jenis_izin = hasil_denda['jenis_izin']
+        jenis_pelanggaran = hasil_denda['jenis_pelanggaran']
+        jumlah_frekuensi = hasil_denda['jumlah_frekuensi']
+        jumlah_perangkat = hasil_denda['jumlah_perangkat']
+        filters_used = hasil_denda['filters']
+        
+        # Susun ulang tabel hasil dari baris store (atau data dummy) dan hasil skalar
+        if hasil_denda['dummy_data'] is not None:
+            result_df = pd.DataFrame([hasil_denda['dummy_data']])
+        else:
+            result_df = frek_alat_df.iloc[hasil_denda['posisi']]
+        result_df = result_df.assign(**{
+            'JENIS PELANGGARAN': jenis_pelanggaran,
+            'INDEKS YANG DIGUNAKAN': hasil_perhitungan['indeks'],
+            'PERSENTASE': hasil_perhitungan['persentase'],
+            'TOTAL POIN': hasil_perhitungan['total_poin'],
+            'DENDA': hasil_perhitungan['denda'],
+            'JUMLAH FREKUENSI': jumlah_frekuensi,
+            'JUMLAH PERANGKAT': jumlah_perangkat,
+            'TOTAL TAGIHAN DENDA': hasil_perhitungan['total_tagihan_denda'],
+        })
+        
+        # Pastikan JENIS IZIN ada di result_df
+        if 'JENIS IZIN' not in result_df.columns and hasil_denda['selected_jenis_izin'] != "Semua":
+            result_df['JENIS IZIN'] = hasil_denda['selected_jenis_izin']
+        
+        # Pastikan MAKS POIN sesuai dengan JENIS IZIN
+        if 'MAKS POIN' not in result_df.columns or result_df['MAKS POIN'].iloc[0] == 0:
+            result_df['MAKS POIN'] = hasil_perhitungan['maks_poin']
+        
+        # Tentukan kolom yang akan ditampilkan
+        display_columns = [
+            'JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'ZONA',
+            'JENIS PELANGGARAN', 'INDEKS YANG DIGUNAKAN', 'PERSENTASE',
+            'MAKS POIN', 'TOTAL POIN', 'TARIF DENDA', 'DENDA', 
+            'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT', 'TOTAL TAGIHAN DENDA'
+        ]
+        
+        # Pastikan semua kolom yang dibutuhkan ada
+        display_columns = [col for col in display_columns if col in result_df.columns]
+        
+        # Tampilkan hasil
+        st.markdown("<div class='subtitle'>Hasil Perhitungan Denda</div>", unsafe_allow_html=True)
+        
+        # Tampilkan informasi JENIS IZIN dan MAKS POIN
+        jenis_izin_info = f"""
+        <div class='jenis-izin-box'>
+            <p><strong>JENIS IZIN:</strong> {jenis_izin}</p>
+            <p><strong>MAKS POIN Default:</strong> {get_maks_poin(jenis_izin)}</p>
+            <p><strong>MAKS POIN yang digunakan:</strong> {hasil_perhitungan['maks_poin']}</p>
+            <p><strong>Jenis Pelanggaran:</strong> {jenis_pelanggaran}</p>
+        </div>
+        """
+        st.markdown(jenis_izin_info, unsafe_allow_html=True)
+        
+        # Tampilkan informasi perhitungan
+        formula_text = f"""
+        <p><strong>Formula Perhitungan:</strong></p>
+        <ol>
+            <li>TOTAL POIN = INDEKS PELANGGARAN ({hasil_perhitungan['indeks']}) * % ({hasil_perhitungan['persentase']*100:.0f}%) * MAKS POIN ({hasil_perhitungan['maks_poin']}) = {hasil_perhitungan['total_poin']:.2f}</li>
+            <li>DENDA = TOTAL POIN ({hasil_perhitungan['total_poin']:.2f}) * TARIF DENDA ({hasil_perhitungan['tarif_denda']:.2f}) = {hasil_perhitungan['denda']:.2f}</li>
+            <li>TOTAL TAGIHAN DENDA = DENDA ({hasil_perhitungan['denda']:.2f}) * JUMLAH FREKUENSI ({jumlah_frekuensi}) * JUMLAH PERANGKAT ({jumlah_perangkat}) = {hasil_perhitungan['total_tagihan_denda']:.2f}</li>
+        </ol>
+        """
+        
+        st.markdown(f"""
+        <div class='calculation-info'>
+            {formula_text}
+            <p><strong>Filter yang Digunakan:</strong> {', '.join([f"{k}: {v}" for k, v in filters_used.items() if v != 'Semua'])}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.dataframe(result_df[display_columns])
+        
+        # Tampilkan total denda
+        st.markdown(f"""
+        <div class='result-container'>
+            <h3>Total Tagihan Denda: Rp {hasil_perhitungan['total_tagihan_denda']:,.2f}</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Visualisasi data: grafik hanya dibuat saat expander/tab dibuka dan disimpan per hasil perhitungan
+        visualisasi = st.expander("Visualisasi Data", expanded=False, key="chart_expander", on_change="rerun")
+        if visualisasi.open:
+            with visualisasi:
+                key = chart_key(hasil_perhitungan, jumlah_frekuensi, jumlah_perangkat)
+                tab_bar, tab_pie, tab_sankey = st.tabs(
+                    ["Komponen", "Proporsi", "Alur Perhitungan"], key="chart_tabs", on_change="rerun"
+                )
+                with stage('charts'):
+                    if tab_bar.open:
+                        with tab_bar:
+                            st.plotly_chart(json.loads(component_bar_json(key)), use_container_width=True)
+                    if tab_pie.open:
+                        with tab_pie:
+                            st.plotly_chart(json.loads(proportion_pie_json(key)), use_container_width=True)
+                    if tab_sankey.open:
+                        with tab_sankey:
+                            st.plotly_chart(json.loads(sankey_json(key)), use_container_width=True)
+        
+        # Opsi untuk download hasil perhitungan
+        st.markdown("<div class='subtitle'>Download Hasil</div>", unsafe_allow_html=True)
+        
+        # File download baru dibuat saat tombol diklik (bukan di setiap rerun)
+        st.download_button(
+            label="Download Hasil Perhitungan (CSV)",
+            data=lambda: to_csv(result_df),
+            file_name=f"hasil_perhitungan_denda_{jenis_izin}.csv",
+            mime="text/csv"
+        )
+        
+        # Coba download Excel jika engine tersedia
+        if excel_available():
+            excel_download_button("Download Hasil Perhitungan (Excel)", result_df,
+                                  f"hasil_perhitungan_denda_{jenis_izin}.xlsx", "excel_download")
+        else:
+            st.info("""
+            Untuk download Excel, silakan install paket 'openpyxl' atau 'xlsxwriter': 
+            `pip install openpyxl` atau `pip install xlsxwriter`
+            """)
+
+    # Section faktur gabungan: beberapa baris tarif yang cocok, masing-masing dengan jumlah frekuensi/perangkatnya
+    st.markdown("<div class='subtitle'>Faktur Gabungan</div>", unsafe_allow_html=True)
+    faktur = st.expander("Pilih beberapa baris tarif yang cocok dengan filter", expanded=False,
+                         key="invoice_expander", on_change="rerun")
+    if faktur.open:
+        with faktur:
+            matched_df = filter_data(frek_alat_df, filters, lookup_index)
+            if matched_df.empty:
+                st.warning("Tidak ada data yang sesuai dengan filter yang dipilih untuk faktur gabungan.")
+            else:
+                if len(matched_df) > MAX_INVOICE_ROWS:
+                    st.info(f"{len(matched_df)} baris tarif cocok; hanya {MAX_INVOICE_ROWS} baris pertama yang "
+                            "ditampilkan. Persempit filter untuk memilih baris lainnya.")
+                    matched_df = matched_df.iloc[:MAX_INVOICE_ROWS]
+                
+                # Tabel pilihan: centang baris lalu isi jumlah frekuensi dan perangkat per baris
+                info_columns = [col for col in ['JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'ZONA', 'TARIF DENDA']
+                                if col in matched_df.columns]
+                pilihan_df = matched_df[info_columns].copy()
+                pilihan_df.insert(0, 'PILIH', False)
+                pilihan_df['JUMLAH FREKUENSI'] = jumlah_frekuensi
+                pilihan_df['JUMLAH PERANGKAT'] = jumlah_perangkat
+                
+                # Kunci editor mengikuti filter agar pilihan lama tidak terbawa ke daftar baris yang berbeda
+                pilihan_df = st.data_editor(
+                    pilihan_df,
+                    hide_index=True,
+                    disabled=info_columns,
+                    column_config={
+                        'PILIH': st.column_config.CheckboxColumn("PILIH"),
+                        'JUMLAH FREKUENSI': st.column_config.NumberColumn("JUMLAH FREKUENSI", min_value=0, step=1),
+                        'JUMLAH PERANGKAT': st.column_config.NumberColumn("JUMLAH PERANGKAT", min_value=0, step=1),
+                    },
+                    key="invoice_editor_" + "_".join(str(value) for value in filters.values())
+                )
+                
+                if st.button("Hitung Faktur Gabungan"):
+                    dipilih = pilihan_df['PILIH'].fillna(False).to_numpy(dtype=bool)
+                    if not dipilih.any():
+                        st.session_state.pop('faktur_gabungan', None)
+                        st.warning("Centang minimal satu baris tarif untuk faktur gabungan.")
+                    else:
+                        # Semua baris terpilih dihitung dalam satu operasi array
+                        faktur_df = price_selection(
+                            matched_df[dipilih],
+                            pilihan_df['JUMLAH FREKUENSI'].fillna(0).to_numpy()[dipilih],
+                            pilihan_df['JUMLAH PERANGKAT'].fillna(0).to_numpy()[dipilih],
+                            persentase,
+                            jenis_pelanggaran,
+                            store.unit_fines
+                        )
+                        faktur_df.insert(0, 'BARIS FAKTUR', invoice_labels(faktur_df).to_numpy())
+                        st.session_state['faktur_gabungan'] = {
+                            'faktur_df': faktur_df,
+                            'filters': ', '.join(f"{k}: {v}" for k, v in filters.items() if v != 'Semua'),
+                        }
+            
+            if 'faktur_gabungan' in st.session_state:
+                faktur_df = st.session_state['faktur_gabungan']['faktur_df']
+                st.markdown(f"**Filter yang Digunakan:** {st.session_state['faktur_gabungan']['filters'] or 'Semua'}")
+                
+                faktur_columns = [col for col in [
+                    'BARIS FAKTUR', 'JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'ZONA',
+                    'JENIS PELANGGARAN', 'INDEKS YANG DIGUNAKAN', 'PERSENTASE',
+                    'MAKS POIN', 'TOTAL POIN', 'TARIF DENDA', 'DENDA',
+                    'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT', 'TOTAL TAGIHAN DENDA', STATUS_COLUMN
+                ] if col in faktur_df.columns]
+                gagal = int((faktur_df[STATUS_COLUMN] != STATUS_OK).sum())
+                if gagal:
+                    st.warning(f"{gagal} baris faktur tidak dapat dihitung (lihat {STATUS_COLUMN}) dan tidak "
+                               "dijumlahkan ke total.")
+                st.dataframe(faktur_df[faktur_columns], hide_index=True)
+                
+                st.markdown("**Subtotal per JENIS IZIN dan BAND:**")
+                st.dataframe(invoice_subtotals(faktur_df).drop(columns=['TOTAL TAGIHAN DENDA (SEN)']), hide_index=True)
+                
+                st.markdown(f"""
+                <div class='result-container'>
+                    <h3>Total Faktur Gabungan ({len(faktur_df)} baris tarif): Rp {invoice_total(faktur_df):,.2f}</h3>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Satu set grafik untuk seluruh faktur, dibuat hanya saat tab dibuka; baris gagal tidak digambar
+                dihitung_df = faktur_df[faktur_df[STATUS_COLUMN] == STATUS_OK]
+                key = invoice_chart_key(dihitung_df['BARIS FAKTUR'], dihitung_df['DENDA'],
+                                        dihitung_df['TOTAL TAGIHAN DENDA'])
+                tab_bar, tab_pie = st.tabs(["Tagihan per Baris", "Porsi Tagihan"], key="invoice_tabs", on_change="rerun")
+                with stage('charts'):
+                    if tab_bar.open:
+                        with tab_bar:
+                            st.plotly_chart(json.loads(invoice_bar_json(key)), use_container_width=True)
+                    if tab_pie.open:
+                        with tab_pie:
+                            st.plotly_chart(json.loads(invoice_pie_json(key)), use_container_width=True)
+                
+                st.download_button(
+                    label="Download Faktur Gabungan (CSV)",
+                    data=lambda: to_csv(faktur_df[faktur_columns]),
+                    file_name="faktur_gabungan_denda.csv",
+                    mime="text/csv",
+                    key="invoice_csv_download"
+                )
+                if excel_available():
+                    excel_download_button("Download Faktur Gabungan (Excel)", faktur_df[faktur_columns],
+                                          "faktur_gabungan_denda.xlsx", "invoice_excel_download")
+    
+    # Section simulasi skenario: satu baris tarif untuk banyak kombinasi input
+    st.markdown("<div class='subtitle'>Simulasi Skenario</div>", unsafe_allow_html=True)
+    st.markdown("""
+    <div class='info-box'>
+        <p>Hitung denda baris tarif terpilih untuk semua kombinasi JUMLAH FREKUENSI, JUMLAH PERANGKAT,
+        bracket JML BULAN dan jenis pelanggaran sekaligus.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        max_frekuensi = st.number_input("JUMLAH FREKUENSI maksimum", min_value=1, max_value=1000, value=20, step=1)
+    with col2:
+        max_perangkat = st.number_input("JUMLAH PERANGKAT maksimum", min_value=1, max_value=1000, value=20, step=1)
+    
+    if st.button("Hitung Skenario"):
+        sweep_rows = filter_data(frek_alat_df, filters, lookup_index)
+        if sweep_rows.empty:
+            st.session_state.pop('sweep', None)
+            st.warning("Tidak ada data yang sesuai dengan filter yang dipilih untuk simulasi skenario.")
+        else:
+            # Yang disimpan per sesi hanya DENDA per (jenis pelanggaran, bracket); matriks dan tabel dibuat saat dibutuhkan
+            try:
+                st.session_state['sweep'] = sweep_denda(sweep_rows.iloc[0], persentase_data, max_frekuensi, max_perangkat)
+                st.session_state['sweep_filters'] = ', '.join(f"{k}: {v}" for k, v in filters.items() if v != 'Semua')
+            except OverflowError as e:
+                st.session_state.pop('sweep', None)
+                st.error(f"Error saat menghitung simulasi skenario: {e}")
+    
+    if 'sweep' in st.session_state:
+        sweep = st.session_state['sweep']
+        st.markdown(f"**Filter yang Digunakan:** {st.session_state.get('sweep_filters') or 'Semua'}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            sweep_jenis = st.selectbox("Jenis Pelanggaran (heatmap)", JENIS_PELANGGARAN)
+        with col2:
+            sweep_bulan = st.selectbox("JML BULAN (heatmap)", list(sweep.brackets))
+        
+        import plotly.express as px
+        
+        try:
+            matrix = sweep_matrix(sweep, sweep_jenis, sweep_bulan)
+        except OverflowError as e:
+            st.error(f"Error saat menghitung simulasi skenario: {e}")
+            matrix = None
+        
+        if matrix is not None:
+            fig_sweep = px.imshow(
+                matrix,
+                labels=dict(x="JUMLAH PERANGKAT", y="JUMLAH FREKUENSI", color="TOTAL TAGIHAN DENDA"),
+                title=f"Total Tagihan Denda - {sweep_jenis}, JML BULAN {sweep_bulan}",
+                aspect="auto",
+                origin="lower"
+            )
+            st.plotly_chart(fig_sweep, use_container_width=True)
             
-            # Pastikan MAKS POIN sesuai dengan JENIS IZIN
-            if 'MAKS POIN' not in result_df.columns or result_df['MAKS POIN'].iloc[0] == 0:
-                result_df['MAKS POIN'] = hasil_perhitungan['maks_poin']
+            st.download_button(
+                label="Download Hasil Simulasi Skenario (CSV)",
+                data=lambda: to_csv(sweep_frame(sweep)),
+                file_name="simulasi_skenario_denda.csv",
+                mime="text/csv",
+                key="sweep_csv_download"
+            )
+    
+    # Section laporan eksposur denda untuk seluruh tabel tarif
+    st.markdown("<div class='subtitle'>Laporan Eksposur Denda</div>", unsafe_allow_html=True)
+    laporan = st.expander("Total dan distribusi denda seluruh tabel tarif", expanded=False,
+                          key="exposure_expander", on_change="rerun")
+    if laporan.open:
+        with laporan:
+            exposure_dimensions = st.multiselect(
+                "Kelompokkan berdasarkan:",
+                [col for col in EXPOSURE_DIMENSIONS if col in frek_alat_df.columns],
+                default=[col for col in ['JENIS IZIN', 'DINAS'] if col in frek_alat_df.columns],
+                key="exposure_dimensions"
+            )
             
-            # Tentukan kolom yang akan ditampilkan
-            display_columns = [
-                'JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'ZONA',
-                'JENIS PELANGGARAN', 'INDEKS YANG DIGUNAKAN', 'PERSENTASE',
-                'MAKS POIN', 'TOTAL POIN', 'TARIF DENDA', 'DENDA', 
-                'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT', 'TOTAL TAGIHAN DENDA'
-            ]
+            with st.spinner('Menyusun laporan eksposur...'):
+                exposure_df = get_exposure_report(store.file_path, store.version, tuple(exposure_dimensions), store)
             
-            # Pastikan semua kolom yang dibutuhkan ada
-            display_columns = [col for col in display_columns if col in result_df.columns]
+            st.markdown("**Total DENDA per Jenis Pelanggaran dan JML BULAN (1 frekuensi, 1 perangkat):**")
+            st.dataframe(exposure_summary(exposure_df))
             
-            st.dataframe(result_df[display_columns])
+            st.dataframe(exposure_df)
             
-            # Tampilkan total denda
+            st.download_button(
+                label="Download Laporan Eksposur (CSV)",
+                data=lambda: to_csv(exposure_df),
+                file_name="laporan_eksposur_denda.csv",
+                mime="text/csv",
+                key="exposure_csv_download"
+            )
+    
+    # Section pencarian tarif di semua workbook folder Data (katalog SQLite gabungan)
+    st.markdown("<div class='subtitle'>Cari di Semua Workbook</div>", unsafe_allow_html=True)
+    katalog = st.expander("Baris tarif yang cocok dengan filter di semua file folder Data", expanded=False,
+                          key="catalog_expander", on_change="rerun")
+    if katalog.open:
+        with katalog:
+            try:
+                # Katalog hanya disinkronkan ulang saat pemantau memuat versi workbook baru;
+                # di dalamnya pun hanya file baru atau yang berubah yang dibaca ulang
+                catalog_versions = tariff_watcher.versions()
+                with st.spinner('Memperbarui katalog tarif...'):
+                    catalog_summary, sources_df = get_catalog(catalog_versions)
+                for failed_file in catalog_summary['failed']:
+                    st.error(f"File {failed_file} tidak dapat dimasukkan ke katalog.")
+                
+                catalog_df = search_catalog(catalog_versions, tuple(filters.items()))
+                st.markdown(f"**{len(catalog_df)} baris tarif cocok** dengan filter: "
+                            f"{', '.join(f'{k}: {v}' for k, v in filters.items() if v != 'Semua') or 'Semua'}")
+                st.dataframe(catalog_df)
+                
+                st.markdown("**Workbook dalam katalog:**")
+                st.dataframe(sources_df)
+            except Exception as e:
+                st.error(f"Error saat membaca katalog tarif: {e}")
+    
+    # Section perhitungan massal dari file daftar kasus
+    st.markdown("<div class='subtitle'>Perhitungan Massal</div>", unsafe_allow_html=True)
+    st.markdown(f"""
+    <div class='info-box'>
+        <p>Unggah daftar kasus (CSV atau Excel) dengan kolom: {', '.join(CASE_COLUMNS)}.</p>
+        <p>Setiap kasus dicocokkan ke data FREK & ALAT dan dihitung sekaligus.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.download_button(
+        label="Download Template Daftar Kasus (CSV)",
+        data=lambda: to_csv(pd.DataFrame(columns=CASE_COLUMNS)),
+        file_name="template_daftar_kasus.csv",
+        mime="text/csv",
+        key="template_download"
+    )
+
+    uploaded_cases = st.file_uploader("Pilih file daftar kasus:", type=["csv", "xlsx", "xls"])
+
+    if uploaded_cases is not None and st.button("Hitung Denda Massal"):
+        try:
+            cases_df = read_cases(uploaded_cases)
+        except Exception as e:
+            st.error(f"Error saat membaca file daftar kasus {uploaded_cases.name}: {e}")
+            cases_df = None
+
+        batch_df = None
+        if cases_df is not None:
+            try:
+                with st.spinner(f'Menghitung {len(cases_df)} kasus...'):
+                    batch_df = price_cases(frek_alat_df, cases_df, persentase_data, store.unit_fines)
+            except (ValueError, OverflowError) as e:
+                st.error(f"Error saat menghitung daftar kasus {uploaded_cases.name}: {e}")
+
+        if batch_df is not None:
+            tidak_ditemukan = int((~batch_df['DATA TARIF DITEMUKAN']).sum())
+            if tidak_ditemukan:
+                st.warning(f"{tidak_ditemukan} kasus tidak memiliki data tarif yang cocok dan dihitung dengan nilai 0.")
+            gagal = int((batch_df[STATUS_COLUMN] != STATUS_OK).sum())
+            if gagal:
+                st.warning(f"{gagal} kasus tidak dapat dihitung (lihat kolom {STATUS_COLUMN}) dan tidak "
+                           "dijumlahkan ke total.")
+
+            batch_columns = [col for col in CASE_COLUMNS + [
+                'INDEKS YANG DIGUNAKAN', 'PERSENTASE', 'MAKS POIN', 'TOTAL POIN',
+                'TARIF DENDA', 'DENDA', 'TOTAL TAGIHAN DENDA', 'DATA TARIF DITEMUKAN', STATUS_COLUMN
+            ] if col in batch_df.columns]
+
+            st.dataframe(batch_df[batch_columns])
+
             st.markdown(f"""
             <div class='result-container'>
-                <h3>Total Tagihan Denda: Rp {hasil_perhitungan['total_tagihan_denda']:,.2f}</h3>
+                <h3>Total Tagihan Denda ({len(batch_df)} kasus): Rp {batch_df['TOTAL TAGIHAN DENDA'].sum():,.2f}</h3>
             </div>
             """, unsafe_allow_html=True)
-            
-            # Visualisasi data
-            st.markdown("<div class='subtitle'>Visualisasi Data</div>", unsafe_allow_html=True)
-            
-            # Tentukan komponen untuk visualisasi - Diagram Alir Perhitungan
-            flow_components = {
-                'Indeks Pelanggaran': hasil_perhitungan['indeks'],
-                '% Faktor': hasil_perhitungan['persentase'],
-                'MAKS POIN': hasil_perhitungan['maks_poin'],
-                'TOTAL POIN': hasil_perhitungan['total_poin'],
-                'TARIF DENDA': hasil_perhitungan['tarif_denda'],
-                'DENDA': hasil_perhitungan['denda'],
-                'Jumlah Frekuensi': jumlah_frekuensi,
-                'Jumlah Perangkat': jumlah_perangkat
-            }
-            
-            # Buat dataframe untuk visualisasi aliran perhitungan
-            flow_df = pd.DataFrame({
-                'Komponen': list(flow_components.keys()),
-                'Nilai': list(flow_components.values())
-            })
-            
-            # Grafik batang untuk komponen perhitungan
-            fig1 = px.bar(
-                flow_df,
-                x='Komponen',
-                y='Nilai',
-                title='Komponen Perhitungan Denda',
-                color='Komponen'
-            )
-            
-            # Atur urutan komponen sesuai alur perhitungan
-            component_order = ['Indeks Pelanggaran', '% Faktor', 'MAKS POIN', 'TOTAL POIN', 'TARIF DENDA', 'DENDA', 'Jumlah Frekuensi', 'Jumlah Perangkat']
-            fig1.update_xaxes(categoryorder='array', categoryarray=component_order)
-            
-            st.plotly_chart(fig1, use_container_width=True)
-            
-            # Grafik pie untuk proporsi komponen dalam hasil akhir
-            prop_components = {
-                'TOTAL POIN': hasil_perhitungan['total_poin'],
-                'TARIF DENDA': hasil_perhitungan['tarif_denda'],
-                'Jumlah Frekuensi': jumlah_frekuensi,
-                'Jumlah Perangkat': jumlah_perangkat
-            }
-            
-            # Buat dataframe untuk visualisasi proporsi
-            prop_df = pd.DataFrame({
-                'Komponen': list(prop_components.keys()),
-                'Nilai': list(prop_components.values())
-            })
-            
-            # Hitung total nilai untuk proporsi
-            total_prop = sum(prop_components.values())
-            prop_df['Proporsi'] = prop_df['Nilai'] / total_prop if total_prop > 0 else 0
-            
-            # Grafik pie untuk proporsi komponen
-            fig2 = px.pie(
-                prop_df,
-                values='Proporsi',
-                names='Komponen',
-                title='Proporsi Komponen dalam Perhitungan'
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-            
-            # Grafik Sankey untuk alur perhitungan
-            st.markdown("### Alur Perhitungan Denda")
-            
-            # Membuat label untuk Sankey diagram
-            labels = [
-                'Indeks', 'Persentase', 'MAKS POIN', 
-                'TOTAL POIN', 'TARIF DENDA', 'DENDA',
-                'Jumlah Frekuensi', 'Jumlah Perangkat', 'TOTAL TAGIHAN DENDA'
-            ]
-            
-            # Membuat source dan target untuk Sankey diagram
-            source = [0, 1, 2, 3, 4, 5, 6, 7]  # dari mana aliran berasal
-            target = [3, 3, 3, 5, 5, 8, 8, 8]  # ke mana aliran menuju
-            
-            # Nilai untuk aliran (dapat disesuaikan untuk visualisasi yang lebih baik)
-            values = [
-                hasil_perhitungan['indeks'],
-                hasil_perhitungan['persentase'],
-                hasil_perhitungan['maks_poin'],
-                hasil_perhitungan['total_poin'],
-                hasil_perhitungan['tarif_denda'],
-                hasil_perhitungan['denda'],
-                jumlah_frekuensi,
-                jumlah_perangkat
-            ]
-            
-            # Normalkan nilai untuk visualisasi yang lebih baik
-            max_value = max(values) if max(values) > 0 else 1
-            normalized_values = [v / max_value * 100 for v in values]
-            
-            # Buat diagram Sankey
-            fig3 = go.Figure(data=[go.Sankey(
-                node=dict(
-                    pad=15,
-                    thickness=20,
-                    line=dict(color="black", width=0.5),
-                    label=labels,
-                    color="blue"
-                ),
-                link=dict(
-                    source=source,
-                    target=target,
-                    value=normalized_values
-                )
-            )])
-            
-            fig3.update_layout(title_text="Alur Perhitungan Denda", font_size=10)
-            st.plotly_chart(fig3, use_container_width=True)
-            
-            # Opsi untuk download hasil perhitungan
-            st.markdown("<div class='subtitle'>Download Hasil</div>", unsafe_allow_html=True)
-            
-            # Download sebagai CSV untuk menghindari masalah dengan Excel engine
-            csv_data = to_csv(result_df)
+
             st.download_button(
-                label="Download Hasil Perhitungan (CSV)",
-                data=csv_data,
-                file_name=f"hasil_perhitungan_denda_{jenis_izin}.csv",
-                mime="text/csv"
+                label="Download Hasil Perhitungan Massal (CSV)",
+                data=lambda: to_csv(batch_df[batch_columns]),
+                file_name="hasil_perhitungan_denda_massal.csv",
+                mime="text/csv",
+                key="batch_csv_download"
             )
-            
-            # Coba download Excel jika engine tersedia
-            excel_data, excel_success = to_excel(result_df)
-            if excel_success:
-                st.download_button(
-                    label="Download Hasil Perhitungan (Excel)",
-                    data=excel_data,
-                    file_name=f"hasil_perhitungan_denda_{jenis_izin}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key="excel_download"
-                )
-            else:
-                st.info("""
-                Untuk download Excel, silakan install paket 'openpyxl' atau 'xlsxwriter': 
-                `pip install openpyxl` atau `pip install xlsxwriter`
-                """)
-        else:
-            st.warning("Tidak ada data yang sesuai dengan filter yang dipilih. Pilih JENIS IZIN untuk melanjutkan perhitungan.")
+
+            if excel_available():
+                excel_download_button("Download Hasil Perhitungan Massal (Excel)", batch_df[batch_columns],
+                                      "hasil_perhitungan_denda_massal.xlsx", "batch_excel_download")
 else:
     st.info("Silakan pilih dan muat data terlebih dahulu untuk melanjutkan perhitungan denda.")
 
+# Tampilkan waktu dan peak alokasi setiap tahap pada rerun ini
+if stage_records:
+    with debug_expander:
+        st.markdown("### Waktu per Tahap:")
+        st.dataframe(pd.DataFrame(stage_records))
+
 # Tampilkan informasi di bagian bawah
 st.markdown("""
 <div class='highlight'>
@@ -916,4 +959,7 @@ st.markdown("""
 <div style='text-align: center; margin-top: 30px; padding: 10px; color: #604CC3;'>
     <p>© 2025 Aplikasi Simulasi Perhitungan Denda | Loka Monitor SFR Kendari</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Tulis agregat metrik tahap (DENDA_METRICS_FILE) sekali di akhir rerun
+flush_metrics()
\ No newline at end of file
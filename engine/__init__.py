@@ -0,0 +1,134 @@
+"""
+Engine perhitungan denda tanpa ketergantungan pada Streamlit.
+
+Paket ini dapat diimpor oleh worker, job batch atau test tanpa menjalankan UI.
+Submodul (beserta pandas/numpy dan engine Excel yang dipakainya) baru dimuat
+saat nama terkait pertama kali diakses, sehingga `import engine` tetap ringan.
+"""
+import importlib
+
+# Nama publik dan submodul tempat nama tersebut didefinisikan
+_EXPORTS = {
+    'MAKS_POIN_DEFAULT': 'constants',
+    'PERSENTASE_DEFAULT': 'constants',
+    'JENIS_PELANGGARAN': 'constants',
+    'SHEET_FREK_ALAT': 'constants',
+    'SHEET_REFERENSI': 'constants',
+    'LOOKUP_KEYS': 'constants',
+    'TARIF_COLUMNS': 'constants',
+    'RESULT_COLUMNS': 'constants',
+    'PRICING_COLUMNS': 'constants',
+    'STATUS_COLUMN': 'constants',
+    'STATUS_OK': 'constants',
+    'CASE_COLUMNS': 'constants',
+    'find_excel_files': 'loader',
+    'load_excel': 'loader',
+    'read_cases': 'loader',
+    'iter_case_chunks': 'loader',
+    'locate_cells': 'parsing',
+    'find_header_row': 'parsing',
+    'process_frek_alat_data': 'parsing',
+    'process_referensi_data': 'parsing',
+    'get_percentage': 'parsing',
+    'BracketTable': 'parsing',
+    'compile_brackets': 'parsing',
+    'bracket_positions': 'parsing',
+    'lookup_percentages': 'parsing',
+    'build_lookup_index': 'filtering',
+    'lookup_positions': 'filtering',
+    'filter_data': 'filtering',
+    'build_facet_tree': 'facets',
+    'facet_options': 'facets',
+    'get_maks_poin': 'pricing',
+    'calculate_denda_frame': 'pricing',
+    'calculate_denda': 'pricing',
+    'normalize_cases': 'pricing',
+    'price_cases': 'pricing',
+    'INDEKS_SCALE': 'fixedpoint',
+    'PERSEN_SCALE': 'fixedpoint',
+    'POIN_SCALE': 'fixedpoint',
+    'SEN': 'fixedpoint',
+    'to_fixed': 'fixedpoint',
+    'from_fixed': 'fixedpoint',
+    'round_div': 'fixedpoint',
+    'price_fixed': 'fixedpoint',
+    'price_fixed_rows': 'fixedpoint',
+    'UnitFines': 'unitfines',
+    'precompute_unit_fines': 'unitfines',
+    'slot_positions': 'unitfines',
+    'lookup_denda_columns': 'unitfines',
+    'lookup_denda': 'unitfines',
+    'VALIDATION_COLUMNS': 'validation',
+    'validate_frek_alat': 'validation',
+    'validation_summary': 'validation',
+    'price_chunks_parallel': 'parallel',
+    'price_file_parallel': 'parallel',
+    'sweep_denda': 'sweep',
+    'sweep_matrix': 'sweep',
+    'sweep_frame': 'sweep',
+    'SweepResult': 'sweep',
+    'iter_csv_chunks': 'export',
+    'write_csv': 'export',
+    'write_excel': 'export',
+    'EXCEL_MAX_ROWS': 'export',
+    'excel_available': 'export',
+    'to_csv': 'export',
+    'to_excel': 'export',
+    'file_fingerprint': 'cache',
+    'normalize_frame': 'cache',
+    'load_workbook': 'cache',
+    'evict_stale_entries': 'cache',
+    'compact_frek_alat': 'schema',
+    'memory_report': 'schema',
+    'chart_key': 'charts',
+    'component_bar_json': 'charts',
+    'proportion_pie_json': 'charts',
+    'sankey_json': 'charts',
+    'invoice_chart_key': 'charts',
+    'invoice_bar_json': 'charts',
+    'invoice_pie_json': 'charts',
+    'INVOICE_LABEL_COLUMNS': 'invoice',
+    'MAX_INVOICE_ROWS': 'invoice',
+    'price_selection': 'invoice',
+    'invoice_labels': 'invoice',
+    'invoice_subtotals': 'invoice',
+    'invoice_total': 'invoice',
+    'EXPOSURE_DIMENSIONS': 'exposure',
+    'exposure_frame': 'exposure',
+    'exposure_report': 'exposure',
+    'exposure_summary': 'exposure',
+    'CATALOG_PATH': 'catalog',
+    'connect_catalog': 'catalog',
+    'ingest_folder': 'catalog',
+    'query_catalog': 'catalog',
+    'catalog_sources': 'catalog',
+    'stage': 'metrics',
+    'timed': 'metrics',
+    'collect_stages': 'metrics',
+    'start_collecting': 'metrics',
+    'enable_memory_tracing': 'metrics',
+    'prometheus_text': 'metrics',
+    'write_prometheus': 'metrics',
+    'flush_metrics': 'metrics',
+    'TariffStore': 'store',
+    'build_tariff_store': 'store',
+    'TariffWatcher': 'watcher',
+    'PricingService': 'service',
+    'ServiceClient': 'service',
+    'make_server': 'service',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
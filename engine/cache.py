@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from .constants import SHEET_FREK_ALAT
+from .loader import load_excel
+from .metrics import timed
+from .parsing import process_frek_alat_data, process_referensi_data
+
+logger = logging.getLogger(__name__)
+
+# Folder cache hasil parsing workbook (dapat diubah lewat environment variable)
+CACHE_DIR = os.environ.get("DENDA_CACHE_DIR", ".cache")
+
+# Naikkan jika cara parsing berubah agar cache lama tidak dipakai lagi
+CACHE_VERSION = 4
+
+# Jumlah maksimum entri cache; entri yang paling lama tidak dipakai dihapus lebih dulu
+CACHE_MAX_ENTRIES = int(os.environ.get("DENDA_CACHE_MAX_ENTRIES", "16"))
+
+# Folder sementara yang lebih tua dari ini (detik) dianggap sisa proses yang gagal
+_TMP_MAX_AGE = 3600
+
+# Nama folder entri cache (sidik jari file); file lain di folder cache tidak disentuh
+_ENTRY_PATTERN = re.compile(r'^v\d+-[0-9a-f]{32}-\d+$')
+
+_FREK_ALAT_FILE = "frek_alat.parquet"
+_META_FILE = "meta.json"
+
+# Jenis isi kolom object (pd.api.types.infer_dtype) yang disimpan sebagai kolom numerik
+_NUMERIC_KINDS = {'empty', 'integer', 'floating', 'mixed-integer-float', 'decimal'}
+
+# Sidik jari terakhir per file: {path absolut: ((ukuran, mtime_ns), sidik jari)}
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+# Fungsi untuk membuat sidik jari file berdasarkan isi (SHA-256) dan mtime
+def file_fingerprint(file_path, chunk_size=1 << 20):
+    """
+    Isi file hanya di-hash ulang jika ukuran atau mtime berubah sejak pemanggilan
+    terakhir; selama keduanya sama, sidik jari sebelumnya dipakai lagi.
+    """
+    stat = os.stat(file_path)
+    key, signature = os.path.abspath(file_path), (stat.st_size, stat.st_mtime_ns)
+    with _fingerprints_lock:
+        known = _fingerprints.get(key)
+    if known is not None and known[0] == signature:
+        return known[1]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    fingerprint = f"v{CACHE_VERSION}-{digest.hexdigest()[:32]}-{stat.st_mtime_ns}"
+    with _fingerprints_lock:
+        _fingerprints[key] = (signature, fingerprint)
+    return fingerprint
+
+
+# Fungsi untuk menyeragamkan tipe kolom hasil parsing agar sama persis setelah disimpan ke parquet
+def normalize_frame(df):
+    """
+    Kolom object berisi angka saja diubah menjadi kolom numerik, kolom object
+    lain (teks atau campuran teks dan angka) menjadi kolom str; NaN tetap NaN.
+    Tabel hasil parsing baru dan tabel dari cache dengan demikian identik.
+    """
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        kind = pd.api.types.infer_dtype(df[column], skipna=True)
+        if kind in _NUMERIC_KINDS:
+            df[column] = pd.to_numeric(df[column])
+        elif kind not in ('datetime', 'datetime64', 'date'):
+            df[column] = df[column].astype('str')
+    return df
+
+
+# Fungsi untuk membaca hasil parsing dari cache, None jika belum ada atau rusak
+def read_cache(fingerprint, cache_dir=None):
+    entry_dir = os.path.join(cache_dir or CACHE_DIR, fingerprint)
+    meta_path = os.path.join(entry_dir, _META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        frek_alat_df = None
+        if meta.get("has_frek_alat"):
+            frek_alat_df = pd.read_parquet(os.path.join(entry_dir, _FREK_ALAT_FILE))
+        # Catat waktu pemakaian untuk urutan eviction (LRU)
+        os.utime(meta_path)
+        return frek_alat_df, meta["persentase_data"], meta["sheet_names"]
+    except Exception as e:
+        logger.warning("Cache %s tidak dapat dibaca, parsing ulang: %s", fingerprint, e)
+        return None
+
+
+# Fungsi untuk menyimpan hasil parsing ke cache secara atomik
+def write_cache(fingerprint, frek_alat_df, persentase_data, sheet_names, cache_dir=None, source=None):
+    cache_dir = cache_dir or CACHE_DIR
+    entry_dir = os.path.join(cache_dir, fingerprint)
+    if os.path.exists(entry_dir):
+        return
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir)
+        try:
+            if frek_alat_df is not None:
+                parquet_path = os.path.join(tmp_dir, _FREK_ALAT_FILE)
+                frek_alat_df.to_parquet(parquet_path, index=False)
+                # Entri hanya dipakai jika tabel terbaca kembali persis sama
+                try:
+                    pd.testing.assert_frame_equal(pd.read_parquet(parquet_path), frek_alat_df)
+                except AssertionError as e:
+                    raise ValueError(f"Tabel FREK & ALAT berubah setelah disimpan ke parquet: {e}") from e
+            meta = {
+                "has_frek_alat": frek_alat_df is not None,
+                "persentase_data": persentase_data,
+                "sheet_names": list(sheet_names),
+                "source": os.path.abspath(source) if source else None,
+            }
+            with open(os.path.join(tmp_dir, _META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_dir, entry_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+    except (ImportError, OSError) as e:
+        # Cache bersifat opsional (pyarrow tidak terpasang, folder tidak dapat ditulis);
+        # error lain (tipe kolom tidak dapat disimpan apa adanya) diteruskan ke pemanggil
+        logger.warning("Hasil parsing tidak dapat disimpan ke cache: %s", e)
+
+
+# Fungsi untuk menghapus entri cache yang tidak akan dipakai lagi
+def evict_stale_entries(cache_dir=None, keep=None, source=None, max_entries=None):
+    """
+    Menghapus entri versi cache lama, entri lain dari file sumber yang sama
+    (versi workbook sebelumnya), folder sementara yang tertinggal, lalu entri
+    yang paling lama tidak dipakai jika jumlahnya melebihi max_entries.
+    Entri keep tidak pernah dihapus. Mengembalikan jumlah entri yang dihapus.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    max_entries = CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    source = os.path.abspath(source) if source else None
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return 0
+
+    removed = 0
+    remaining = []
+    now = time.time()
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        if name.startswith(".tmp-"):
+            try:
+                stale = now - os.path.getmtime(path) > _TMP_MAX_AGE
+            except OSError:
+                continue
+            if stale:
+                shutil.rmtree(path, ignore_errors=True)
+            continue
+        if name == keep or not _ENTRY_PATTERN.match(name):
+            continue
+
+        meta_path = os.path.join(path, _META_FILE)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                entry_source = json.load(f).get("source")
+            last_used = os.path.getmtime(meta_path)
+        except (OSError, ValueError):
+            entry_source, last_used = None, 0.0
+
+        if not name.startswith(f"v{CACHE_VERSION}-") or (source and entry_source == source):
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        else:
+            remaining.append((last_used, path))
+
+    # Sisakan paling banyak max_entries entri (termasuk keep)
+    remaining.sort()
+    excess = len(remaining) + (1 if keep else 0) - max_entries
+    for _, path in remaining[:max(excess, 0)]:
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+
+    if removed:
+        logger.info("Cache: %d entri lama dihapus dari %s", removed, cache_dir)
+    return removed
+
+
+# Fungsi untuk memuat dan memproses workbook, memakai cache jika isi file tidak berubah
+@timed('workbook_load')
+def load_workbook(file_path, cache_dir=None, fingerprint=None):
+    """
+    Mengembalikan (frek_alat_df, persentase_data, sheet_names) untuk file_path.
+
+    Hasil parsing disimpan per sidik jari file (hash isi + mtime), sehingga start
+    berikutnya tidak perlu membaca Excel lagi, sedangkan file yang diganti dengan
+    nama yang sama otomatis diparsing ulang dan entri versi lamanya dihapus.
+    """
+    fingerprint = fingerprint or file_fingerprint(file_path)
+
+    cached = read_cache(fingerprint, cache_dir)
+    if cached is not None:
+        return cached
+
+    sheets = load_excel(file_path)
+
+    frek_alat_df = None
+    if SHEET_FREK_ALAT in sheets:
+        frek_alat_df = process_frek_alat_data(sheets[SHEET_FREK_ALAT])
+    if frek_alat_df is not None:
+        frek_alat_df = normalize_frame(frek_alat_df)
+    persentase_data = process_referensi_data(sheets)
+    sheet_names = list(sheets.keys())
+
+    write_cache(fingerprint, frek_alat_df, persentase_data, sheet_names, cache_dir, source=file_path)
+    evict_stale_entries(cache_dir, keep=fingerprint, source=file_path)
+
+    return frek_alat_df, persentase_data, sheet_names
@@ -0,0 +1,198 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .cache import CACHE_DIR, file_fingerprint, load_workbook
+from .constants import LOOKUP_KEYS, TARIF_COLUMNS
+from .filtering import _filter_value
+from .loader import find_excel_files
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Lokasi database katalog tarif gabungan (dapat diubah lewat environment variable)
+CATALOG_PATH = os.environ.get("DENDA_CATALOG_PATH", os.path.join(CACHE_DIR, "catalog.sqlite"))
+
+# Kolom FREK & ALAT yang disimpan di katalog; kolom yang tidak ada di workbook diisi NULL
+CATALOG_COLUMNS = LOOKUP_KEYS + ['JML BULAN'] + TARIF_COLUMNS
+
+_NUMERIC_CATALOG_COLUMNS = {'ZONA', 'MAKS POIN', 'INDEKS PELANGGARAN PERTAMA', 'INDEKS PELANGGARAN BERULANG',
+                            '%', 'TOTAL POIN', 'TARIF DENDA', 'DENDA'}
+
+
+# Fungsi bantu untuk mengutip nama kolom SQL (nama kolom berisi spasi dan '%')
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+# Fungsi untuk membuka katalog dan memastikan tabel serta indeks sudah ada
+def connect_catalog(catalog_path=None):
+    catalog_path = catalog_path or CATALOG_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(catalog_path)), exist_ok=True)
+
+    conn = sqlite3.connect(catalog_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    columns = ", ".join(
+        f"{_quote(column)} {'REAL' if column in _NUMERIC_CATALOG_COLUMNS else 'TEXT'}"
+        for column in CATALOG_COLUMNS
+    )
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS sources (
+            source TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            rows INTEGER NOT NULL,
+            persentase_data TEXT NOT NULL,
+            sheet_names TEXT NOT NULL,
+            ingested_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tariffs (
+            source TEXT NOT NULL,
+            version TEXT NOT NULL,
+            row_number INTEGER NOT NULL,
+            {columns}
+        );
+        CREATE INDEX IF NOT EXISTS idx_tariffs_source ON tariffs (source, version);
+        CREATE INDEX IF NOT EXISTS idx_tariffs_lookup ON tariffs ({", ".join(_quote(key) for key in LOOKUP_KEYS)});
+    """)
+    # Indeks per dimensi untuk pencarian parsial (sebagian filter "Semua")
+    for key in LOOKUP_KEYS:
+        name = "idx_tariffs_" + key.lower().replace(" ", "_")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON tariffs ({_quote(key)})")
+    conn.commit()
+    return conn
+
+
+# Fungsi bantu untuk menyimpan ulang semua baris satu workbook dalam satu transaksi
+def _replace_source(conn, source, version, stat, frek_alat_df, persentase_data, sheet_names):
+    rows = []
+    if frek_alat_df is not None:
+        frame = frek_alat_df.reindex(columns=CATALOG_COLUMNS)
+        values = frame.astype(object).where(frame.notna(), None)
+        rows = [(source, version, number) + tuple(row)
+                for number, row in enumerate(values.itertuples(index=False, name=None))]
+
+    placeholders = ", ".join("?" * (3 + len(CATALOG_COLUMNS)))
+    insert_columns = ", ".join(["source", "version", "row_number"] + [_quote(column) for column in CATALOG_COLUMNS])
+
+    with conn:
+        conn.execute("DELETE FROM tariffs WHERE source = ?", (source,))
+        conn.executemany(f"INSERT INTO tariffs ({insert_columns}) VALUES ({placeholders})", rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, version, stat.st_size, stat.st_mtime_ns, len(rows),
+             json.dumps(persentase_data), json.dumps(list(sheet_names)),
+             datetime.now(timezone.utc).isoformat()),
+        )
+    return len(rows)
+
+
+# Fungsi untuk memasukkan semua workbook di folder Data ke katalog secara inkremental
+@timed('catalog_ingest')
+def ingest_folder(data_folder="Data", catalog_path=None, cache_dir=None):
+    """
+    Menyamakan katalog dengan isi data_folder.
+
+    Workbook yang ukuran dan mtime-nya sama dengan catatan terakhir dilewati
+    tanpa dibaca. Workbook baru atau yang berubah diparsing (lewat cache parsing)
+    lalu barisnya diganti dalam satu transaksi; workbook yang sudah dihapus dari
+    folder ikut dihapus dari katalog. Mengembalikan ringkasan per kategori.
+    """
+    summary = {'ingested': [], 'skipped': [], 'removed': [], 'failed': []}
+
+    with closing(connect_catalog(catalog_path)) as conn:
+        known = {source: (size, mtime_ns) for source, size, mtime_ns in
+                 conn.execute("SELECT source, size, mtime_ns FROM sources")}
+
+        sources = []
+        for file_path in find_excel_files(data_folder):
+            source = os.path.normpath(file_path)
+            sources.append(source)
+            stat = os.stat(file_path)
+            if known.get(source) == (stat.st_size, stat.st_mtime_ns):
+                summary['skipped'].append(source)
+                continue
+
+            try:
+                version = file_fingerprint(file_path)
+                frek_alat_df, persentase_data, sheet_names = load_workbook(file_path, cache_dir, version)
+                rows = _replace_source(conn, source, version, stat, frek_alat_df, persentase_data, sheet_names)
+                logger.info("Katalog: %s dimuat (%d baris tarif)", source, rows)
+                summary['ingested'].append(source)
+            except Exception as e:
+                logger.error("Katalog: %s gagal dimuat: %s", source, e)
+                summary['failed'].append(source)
+
+        for source in set(known) - set(sources):
+            with conn:
+                conn.execute("DELETE FROM tariffs WHERE source = ?", (source,))
+                conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+            summary['removed'].append(source)
+
+        # Perbarui statistik indeks agar SQLite memilih indeks yang paling selektif
+        if summary['ingested'] or summary['removed']:
+            conn.execute("ANALYZE")
+
+    return summary
+
+
+# Fungsi untuk mencari baris tarif di seluruh workbook katalog berdasarkan filter
+@timed('catalog_query')
+def query_catalog(filters, catalog_path=None, sources=None):
+    """
+    filters sama seperti filter_data ({kolom: nilai}, "Semua" = tanpa filter).
+    Mengembalikan DataFrame dengan kolom source dan version di depan kolom tarif,
+    terurut per workbook lalu urutan baris aslinya.
+    """
+    conditions, params = [], []
+    for column, value in filters.items():
+        if column in CATALOG_COLUMNS and value and value != "Semua":
+            value = _filter_value(column, value)
+            if value is None:
+                continue
+            conditions.append(f"{_quote(column)} = ?")
+            params.append(value)
+    if sources:
+        conditions.append(f"source IN ({', '.join('?' * len(sources))})")
+        params.extend(sources)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    columns = ", ".join(["source", "version"] + [_quote(column) for column in CATALOG_COLUMNS])
+    sql = f"SELECT {columns} FROM tariffs {where} ORDER BY source, row_number"
+
+    with closing(connect_catalog(catalog_path)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+# Fungsi untuk menampilkan daftar workbook yang ada di katalog
+def catalog_sources(catalog_path=None):
+    with closing(connect_catalog(catalog_path)) as conn:
+        return pd.read_sql_query(
+            "SELECT source, version, rows, ingested_at FROM sources ORDER BY source", conn
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gabungkan semua workbook tarif ke katalog SQLite.")
+    parser.add_argument("--data-folder", default="Data")
+    parser.add_argument("--catalog", default=None, help=f"File katalog (default {CATALOG_PATH})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    summary = ingest_folder(args.data_folder, args.catalog)
+    logger.info("Selesai: %d dimuat, %d tidak berubah, %d dihapus, %d gagal",
+                len(summary['ingested']), len(summary['skipped']), len(summary['removed']),
+                len(summary['failed']))
+
+
+if __name__ == "__main__":
+    main()
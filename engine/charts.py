@@ -0,0 +1,117 @@
+from functools import lru_cache
+
+from .metrics import timed
+
+# Urutan komponen sesuai alur perhitungan
+KOMPONEN = ['Indeks Pelanggaran', '% Faktor', 'MAKS POIN', 'TOTAL POIN', 'TARIF DENDA', 'DENDA',
+            'Jumlah Frekuensi', 'Jumlah Perangkat']
+
+# Label node diagram Sankey beserta sumber dan tujuan setiap aliran
+SANKEY_LABELS = ['Indeks', 'Persentase', 'MAKS POIN', 'TOTAL POIN', 'TARIF DENDA', 'DENDA',
+                 'Jumlah Frekuensi', 'Jumlah Perangkat', 'TOTAL TAGIHAN DENDA']
+SANKEY_SOURCE = [0, 1, 2, 3, 4, 5, 6, 7]
+SANKEY_TARGET = [3, 3, 3, 5, 5, 8, 8, 8]
+
+# Jumlah kombinasi hasil yang grafiknya disimpan per jenis grafik
+CHART_CACHE_SIZE = 256
+
+
+# Fungsi untuk menyusun kunci grafik dari hasil perhitungan (urutan sama dengan KOMPONEN)
+def chart_key(hasil_perhitungan, jumlah_frekuensi, jumlah_perangkat):
+    return tuple(float(hasil_perhitungan[name]) for name in
+                 ('indeks', 'persentase', 'maks_poin', 'total_poin', 'tarif_denda', 'denda')) + \
+        (float(jumlah_frekuensi), float(jumlah_perangkat))
+
+
+# Fungsi untuk membuat grafik batang komponen perhitungan (JSON Plotly)
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+@timed('chart_bar')
+def component_bar_json(key):
+    import plotly.graph_objects as go
+
+    # Satu trace per komponen agar setiap komponen punya warna dan legenda sendiri
+    fig = go.Figure([go.Bar(x=[name], y=[value], name=name) for name, value in zip(KOMPONEN, key)])
+    fig.update_layout(title_text='Komponen Perhitungan Denda', xaxis_title='Komponen', yaxis_title='Nilai',
+                      legend_title_text='Komponen', barmode='relative')
+    fig.update_xaxes(categoryorder='array', categoryarray=KOMPONEN)
+    return fig.to_json()
+
+
+# Fungsi untuk membuat grafik pie proporsi komponen dalam hasil akhir (JSON Plotly)
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+@timed('chart_pie')
+def proportion_pie_json(key):
+    import plotly.graph_objects as go
+
+    _, _, _, total_poin, tarif_denda, _, jumlah_frekuensi, jumlah_perangkat = key
+    names = ['TOTAL POIN', 'TARIF DENDA', 'Jumlah Frekuensi', 'Jumlah Perangkat']
+    values = [total_poin, tarif_denda, jumlah_frekuensi, jumlah_perangkat]
+
+    # Hitung total nilai untuk proporsi
+    total_prop = sum(values)
+    proporsi = [value / total_prop if total_prop > 0 else 0 for value in values]
+
+    fig = go.Figure([go.Pie(labels=names, values=proporsi)])
+    fig.update_layout(title_text='Proporsi Komponen dalam Perhitungan')
+    return fig.to_json()
+
+
+# Fungsi untuk membuat diagram Sankey alur perhitungan (JSON Plotly)
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+@timed('chart_sankey')
+def sankey_json(key):
+    import plotly.graph_objects as go
+
+    # Normalkan nilai untuk visualisasi yang lebih baik
+    max_value = max(key) if max(key) > 0 else 1
+    normalized_values = [value / max_value * 100 for value in key]
+
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=SANKEY_LABELS,
+            color="blue"
+        ),
+        link=dict(
+            source=SANKEY_SOURCE,
+            target=SANKEY_TARGET,
+            value=normalized_values
+        )
+    )])
+    fig.update_layout(title_text="Alur Perhitungan Denda", font_size=10)
+    return fig.to_json()
+
+
+# Fungsi untuk menyusun kunci grafik faktur gabungan: pasangan (label, DENDA, TOTAL TAGIHAN DENDA) per baris
+def invoice_chart_key(labels, denda, total_tagihan_denda):
+    return tuple(zip(map(str, labels), map(float, denda), map(float, total_tagihan_denda)))
+
+
+# Fungsi untuk membuat grafik batang DENDA dan TOTAL TAGIHAN DENDA per baris faktur (JSON Plotly)
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+@timed('chart_invoice_bar')
+def invoice_bar_json(key):
+    import plotly.graph_objects as go
+
+    labels, denda, total_tagihan_denda = zip(*key) if key else ((), (), ())
+    fig = go.Figure([
+        go.Bar(x=list(labels), y=list(denda), name='DENDA'),
+        go.Bar(x=list(labels), y=list(total_tagihan_denda), name='TOTAL TAGIHAN DENDA'),
+    ])
+    fig.update_layout(title_text='Tagihan per Baris Tarif', xaxis_title='Baris Tarif', yaxis_title='Rp',
+                      barmode='group')
+    return fig.to_json()
+
+
+# Fungsi untuk membuat grafik pie porsi setiap baris dalam total faktur (JSON Plotly)
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+@timed('chart_invoice_pie')
+def invoice_pie_json(key):
+    import plotly.graph_objects as go
+
+    labels, _, total_tagihan_denda = zip(*key) if key else ((), (), ())
+    fig = go.Figure([go.Pie(labels=list(labels), values=list(total_tagihan_denda))])
+    fig.update_layout(title_text='Porsi Baris Tarif dalam Total Tagihan')
+    return fig.to_json()
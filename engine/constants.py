@@ -0,0 +1,56 @@
+# Konstanta untuk nilai maksimum poin berdasarkan jenis izin
+MAKS_POIN_DEFAULT = {
+    "IPFR": 600000,
+    "ISR": 7000,
+    "APT": 5000
+}
+
+# Default persentase berdasarkan JML BULAN jika sheet Referensi tidak tersedia
+PERSENTASE_DEFAULT = {"0-12": 1.0, "13-24": 0.5, ">25": 0.25}
+
+# Jenis pelanggaran yang didukung
+JENIS_PELANGGARAN = ["Pelanggaran Pertama", "Pelanggaran Berulang"]
+
+# Nama sheet yang dipakai aplikasi
+SHEET_FREK_ALAT = 'FREK & ALAT'
+SHEET_REFERENSI = 'Referensi'
+
+# Sheet yang dibaca dari workbook; sheet lain dilewati
+REQUIRED_SHEETS = [SHEET_FREK_ALAT, SHEET_REFERENSI]
+
+# Nilai yang menandai baris header pada sheet FREK & ALAT
+HEADER_VALUES = ["DINAS", "KATEGORI", "BAND"]
+
+# Sheet yang baris sebelum header-nya dapat dilewati saat streaming
+SHEET_HEADERS = {SHEET_FREK_ALAT: HEADER_VALUES}
+
+# Kolom numerik pada sheet FREK & ALAT
+NUMERIC_COLUMNS = ['ZONA', 'MAKS POIN', 'INDEKS PELANGGARAN PERTAMA', 'INDEKS PELANGGARAN BERULANG',
+                   '%', 'TOTAL POIN', 'TARIF DENDA', 'DENDA',
+                   'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT']
+
+# Kunci DataFrame.attrs tabel FREK & ALAT: {kolom: {label baris: teks asli}} untuk sel numerik yang bukan angka
+RAW_VALUES_ATTR = 'nilai_asli'
+
+# Kolom kunci untuk mencocokkan kasus dengan baris tarif FREK & ALAT
+LOOKUP_KEYS = ['JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'ZONA']
+
+# Kolom tarif yang dibawa dari FREK & ALAT ke hasil perhitungan massal
+TARIF_COLUMNS = ['MAKS POIN', 'INDEKS PELANGGARAN PERTAMA', 'INDEKS PELANGGARAN BERULANG',
+                 '%', 'TOTAL POIN', 'TARIF DENDA', 'DENDA', 'SATUAN PELANGGARAN']
+
+# Kolom hasil yang ditambahkan price_cases di belakang kolom kasus dan kolom tarif
+RESULT_COLUMNS = ['DATA TARIF DITEMUKAN', 'INDEKS YANG DIGUNAKAN', 'PERSENTASE', 'TOTAL TAGIHAN DENDA',
+                  'DENDA (SEN)', 'TOTAL TAGIHAN DENDA (SEN)', 'STATUS PERHITUNGAN']
+
+# Kolom tarif yang dibutuhkan calculate_denda_frame untuk menghitung DENDA
+PRICING_COLUMNS = ['JENIS IZIN', 'MAKS POIN', 'INDEKS PELANGGARAN PERTAMA', 'INDEKS PELANGGARAN BERULANG', '%',
+                   'TARIF DENDA', 'TOTAL POIN', 'DENDA']
+
+# Kolom status per baris hasil perhitungan tabel, dan nilainya untuk baris yang berhasil dihitung
+STATUS_COLUMN = 'STATUS PERHITUNGAN'
+STATUS_OK = 'OK'
+
+# Kolom yang diharapkan pada file daftar kasus untuk perhitungan massal
+CASE_COLUMNS = ['JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'ZONA', 'JML BULAN',
+                'JENIS PELANGGARAN', 'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT']
@@ -0,0 +1,148 @@
+import importlib.util
+import logging
+from io import BytesIO
+
+import pandas as pd
+
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Nama sheet hasil pada file Excel
+SHEET_HASIL = 'Hasil Perhitungan'
+
+# Jumlah baris yang dikonversi sekaligus saat menulis file secara streaming
+EXPORT_CHUNK_ROWS = 50_000
+
+# Jumlah baris maksimum satu sheet Excel (termasuk header)
+EXCEL_MAX_ROWS = 1_048_576
+
+
+# Fungsi bantu untuk memecah DataFrame menjadi potongan; iterable potongan diteruskan apa adanya
+def _as_chunks(data, chunk_size):
+    if isinstance(data, pd.DataFrame):
+        if data.empty:
+            yield data
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+    else:
+        yield from data
+
+
+# Fungsi bantu untuk menyamakan kolom setiap potongan dengan kolom potongan pertama (header file)
+def _aligned_chunks(chunks):
+    columns = None
+    for chunk in chunks:
+        if columns is None:
+            columns = chunk.columns
+        elif not chunk.columns.equals(columns):
+            chunk = chunk.reindex(columns=columns)
+        yield chunk
+
+
+# Fungsi bantu untuk mengubah potongan DataFrame menjadi baris bertipe Python (NaN -> None)
+def _native_rows(chunk):
+    values = chunk.astype(object)
+    return values.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+# Fungsi untuk menghasilkan isi CSV per potongan (bytes), header hanya di potongan pertama
+def iter_csv_chunks(data, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Header diambil dari potongan pertama; potongan berikutnya disusun ulang ke
+    kolom yang sama (kolom yang tidak ada diisi kosong, kolom tambahan dibuang)
+    agar setiap baris CSV sejajar dengan header.
+    """
+    first = True
+    for chunk in _aligned_chunks(_as_chunks(data, chunk_size)):
+        yield chunk.to_csv(index=False, header=first).encode('utf-8')
+        first = False
+
+
+# Fungsi untuk menulis DataFrame atau iterable potongan DataFrame ke file CSV secara streaming
+@timed('export_csv_write')
+def write_csv(data, output, chunk_size=EXPORT_CHUNK_ROWS):
+    with open(output, 'wb') as f:
+        for block in iter_csv_chunks(data, chunk_size):
+            f.write(block)
+
+
+# Fungsi untuk menulis DataFrame atau iterable potongan DataFrame ke Excel dengan memori konstan
+@timed('export_excel_write')
+def write_excel(data, output, sheet_name=SHEET_HASIL, chunk_size=EXPORT_CHUNK_ROWS, max_rows=EXCEL_MAX_ROWS):
+    """
+    Menulis hasil ke .xlsx dengan mode constant_memory xlsxwriter: setiap baris
+    ditulis lalu di-flush ke file sementara, sehingga pemakaian memori tidak
+    bergantung pada jumlah baris. output boleh berupa path atau BytesIO.
+    Seperti iter_csv_chunks, kolom mengikuti potongan pertama.
+
+    Jika satu sheet penuh (max_rows baris termasuk header), penulisan berlanjut
+    di sheet baru "<sheet_name> (2)", "<sheet_name> (3)", dst. dengan header yang
+    sama. Mengembalikan jumlah sheet yang ditulis.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        sheet_count, row_number, header = 1, 0, None
+        for chunk in _aligned_chunks(_as_chunks(data, chunk_size)):
+            if header is None:
+                header = [str(column) for column in chunk.columns]
+                _write_row(worksheet, 0, header)
+                row_number = 1
+            for values in _native_rows(chunk):
+                if row_number >= max_rows:
+                    sheet_count += 1
+                    worksheet = workbook.add_worksheet(f"{sheet_name} ({sheet_count})")
+                    _write_row(worksheet, 0, header)
+                    row_number = 1
+                _write_row(worksheet, row_number, values)
+                row_number += 1
+    finally:
+        workbook.close()
+    return sheet_count
+
+
+# Fungsi bantu untuk menulis satu baris Excel; xlsxwriter hanya mengembalikan kode error (tidak raise)
+def _write_row(worksheet, row_number, values):
+    if worksheet.write_row(row_number, 0, values) < 0:
+        raise ValueError(f"Baris {row_number + 1} tidak dapat ditulis ke sheet Excel {worksheet.name!r}")
+
+
+# Fungsi untuk memeriksa apakah ada engine Excel yang terpasang
+def excel_available():
+    return any(importlib.util.find_spec(name) is not None for name in ('xlsxwriter', 'openpyxl'))
+
+
+# Fungsi untuk mengonversi dataframe ke CSV (alternatif Excel untuk menghindari dependensi xlsxwriter)
+@timed('export_csv')
+def to_csv(df):
+    return b''.join(iter_csv_chunks(df))
+
+
+# Coba fungsi untuk mengonversi dataframe ke Excel
+@timed('export_excel')
+def to_excel(df):
+    try:
+        # Coba dengan xlsxwriter (mode constant_memory)
+        output = BytesIO()
+        write_excel(df, output)
+        return output.getvalue(), True
+    except ImportError:
+        try:
+            # Jika xlsxwriter tidak ada, coba dengan openpyxl
+            output = BytesIO()
+            with pd.ExcelWriter(output, engine='openpyxl') as writer:
+                df.to_excel(writer, sheet_name=SHEET_HASIL, index=False)
+            output.seek(0)
+            return output.getvalue(), True
+        except ImportError:
+            # Jika kedua engine tidak ada, kembalikan None
+            return None, False
+        except Exception as e:
+            logger.error("Error saat membuat file Excel: %s", e)
+            return None, False
+    except Exception as e:
+        logger.error("Error saat membuat file Excel: %s", e)
+        return None, False
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from .constants import JENIS_PELANGGARAN, LOOKUP_KEYS, PRICING_COLUMNS
+from .fixedpoint import SEN, from_fixed
+from .metrics import timed
+from .parsing import lookup_percentages
+from .pricing import calculate_denda_frame
+from .unitfines import slot_positions
+
+# Dimensi pengelompokan laporan eksposur
+EXPOSURE_DIMENSIONS = LOOKUP_KEYS
+
+
+# Fungsi untuk menghitung DENDA setiap baris tarif untuk semua jenis pelanggaran dan bracket JML BULAN
+def exposure_frame(frek_alat_df, persentase_data, dimensions=EXPOSURE_DIMENSIONS, unit_fines=None):
+    """
+    Mengembalikan tabel panjang berisi satu baris per (baris tarif, jenis
+    pelanggaran, bracket JML BULAN) dengan kolom dimensi dan DENDA untuk satu
+    frekuensi dan satu perangkat. Setiap kombinasi dihitung untuk seluruh tabel
+    sekaligus dengan aturan calculate_denda_frame.
+
+    Dengan unit_fines dari store tarif (sejajar dengan baris frek_alat_df), DENDA
+    setiap kombinasi cukup diambil dari DENDA satuan yang sudah dihitung.
+    """
+    dimensions = [column for column in dimensions if column in frek_alat_df.columns]
+    pricing_columns = [column for column in PRICING_COLUMNS
+                       if column in frek_alat_df.columns and column not in dimensions]
+    base_df = frek_alat_df[dimensions + pricing_columns]
+
+    # Persentase bracket dengan aturan yang sama seperti perhitungan kasus (persentase kosong -> default)
+    brackets = list(persentase_data)
+    percentages = lookup_percentages(persentase_data, brackets)
+
+    parts = []
+    for j, jenis_pelanggaran in enumerate(JENIS_PELANGGARAN):
+        for jml_bulan, persentase in zip(brackets, percentages):
+            slot = slot_positions(unit_fines, [persentase])[0] if unit_fines is not None else -1
+            if slot >= 0:
+                # Baris yang DENDA satuannya overflow kosong (NaN), sama seperti calculate_denda_frame
+                denda = np.where(unit_fines.overflow[j, slot], np.nan, from_fixed(unit_fines.denda[j, slot], SEN))
+            else:
+                denda = calculate_denda_frame(base_df, 1, 1, persentase, jenis_pelanggaran)['DENDA'].to_numpy()
+            parts.append(base_df[dimensions].assign(**{
+                'JENIS PELANGGARAN': jenis_pelanggaran,
+                'JML BULAN': jml_bulan,
+                'DENDA': denda,
+            }))
+
+    return pd.concat(parts, ignore_index=True)
+
+
+# Fungsi untuk menyusun laporan eksposur denda per kelompok dimensi
+@timed('exposure_report')
+def exposure_report(frek_alat_df, persentase_data, dimensions=EXPOSURE_DIMENSIONS, unit_fines=None):
+    """
+    Menjumlahkan dan meringkas distribusi DENDA per kelompok dimensi (default
+    JENIS IZIN, DINAS, KATEGORI, BAND, ZONA) untuk setiap jenis pelanggaran dan
+    bracket JML BULAN dengan satu groupby atas seluruh tabel.
+
+    PROPORSI adalah bagian TOTAL DENDA kelompok terhadap total seluruh tabel
+    pada jenis pelanggaran dan bracket yang sama. unit_fines: lihat exposure_frame.
+    """
+    dimensions = [column for column in dimensions if column in frek_alat_df.columns]
+    long_df = exposure_frame(frek_alat_df, persentase_data, dimensions, unit_fines)
+
+    group_columns = dimensions + ['JENIS PELANGGARAN', 'JML BULAN']
+    report = long_df.groupby(group_columns, observed=True, dropna=False, sort=True)['DENDA'].agg(
+        **{
+            'JUMLAH TARIF': 'size',
+            'TOTAL DENDA': 'sum',
+            'RATA-RATA DENDA': 'mean',
+            'MIN DENDA': 'min',
+            'MEDIAN DENDA': 'median',
+            'MAKS DENDA': 'max',
+        }
+    ).reset_index()
+
+    totals = report.groupby(['JENIS PELANGGARAN', 'JML BULAN'], sort=False)['TOTAL DENDA'].transform('sum')
+    report['PROPORSI'] = (report['TOTAL DENDA'] / totals.where(totals != 0)).fillna(0.0)
+
+    return report
+
+
+# Fungsi untuk meringkas laporan eksposur menjadi total per jenis pelanggaran x bracket JML BULAN
+def exposure_summary(report):
+    return report.pivot_table(index='JENIS PELANGGARAN', columns='JML BULAN', values='TOTAL DENDA',
+                              aggfunc='sum', sort=False)
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from .constants import MAKS_POIN_DEFAULT
+
+# Urutan kaskade filter di sidebar
+FACET_COLUMNS = ['DINAS', 'KATEGORI', 'BAND', 'ZONA']
+
+SEMUA = "Semua"
+
+
+# Fungsi bantu untuk menampilkan ZONA sebagai teks ("1", bukan "1.0")
+def _format_zona(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Fungsi bantu untuk mengurutkan pilihan dan menambahkan "Semua" di depan
+def _options(values, key=None):
+    return [SEMUA] + sorted(values, key=key)
+
+
+# Fungsi untuk membangun pohon pilihan filter (sekali per workbook yang dimuat)
+def build_facet_tree(df):
+    """
+    Menyiapkan semua pilihan dropdown sidebar dari tabel FREK & ALAT.
+
+    Pilihan KATEGORI bergantung pada DINAS, BAND pada (DINAS, KATEGORI) dan ZONA
+    pada (DINAS, KATEGORI, BAND); "Semua" pada level mana pun berarti tanpa filter
+    di level itu. Setiap daftar sudah terurut dan diawali "Semua", dan ZONA sudah
+    berupa teks, sehingga sidebar cukup membaca dict tanpa memindai tabel.
+    """
+    columns = {column: df[column] if column in df.columns else pd.Series(index=df.index, dtype=object)
+               for column in FACET_COLUMNS}
+    combos = pd.DataFrame(columns).drop_duplicates()
+
+    kategori, band, zona = {}, {}, {}
+    for dinas_value, kategori_value, band_value, zona_value in combos.itertuples(index=False, name=None):
+        dinas_keys = [SEMUA] if pd.isna(dinas_value) else [dinas_value, SEMUA]
+        kategori_keys = [SEMUA] if pd.isna(kategori_value) else [kategori_value, SEMUA]
+        band_keys = [SEMUA] if pd.isna(band_value) else [band_value, SEMUA]
+
+        for d in dinas_keys:
+            if not pd.isna(kategori_value):
+                kategori.setdefault(d, set()).add(kategori_value)
+            for k in kategori_keys:
+                if not pd.isna(band_value):
+                    band.setdefault((d, k), set()).add(band_value)
+                for b in band_keys:
+                    if not pd.isna(zona_value):
+                        zona.setdefault((d, k, b), set()).add(zona_value)
+
+    # JENIS IZIN dari data ditambah IPFR, ISR, APT jika belum ada
+    jenis_izin = set(MAKS_POIN_DEFAULT)
+    if 'JENIS IZIN' in df.columns:
+        jenis_izin.update(str(value).strip().upper() for value in df['JENIS IZIN'].dropna().unique())
+
+    return {
+        'jenis_izin': _options(jenis_izin),
+        'dinas': _options(columns['DINAS'].dropna().unique()),
+        'kategori': {key: _options(values) for key, values in kategori.items()},
+        'band': {key: _options(values) for key, values in band.items()},
+        'zona': {key: [SEMUA] + [_format_zona(value) for value in sorted(values)] for key, values in zona.items()},
+    }
+
+
+# Fungsi untuk membaca pilihan satu level dari pohon berdasarkan pilihan level di atasnya
+def facet_options(tree, column, dinas=SEMUA, kategori=SEMUA, band=SEMUA):
+    if column == 'JENIS IZIN':
+        return tree['jenis_izin']
+    if column == 'DINAS':
+        return tree['dinas']
+    if column == 'KATEGORI':
+        return tree['kategori'].get(dinas, [SEMUA])
+    if column == 'BAND':
+        return tree['band'].get((dinas, kategori), [SEMUA])
+    if column == 'ZONA':
+        return tree['zona'].get((dinas, kategori, band), [SEMUA])
+    raise KeyError(column)
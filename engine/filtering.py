@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from .constants import LOOKUP_KEYS
+from .metrics import timed
+
+_NO_ROWS = np.empty(0, dtype=np.intp)
+
+
+# Fungsi untuk membangun indeks pencarian baris tarif (sekali saat data dimuat)
+def build_lookup_index(df, keys=LOOKUP_KEYS):
+    """
+    Membangun indeks hash atas kolom kunci df.
+
+    'exact' memetakan tuple nilai semua kunci ke posisi baris, sehingga pencarian
+    lengkap cukup satu akses dict. 'columns' memetakan nilai per kolom ke posisi
+    baris untuk pencarian parsial (sebagian filter "Semua"); posisi dari beberapa
+    kolom cukup diiriskan tanpa memindai tabel. Semua posisi terurut naik.
+    """
+    keys = [key for key in keys if key in df.columns]
+    if not keys:
+        return {'keys': [], 'exact': {}, 'columns': {}}
+
+    exact = df.groupby(keys, sort=False, dropna=False, observed=True).indices
+    if len(keys) == 1:
+        exact = {(value,): positions for value, positions in exact.items()}
+
+    return {
+        'keys': keys,
+        'exact': exact,
+        'columns': {key: df.groupby(key, sort=False, observed=True).indices for key in keys},
+    }
+
+
+# Fungsi bantu untuk menyesuaikan nilai filter dengan tipe data kolom (ZONA berupa angka)
+def _filter_value(column, value):
+    if column == 'ZONA' and isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return value
+
+
+# Fungsi untuk mencari posisi baris yang cocok dengan filter menggunakan indeks
+def lookup_positions(index, filters):
+    active = {}
+    for column, value in filters.items():
+        if column in index['keys'] and value and value != "Semua":
+            value = _filter_value(column, value)
+            if value is not None:
+                active[column] = value
+
+    if not active:
+        return None
+
+    # Semua kunci terisi: satu akses dict
+    if len(active) == len(index['keys']):
+        return index['exact'].get(tuple(active[key] for key in index['keys']), _NO_ROWS)
+
+    # Sebagian kunci: iriskan posisi per kolom, mulai dari yang paling sedikit
+    candidates = [index['columns'][column].get(value, _NO_ROWS) for column, value in active.items()]
+    candidates.sort(key=len)
+    positions = candidates[0]
+    for other in candidates[1:]:
+        if not len(positions):
+            break
+        positions = np.intersect1d(positions, other, assume_unique=True)
+    return positions
+
+
+# Fungsi untuk memfilter data berdasarkan kriteria
+@timed('filtering')
+def filter_data(df, filters, index=None):
+    # Pastikan df adalah DataFrame
+    if not isinstance(df, pd.DataFrame):
+        return pd.DataFrame()
+
+    # Gunakan indeks yang sudah dibangun untuk kolom kunci, tanpa menyalin tabel
+    if index is not None:
+        positions = lookup_positions(index, filters)
+        filtered_df = df if positions is None else df.iloc[positions]
+        filters = {column: value for column, value in filters.items() if column not in index['keys']}
+    else:
+        filtered_df = df.copy()
+
+    # Terapkan filter
+    for column, value in filters.items():
+        if column in filtered_df.columns and value and value != "Semua":
+            if column == 'ZONA' and isinstance(value, str) and value != "Semua":
+                try:
+                    filtered_df = filtered_df[filtered_df[column] == int(value)]
+                except (TypeError, ValueError):
+                    pass
+            else:
+                filtered_df = filtered_df[filtered_df[column] == value]
+
+    return filtered_df
@@ -0,0 +1,197 @@
+import math
+
+import numpy as np
+
+# Skala fixed-point: setiap nilai disimpan sebagai int64 = nilai * skala
+INDEKS_SCALE = 10 ** 8     # INDEKS PELANGGARAN dengan 8 desimal (0.00285 -> 285000)
+PERSEN_SCALE = 10_000      # persentase dalam basis poin (0.33 -> 3300)
+POIN_SCALE = 10_000        # MAKS POIN dan TOTAL POIN dengan 4 desimal
+SEN = 100                  # uang dalam sen (Rp 1 = 100 sen)
+
+# Batas aman hasil perkalian int64 sebelum dibagi (menyisakan ruang untuk pembulatan)
+_INT64_LIMIT = 2 ** 62
+
+# Basis pemecahan perkalian TOTAL POIN: _SPLIT ** 2 == INDEKS_SCALE * PERSEN_SCALE
+_SPLIT = math.isqrt(INDEKS_SCALE * PERSEN_SCALE)
+
+
+# Fungsi untuk mengubah nilai desimal menjadi int64 fixed-point (pembulatan setengah menjauhi nol)
+def to_fixed(values, scale):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64) * scale
+
+    scaled = values.astype(float) * scale
+    scaled = np.where(np.isnan(scaled), 0.0, scaled)
+    # Dorongan relatif kecil agar galat representasi float (0.00285 * 10000 = 28.4999...) tetap dibulatkan ke atas
+    magnitude = np.floor(np.abs(scaled) * (1 + 1e-12) + 0.5)
+    return np.copysign(magnitude, scaled).astype(np.int64)
+
+
+# Fungsi untuk mengubah satu nilai menjadi int fixed-point (aturan pembulatan sama dengan to_fixed)
+def to_fixed_scalar(value, scale):
+    if isinstance(value, (int, np.integer)):
+        return int(value) * scale
+    scaled = float(value) * scale
+    if math.isnan(scaled):
+        return 0
+    return int(math.copysign(math.floor(abs(scaled) * (1 + 1e-12) + 0.5), scaled))
+
+
+# Fungsi untuk mengubah int64 fixed-point kembali menjadi float
+def from_fixed(values, scale):
+    return np.asarray(values, dtype=np.int64) / scale
+
+
+# Fungsi untuk membagi bilangan bulat dengan pembulatan setengah menjauhi nol (seperti ROUND di Excel)
+def round_div(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=np.int64)
+    quotient = (np.abs(numerator) + denominator // 2) // denominator
+    return np.sign(numerator) * quotient
+
+
+# Versi skalar round_div untuk bilangan bulat Python
+def round_div_scalar(numerator, denominator):
+    quotient = (abs(numerator) + denominator // 2) // denominator
+    return quotient if numerator >= 0 else -quotient
+
+
+# Fungsi bantu untuk mengalikan array int64 sambil menandai elemen yang akan overflow
+def _masked_product(*factors):
+    """
+    Mengembalikan (hasil kali, mask overflow). Elemen yang hasil kalinya
+    melewati batas aman int64 ditandai True di mask dan bernilai 0 di hasil.
+    """
+    factors = [np.asarray(factor, dtype=np.int64) for factor in factors]
+    shape = np.broadcast_shapes(*(factor.shape for factor in factors))
+    overflow = np.zeros(shape, dtype=bool)
+
+    # Cek cepat dengan nilai maksimum; baru cek per elemen jika batas itu terlampaui
+    bound = 1.0
+    for factor in factors:
+        bound *= float(np.abs(factor).max()) if factor.size else 0.0
+    if bound >= _INT64_LIMIT:
+        magnitude = np.ones(shape)
+        for factor in factors:
+            magnitude = magnitude * np.abs(factor.astype(float))
+        overflow = magnitude >= _INT64_LIMIT
+        factors = [np.where(overflow, 0, factor) for factor in factors]
+
+    product = factors[0]
+    for factor in factors[1:]:
+        product = product * factor
+    return product, overflow
+
+
+# Fungsi bantu untuk menghitung round_div(a * b, _SPLIT ** 2) tanpa membentuk a * b yang bisa melewati int64
+def _masked_product_div(a, b):
+    """
+    a dan b dipecah menjadi digit basis _SPLIT sehingga setiap hasil kali parsial
+    muat di int64; pembulatan setengah menjauhi nol sama dengan round_div atas
+    hasil kali eksak. Mengembalikan (hasil, mask overflow) seperti _masked_product;
+    overflow jika |a * b| / _SPLIT melewati batas aman int64.
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64))
+    overflow = np.abs(a.astype(float)) * np.abs(b.astype(float)) >= float(_INT64_LIMIT) * _SPLIT
+    if overflow.any():
+        a = np.where(overflow, 0, a)
+        b = np.where(overflow, 0, b)
+
+    sign = np.sign(a) * np.sign(b)
+    a_high, a_low = np.divmod(np.abs(a), _SPLIT)
+    b_high, b_low = np.divmod(np.abs(b), _SPLIT)
+    middle = a_high * b_low + a_low * b_high
+    low = (middle % _SPLIT) * _SPLIT + a_low * b_low
+    quotient = a_high * b_high + middle // _SPLIT + (low + _SPLIT ** 2 // 2) // _SPLIT ** 2
+    return sign * quotient, overflow
+
+
+# Fungsi bantu untuk memastikan perkalian int64 tidak overflow
+def _checked_product(*factors):
+    product, overflow = _masked_product(*factors)
+    if overflow.any():
+        raise OverflowError("Nilai terlalu besar untuk perhitungan fixed-point int64")
+    return product
+
+
+# Fungsi untuk menghitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA per baris, menandai baris yang overflow
+def price_fixed_rows(indeks, persentase, maks_poin, tarif_denda, jumlah_frekuensi, jumlah_perangkat,
+                     total_poin=None, denda=None):
+    """
+    Sama dengan price_fixed, tetapi baris yang perkaliannya melewati batas int64
+    tidak menggagalkan seluruh perhitungan: baris itu bernilai 0 dan ditandai
+    True di mask overflow. Mengembalikan (total_poin, denda, total_tagihan_denda,
+    overflow).
+    """
+    # INDEKS * % muat di int64; perkalian dengan MAKS POIN dipecah agar skala indeks tidak memotong masukan
+    indeks_persentase, overflow_poin = _masked_product(indeks, persentase)
+    hitung_total_poin, overflow_maks = _masked_product_div(indeks_persentase, maks_poin)
+    overflow_poin = overflow_poin | overflow_maks
+    if total_poin is not None:
+        dari_data = total_poin > 0
+        hitung_total_poin = np.where(dari_data, total_poin, hitung_total_poin)
+        overflow_poin = overflow_poin & ~dari_data
+
+    hitung_denda, overflow_denda = _masked_product(hitung_total_poin, tarif_denda)
+    hitung_denda = round_div(hitung_denda, POIN_SCALE)
+    if denda is not None:
+        dari_data = denda > 0
+        hitung_denda = np.where(dari_data, denda, hitung_denda)
+        overflow_denda = overflow_denda & ~dari_data
+    overflow = overflow_poin | overflow_denda
+
+    total_tagihan_denda, overflow_tagihan = _masked_product(hitung_denda, jumlah_frekuensi, jumlah_perangkat)
+    overflow = overflow | overflow_tagihan
+
+    if overflow.any():
+        hitung_total_poin = np.where(overflow, 0, hitung_total_poin)
+        hitung_denda = np.where(overflow, 0, hitung_denda)
+        total_tagihan_denda = np.where(overflow, 0, total_tagihan_denda)
+    return hitung_total_poin, hitung_denda, total_tagihan_denda, overflow
+
+
+# Fungsi untuk menghitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA dengan aritmetika bilangan bulat
+def price_fixed(indeks, persentase, maks_poin, tarif_denda, jumlah_frekuensi, jumlah_perangkat,
+                total_poin=None, denda=None):
+    """
+    Semua argumen berupa array int64 fixed-point (indeks per INDEKS_SCALE,
+    persentase dalam basis poin, poin per POIN_SCALE, uang dalam sen) atau
+    jumlah bulat untuk frekuensi dan perangkat. Setiap langkah rumus dibulatkan
+    sekali, setengah menjauhi nol:
+
+    TOTAL POIN = INDEKS * % * MAKS POIN, dibulatkan ke 0,0001 poin
+    DENDA = TOTAL POIN * TARIF DENDA, dibulatkan ke sen
+    TOTAL TAGIHAN DENDA = DENDA * JUMLAH FREKUENSI * JUMLAH PERANGKAT (eksak)
+
+    total_poin/denda yang diberikan (nilai dari data) dipakai jika positif.
+    Mengembalikan (total_poin, denda, total_tagihan_denda) sebagai int64;
+    OverflowError jika ada baris yang melewati batas int64 (lihat price_fixed_rows).
+    """
+    total_poin, denda, total_tagihan_denda, overflow = price_fixed_rows(
+        indeks, persentase, maks_poin, tarif_denda, jumlah_frekuensi, jumlah_perangkat, total_poin, denda
+    )
+    if overflow.any():
+        raise OverflowError("Nilai terlalu besar untuk perhitungan fixed-point int64")
+    return total_poin, denda, total_tagihan_denda
+
+
+# Versi skalar price_fixed dengan bilangan bulat Python (perhitungan satu baris tanpa overhead array)
+def price_fixed_scalar(indeks, persentase, maks_poin, tarif_denda, jumlah_frekuensi, jumlah_perangkat,
+                       total_poin=0, denda=0):
+    """
+    Rumus dan pembulatan sama dengan price_fixed; semua argumen berupa int.
+    OverflowError jika hasil perkalian melewati batas yang sama dengan price_fixed.
+    """
+    def checked(*factors, limit=_INT64_LIMIT):
+        product = math.prod(factors)
+        if abs(product) >= limit:
+            raise OverflowError("Nilai terlalu besar untuk perhitungan fixed-point int64")
+        return product
+
+    if total_poin <= 0:
+        indeks_persentase = checked(indeks, persentase)
+        total_poin = round_div_scalar(checked(indeks_persentase, maks_poin, limit=_INT64_LIMIT * _SPLIT),
+                                      INDEKS_SCALE * PERSEN_SCALE)
+    if denda <= 0:
+        denda = round_div_scalar(checked(total_poin, tarif_denda), POIN_SCALE)
+    return total_poin, denda, checked(denda, jumlah_frekuensi, jumlah_perangkat)
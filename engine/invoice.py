@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from .constants import LOOKUP_KEYS, STATUS_COLUMN, STATUS_OK
+from .fixedpoint import SEN, from_fixed
+from .metrics import timed
+from .pricing import _POSISI_TARIF, _calculate_from_unit_fines, calculate_denda_frame
+
+# Kolom yang dipakai untuk memberi label baris faktur (tabel dan grafik)
+INVOICE_LABEL_COLUMNS = ['DINAS', 'KATEGORI', 'BAND', 'ZONA']
+
+# Jumlah baris tarif cocok yang ditawarkan untuk dipilih dalam satu faktur
+MAX_INVOICE_ROWS = 500
+
+
+# Fungsi untuk menghitung beberapa baris tarif terpilih sekaligus, masing-masing dengan jumlah frekuensi/perangkatnya
+@timed('invoice')
+def price_selection(selected_df, jumlah_frekuensi, jumlah_perangkat, persentase=1.0,
+                    jenis_pelanggaran="Pelanggaran Pertama", unit_fines=None):
+    """
+    jumlah_frekuensi dan jumlah_perangkat berupa array sepanjang selected_df
+    (atau skalar). Semua baris dihitung dalam satu operasi array: dengan
+    unit_fines dari store tarif, DENDA satuan diambil lewat indeks lalu dikalikan
+    jumlahnya; tanpa unit_fines dipakai calculate_denda_frame.
+
+    Label baris selected_df harus berupa posisi baris di tabel store (hasil
+    filter_data atau iloc dari frek_alat_df store). Urutan hasil sama dengan
+    urutan selected_df.
+    """
+    if unit_fines is not None:
+        priced_df = _calculate_from_unit_fines(
+            selected_df.assign(**{_POSISI_TARIF: selected_df.index.to_numpy()}),
+            unit_fines, jumlah_frekuensi, jumlah_perangkat, persentase, jenis_pelanggaran
+        )
+    else:
+        priced_df = calculate_denda_frame(selected_df, jumlah_frekuensi, jumlah_perangkat, persentase,
+                                          jenis_pelanggaran)
+
+    priced_df['JENIS PELANGGARAN'] = jenis_pelanggaran
+    return priced_df
+
+
+# Fungsi untuk membuat label singkat setiap baris faktur (nomor urut dan kolom kunci)
+def invoice_labels(priced_df):
+    columns = [column for column in INVOICE_LABEL_COLUMNS if column in priced_df.columns]
+    labels = pd.Series([f"{nomor}." for nomor in range(1, len(priced_df) + 1)], index=priced_df.index)
+    for column in columns:
+        labels = labels + ' ' + priced_df[column].astype(str).to_numpy()
+    return labels
+
+
+# Fungsi untuk menjumlahkan tagihan faktur per kelompok (eksak dalam sen)
+def invoice_subtotals(priced_df, dimensions=('JENIS IZIN', 'BAND')):
+    """
+    Mengembalikan satu baris per kelompok dimensions dengan JUMLAH BARIS,
+    JUMLAH FREKUENSI, JUMLAH PERANGKAT dan TOTAL TAGIHAN DENDA. Total dijumlahkan
+    dari TOTAL TAGIHAN DENDA (SEN) sehingga sama persis dengan total faktur.
+
+    Hanya baris dengan STATUS PERHITUNGAN OK yang dijumlahkan (baris gagal tidak
+    ikut total faktur). Tanpa kolom dimensi sama sekali, hasilnya satu baris total.
+    """
+    if STATUS_COLUMN in priced_df.columns:
+        priced_df = priced_df[priced_df[STATUS_COLUMN] == STATUS_OK]
+
+    aggregations = {
+        'JUMLAH BARIS': ('TOTAL TAGIHAN DENDA (SEN)', 'size'),
+        'JUMLAH FREKUENSI': ('JUMLAH FREKUENSI', 'sum'),
+        'JUMLAH PERANGKAT': ('JUMLAH PERANGKAT', 'sum'),
+        'TOTAL TAGIHAN DENDA (SEN)': ('TOTAL TAGIHAN DENDA (SEN)', 'sum'),
+    }
+    dimensions = [column for column in dimensions if column in priced_df.columns] or \
+        [column for column in LOOKUP_KEYS if column in priced_df.columns][:1]
+    if dimensions:
+        subtotals = priced_df.groupby(dimensions, observed=True, dropna=False, sort=True).agg(**aggregations)
+        subtotals = subtotals.reset_index()
+    else:
+        # groupby([]) tidak didukung pandas: seluruh faktur menjadi satu baris total
+        subtotals = pd.DataFrame({name: [priced_df[column].agg(func)] for name, (column, func) in aggregations.items()})
+    subtotals['TOTAL TAGIHAN DENDA'] = from_fixed(subtotals['TOTAL TAGIHAN DENDA (SEN)'].to_numpy(), SEN)
+    return subtotals
+
+
+# Fungsi untuk menghitung total faktur gabungan dalam rupiah (dijumlahkan dalam sen)
+def invoice_total(priced_df):
+    return int(np.asarray(priced_df['TOTAL TAGIHAN DENDA (SEN)'], dtype=np.int64).sum()) / SEN
@@ -0,0 +1,132 @@
+import glob
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from .constants import REQUIRED_SHEETS, SHEET_HEADERS
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+
+# Fungsi untuk menemukan semua file Excel dalam folder Data
+@timed('file_discovery')
+def find_excel_files(data_folder="Data"):
+    # Pastikan folder Data ada
+    if not os.path.exists(data_folder):
+        try:
+            os.makedirs(data_folder)
+            logger.info("Folder %s telah dibuat. Silakan tambahkan file Excel ke folder tersebut.", data_folder)
+        except Exception as e:
+            logger.error("Error saat membuat folder %s: %s", data_folder, e)
+        return []
+
+    # Cari semua file Excel dalam folder Data
+    excel_files = glob.glob(os.path.join(data_folder, "*.xlsx")) + glob.glob(os.path.join(data_folder, "*.xls"))
+
+    return excel_files
+
+
+# Fungsi bantu untuk melewati baris sebelum header; pencarian berhenti begitu header ditemukan.
+# Jika header tidak ada, semua baris dikembalikan agar parser dapat melaporkannya.
+def _rows_from_header(rows, header_values):
+    preamble = []
+    for row in rows:
+        if all(value in row for value in header_values):
+            yield row
+            yield from rows
+            return
+        preamble.append(row)
+    yield from preamble
+
+
+# Fungsi bantu untuk mengubah baris mentah menjadi DataFrame tanpa header (sel kosong = NaN).
+# Baris kosong di akhir sheet dibuang, sama seperti pd.read_excel.
+def _rows_to_frame(rows):
+    records = list(rows)
+    while records and all(value is None for value in records[-1]):
+        records.pop()
+    return pd.DataFrame.from_records(records).fillna(np.nan)
+
+
+# Fungsi untuk membaca file Excel
+@timed('excel_parse')
+def load_excel(file_path, sheet_names=REQUIRED_SHEETS):
+    """
+    Membaca sheet file Excel menjadi dictionary {nama sheet: DataFrame} tanpa header.
+
+    Hanya sheet dalam sheet_names yang dibaca (None = semua sheet). File .xlsx
+    dibaca dengan mode read-only openpyxl (iter_rows) sehingga sheet lain tidak
+    pernah dimuat ke memori. Error pembacaan diteruskan ke pemanggil.
+    """
+    if str(file_path).lower().endswith('.xls'):
+        # Format lama tidak didukung openpyxl, baca lewat pandas
+        excel_data = pd.ExcelFile(file_path)
+        names = excel_data.sheet_names if sheet_names is None else [
+            name for name in sheet_names if name in excel_data.sheet_names
+        ]
+        return {name: pd.read_excel(excel_data, sheet_name=name, header=None) for name in names}
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        names = workbook.sheetnames if sheet_names is None else [
+            name for name in sheet_names if name in workbook.sheetnames
+        ]
+
+        # Buat dictionary untuk menyimpan sheet yang dibutuhkan
+        sheets = {}
+        for name in names:
+            rows = workbook[name].iter_rows(values_only=True)
+            if name in SHEET_HEADERS:
+                rows = _rows_from_header(rows, SHEET_HEADERS[name])
+            sheets[name] = _rows_to_frame(rows)
+    finally:
+        workbook.close()
+
+    return sheets
+
+
+# Fungsi untuk membaca file daftar kasus (CSV atau Excel)
+def read_cases(uploaded_file):
+    if uploaded_file.name.lower().endswith('.csv'):
+        return pd.read_csv(uploaded_file)
+    return pd.read_excel(uploaded_file)
+
+
+# Fungsi untuk membaca file daftar kasus sebagai potongan berukuran tetap
+def iter_case_chunks(file_path, chunk_size=100_000):
+    """
+    Menghasilkan DataFrame berisi paling banyak chunk_size kasus secara berurutan,
+    tanpa memuat seluruh file ke memori. CSV dibaca dengan pd.read_csv(chunksize),
+    .xlsx dengan mode read-only openpyxl (baris pertama sheet pertama = header).
+    """
+    if str(file_path).lower().endswith('.csv'):
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+        return
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(column) for column in header]
+
+        records = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            records.append(row)
+            if len(records) == chunk_size:
+                yield pd.DataFrame.from_records(records, columns=header)
+                records = []
+        if records:
+            yield pd.DataFrame.from_records(records, columns=header)
+    finally:
+        workbook.close()
@@ -0,0 +1,217 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Aktifkan pengukuran alokasi memori (tracemalloc) dengan DENDA_TRACE_MEMORY=1.
+# tracemalloc memperlambat setiap alokasi, sehingga tidak dinyalakan secara default.
+TRACE_MEMORY = os.environ.get("DENDA_TRACE_MEMORY", "0") == "1"
+
+# File teks format Prometheus (node_exporter textfile collector); kosong = tidak ditulis
+METRICS_FILE = os.environ.get("DENDA_METRICS_FILE", "")
+
+# Jarak minimum antar penulisan file Prometheus (detik); agregat disimpan di memori di antaranya
+METRICS_FLUSH_INTERVAL = float(os.environ.get("DENDA_METRICS_FLUSH_INTERVAL", "10"))
+
+# Catatan per thread: stack tahap yang sedang berjalan dan daftar pengumpul aktif
+_local = threading.local()
+
+# Agregat per tahap untuk file Prometheus: {nama: [jumlah panggilan, total detik, detik terakhir, peak terakhir]}
+_totals = {}
+_totals_lock = threading.Lock()
+
+# Status penulisan file: apakah agregat berubah sejak penulisan terakhir, dan kapan terakhir ditulis
+_dirty = False
+_last_flush = 0.0
+
+
+# Fungsi untuk menyalakan pengukuran memori (misalnya dari benchmark atau debug)
+def enable_memory_tracing():
+    global TRACE_MEMORY
+    TRACE_MEMORY = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+if TRACE_MEMORY:
+    enable_memory_tracing()
+
+
+# Fungsi bantu untuk mengambil atribut per thread
+def _thread_list(name):
+    if not hasattr(_local, name):
+        setattr(_local, name, [])
+    return getattr(_local, name)
+
+
+# Fungsi untuk mengukur waktu dan peak alokasi satu tahap
+@contextmanager
+def stage(name, **labels):
+    """
+    Mengukur wall time dan (bila tracemalloc aktif) peak alokasi satu tahap.
+
+    Hasilnya dicatat ke semua pengumpul aktif (collect_stages), dikirim sebagai
+    log JSON lewat logger engine.metrics, dan diagregasi di memori untuk file
+    Prometheus bila DENDA_METRICS_FILE diisi (ditulis oleh flush_metrics). Tahap boleh bersarang; peak tahap dalam ikut
+    dihitung ke peak tahap luar.
+    """
+    stack = _thread_list('stack')
+    tracing = TRACE_MEMORY and tracemalloc.is_tracing()
+
+    frame = {'peak': 0, 'start_bytes': 0}
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        frame['start_bytes'] = current
+    stack.append(frame)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+
+        peak_bytes = None
+        if tracing:
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            peak_bytes = max(peak - frame['start_bytes'], 0)
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+
+        _record({'stage': name, 'seconds': seconds, 'peak_bytes': peak_bytes, **labels})
+
+
+# Dekorator untuk mengukur setiap panggilan fungsi sebagai satu tahap
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Fungsi bantu untuk meneruskan satu catatan tahap ke pengumpul, log dan agregat
+def _record(record):
+    for collector in _thread_list('collectors'):
+        collector.append(record)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(record))
+
+    if METRICS_FILE:
+        global _dirty
+        with _totals_lock:
+            totals = _totals.setdefault(record['stage'], [0, 0.0, 0.0, None])
+            totals[0] += 1
+            totals[1] += record['seconds']
+            totals[2] = record['seconds']
+            totals[3] = record['peak_bytes']
+            _dirty = True
+
+
+# Fungsi untuk menulis agregat ke file Prometheus (di akhir rerun/request, paling sering sekali per interval)
+def flush_metrics(force=False):
+    """
+    Menulis file DENDA_METRICS_FILE bila agregat berubah sejak penulisan
+    terakhir dan sudah lewat METRICS_FLUSH_INTERVAL detik (atau force=True).
+    Dipanggil di akhir setiap rerun Streamlit dan request layanan, serta saat
+    proses berakhir, sehingga tahap-tahap tidak menulis file sendiri-sendiri.
+    """
+    global _dirty, _last_flush
+    if not METRICS_FILE:
+        return False
+
+    with _totals_lock:
+        now = time.monotonic()
+        if not _dirty or (not force and now - _last_flush < METRICS_FLUSH_INTERVAL):
+            return False
+        text = prometheus_text()
+        _dirty = False
+        _last_flush = now
+
+    _write_text(METRICS_FILE, text)
+    return True
+
+
+atexit.register(flush_metrics, force=True)
+
+
+# Fungsi untuk mengumpulkan catatan semua tahap yang berjalan di thread ini
+@contextmanager
+def collect_stages():
+    collectors = _thread_list('collectors')
+    records = []
+    collectors.append(records)
+    try:
+        yield records
+    finally:
+        collectors.remove(records)
+
+
+# Fungsi untuk mulai mengumpulkan catatan tahap tanpa blok with (satu rerun skrip Streamlit)
+def start_collecting():
+    records = []
+    _local.collectors = [records]
+    return records
+
+
+# Fungsi untuk menyusun isi file Prometheus dari agregat tahap
+def prometheus_text():
+    lines = [
+        "# HELP denda_stage_calls_total Jumlah eksekusi per tahap.",
+        "# TYPE denda_stage_calls_total counter",
+    ]
+    rows = sorted(_totals.items())
+    lines += [f'denda_stage_calls_total{{stage="{name}"}} {calls}' for name, (calls, _, _, _) in rows]
+    lines += [
+        "# HELP denda_stage_seconds_total Total wall time per tahap (detik).",
+        "# TYPE denda_stage_seconds_total counter",
+    ]
+    lines += [f'denda_stage_seconds_total{{stage="{name}"}} {total:.6f}' for name, (_, total, _, _) in rows]
+    lines += [
+        "# HELP denda_stage_last_seconds Wall time eksekusi terakhir per tahap (detik).",
+        "# TYPE denda_stage_last_seconds gauge",
+    ]
+    lines += [f'denda_stage_last_seconds{{stage="{name}"}} {last:.6f}' for name, (_, _, last, _) in rows]
+    lines += [
+        "# HELP denda_stage_peak_bytes Peak alokasi eksekusi terakhir per tahap (byte).",
+        "# TYPE denda_stage_peak_bytes gauge",
+    ]
+    lines += [f'denda_stage_peak_bytes{{stage="{name}"}} {peak}' for name, (_, _, _, peak) in rows
+              if peak is not None]
+    return "\n".join(lines) + "\n"
+
+
+# Fungsi untuk menulis file Prometheus secara atomik (file sementara lalu os.replace)
+def write_prometheus(path):
+    with _totals_lock:
+        text = prometheus_text()
+    _write_text(path, text)
+
+
+# Fungsi bantu untuk menulis teks metrik ke path secara atomik
+def _write_text(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error("Error saat menulis file metrik %s: %s", path, e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
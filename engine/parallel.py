@@ -0,0 +1,117 @@
+import argparse
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import metrics
+from .constants import STATUS_COLUMN, STATUS_OK
+from .export import write_csv, write_excel
+from .fixedpoint import SEN
+from .loader import iter_case_chunks
+from .pricing import price_cases
+
+logger = logging.getLogger(__name__)
+
+# Tabel tarif milik proses worker, diisi sekali oleh _init_worker
+_worker_tariff = None
+
+
+# Fungsi inisialisasi worker: tabel tarif dan DENDA satuan dikirim sekali per proses, bukan per potongan
+def _init_worker(frek_alat_df, persentase_data, unit_fines=None):
+    global _worker_tariff
+    _worker_tariff = (frek_alat_df, persentase_data, unit_fines)
+    # File metrik Prometheus hanya ditulis oleh proses utama
+    metrics.METRICS_FILE = ""
+
+
+# Fungsi yang dijalankan worker untuk satu potongan kasus
+def _price_chunk(cases_df):
+    frek_alat_df, persentase_data, unit_fines = _worker_tariff
+    return price_cases(frek_alat_df, cases_df, persentase_data, unit_fines)
+
+
+# Fungsi untuk menghitung potongan-potongan kasus secara paralel dengan urutan hasil tetap
+def price_chunks_parallel(frek_alat_df, persentase_data, chunks, max_workers=None, unit_fines=None):
+    """
+    Menghitung setiap potongan kasus dengan price_cases di ProcessPoolExecutor dan
+    menghasilkan potongan hasil dengan urutan yang sama seperti input.
+
+    Potongan dibaca secara malas dan paling banyak 2 x max_workers potongan yang
+    sedang diproses, sehingga memori tetap terbatas berapa pun ukuran input.
+    max_workers=1 menghitung langsung di proses pemanggil. unit_fines (dari store
+    tarif) dikirim ke setiap worker bersama tabel tarif, lihat price_cases.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1:
+        for chunk in chunks:
+            yield price_cases(frek_alat_df, chunk, persentase_data, unit_fines)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(frek_alat_df, persentase_data, unit_fines)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_price_chunk, chunk))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Fungsi untuk menghitung file daftar kasus besar dan menulis hasilnya ke CSV atau Excel
+def price_file_parallel(frek_alat_df, persentase_data, input_path, output_path,
+                        chunk_size=100_000, max_workers=None, unit_fines=None):
+    summary = {'rows': 0, 'chunks': 0, 'invalid': 0, 'total_tagihan_denda': 0.0, 'total_tagihan_denda_sen': 0}
+
+    # Ringkasan dihitung sambil potongan hasil diteruskan ke penulis file
+    def tally(priced_chunks):
+        for priced in priced_chunks:
+            summary['rows'] += len(priced)
+            summary['chunks'] += 1
+            summary['invalid'] += int((priced[STATUS_COLUMN] != STATUS_OK).sum())
+            # Dijumlahkan dalam sen (int) agar total jutaan kasus tetap eksak
+            summary['total_tagihan_denda_sen'] += int(priced['TOTAL TAGIHAN DENDA (SEN)'].sum())
+            summary['total_tagihan_denda'] = summary['total_tagihan_denda_sen'] / SEN
+            logger.info("Potongan %d selesai (%d kasus)", summary['chunks'], summary['rows'])
+            yield priced
+
+    results = tally(price_chunks_parallel(frek_alat_df, persentase_data,
+                                          iter_case_chunks(input_path, chunk_size), max_workers, unit_fines))
+    if str(output_path).lower().endswith('.xlsx'):
+        write_excel(results, output_path)
+    else:
+        write_csv(results, output_path)
+
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hitung denda untuk file daftar kasus besar secara paralel.")
+    parser.add_argument("workbook", help="File Excel tarif (berisi sheet FREK & ALAT dan Referensi)")
+    parser.add_argument("input", help="File daftar kasus (.csv atau .xlsx)")
+    parser.add_argument("output", help="File hasil perhitungan (.csv atau .xlsx)")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from .store import build_tariff_store
+
+    store = build_tariff_store(args.workbook)
+    if store.frek_alat_df is None:
+        parser.error(f"Sheet FREK & ALAT tidak ditemukan atau tidak valid di {args.workbook}")
+
+    try:
+        summary = price_file_parallel(store.frek_alat_df, store.persentase_data, args.input, args.output,
+                                      args.chunk_size, args.workers, store.unit_fines)
+    except ValueError as e:
+        parser.error(str(e))
+    logger.info("Selesai: %d kasus (%d tidak dapat dihitung), %d potongan, total tagihan Rp %s",
+                summary['rows'], summary['invalid'], summary['chunks'], f"{summary['total_tagihan_denda']:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import functools
+import logging
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .constants import HEADER_VALUES, NUMERIC_COLUMNS, PERSENTASE_DEFAULT, RAW_VALUES_ATTR, SHEET_REFERENSI
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Pola label bracket JML BULAN: rentang ("0-12", "13-24") dan batas terbuka (">25", ">=25", "<6")
+_RANGE_PATTERN = re.compile(r'^\s*(\d+(?:[.,]\d+)?)\s*-\s*(\d+(?:[.,]\d+)?)\s*$')
+_OPEN_PATTERN = re.compile(r'^\s*(>=?|<=?)\s*(\d+(?:[.,]\d+)?)\s*$')
+
+# Tabel interval bracket JML BULAN yang terurut menurut awal interval [starts, ends) dalam bulan
+BracketTable = namedtuple('BracketTable', ['starts', 'ends', 'labels', 'percentages'])
+
+
+# Fungsi bantu untuk membuang spasi di awal/akhir sel teks; sel non-teks dibiarkan
+def _strip_column(column):
+    if column.dtype == object or pd.api.types.is_string_dtype(column):
+        stripped = column.str.strip()
+        return stripped.where(stripped.notna(), column)
+    return column
+
+
+# Fungsi untuk menemukan koordinat sel yang nilainya sama dengan salah satu values
+def locate_cells(df, values, strip=False):
+    """
+    Mencari semua sel df yang nilainya ada dalam values dengan satu operasi isin.
+
+    Mengembalikan list (posisi baris, posisi kolom, nilai) yang terurut per baris
+    lalu per kolom. Jika strip=True, spasi di sekitar sel teks diabaikan.
+    Dipakai oleh parser sheet untuk menemukan header dan sel referensi.
+    """
+    frame = df.apply(_strip_column) if strip else df
+    rows, cols = np.nonzero(frame.isin(values).to_numpy())
+    found = frame.to_numpy(dtype=object)[rows, cols]
+    return list(zip(rows.tolist(), cols.tolist(), found.tolist()))
+
+
+# Fungsi untuk menemukan header berdasarkan nilai tertentu dalam dataframe
+@timed('header_detection')
+def find_header_row(df, header_values):
+    # Kumpulkan baris tempat setiap nilai header muncul
+    rows_per_value = {value: set() for value in header_values}
+    for row, _, value in locate_cells(df, header_values):
+        rows_per_value[value].add(row)
+
+    # Baris header adalah baris pertama yang memuat semua nilai header
+    header_rows = set.intersection(*rows_per_value.values()) if rows_per_value else set()
+    return min(header_rows) if header_rows else None
+
+
+# Fungsi untuk memproses data dari sheet FREK & ALAT
+def process_frek_alat_data(df):
+    """
+    Mengubah sheet FREK & ALAT mentah menjadi tabel tarif dengan header yang benar.
+    Mengembalikan None jika baris header tidak ditemukan. Teks asli sel numerik
+    yang bukan angka disimpan di attrs[RAW_VALUES_ATTR] untuk laporan validasi.
+    """
+    # Cari baris header
+    header_row = find_header_row(df, HEADER_VALUES)
+
+    if header_row is None:
+        logger.error("Tidak dapat menemukan baris header di sheet FREK & ALAT")
+        return None
+
+    # Reset header dengan baris yang ditemukan
+    header = df.iloc[header_row]
+    processed_df = df.iloc[header_row+1:].reset_index(drop=True)
+    processed_df.columns = header.values
+
+    # Filter kolom yang tidak diinginkan (NaN atau unnamed)
+    valid_columns = [col for col in processed_df.columns if not (pd.isna(col) or 'Unnamed' in str(col))]
+    processed_df = processed_df[valid_columns]
+
+    # Konversi kolom numerik; sel yang bukan angka menjadi NaN, nilai aslinya disimpan untuk laporan validasi
+    raw_values = {}
+    for col in NUMERIC_COLUMNS:
+        if col in processed_df.columns:
+            converted = pd.to_numeric(processed_df[col], errors='coerce')
+            failed = converted.isna() & processed_df[col].notna()
+            if failed.any():
+                raw_values[col] = {str(label): str(value) for label, value in processed_df[col][failed].items()}
+            processed_df[col] = converted
+    processed_df.attrs[RAW_VALUES_ATTR] = raw_values
+
+    # Pastikan kolom JENIS IZIN ada
+    if 'JENIS IZIN' not in processed_df.columns:
+        logger.warning("Kolom JENIS IZIN tidak ditemukan. Aplikasi akan mencoba menggunakan nilai default.")
+    else:
+        # Normalisasi nilai JENIS IZIN (uppercase dan strip whitespace)
+        processed_df['JENIS IZIN'] = processed_df['JENIS IZIN'].astype(str).str.strip().str.upper()
+
+    return processed_df
+
+
+# Fungsi untuk memproses data dari sheet Referensi untuk mendapatkan faktor persentase
+@timed('referensi_parse')
+def process_referensi_data(sheets):
+    """
+    Mengembalikan {label bracket JML BULAN: persentase}; bracket yang tidak ada
+    di sheet Referensi memakai PERSENTASE_DEFAULT. Error pembacaan diteruskan ke
+    pemanggil sehingga tampil sebagai error memuat workbook.
+    """
+    # Default persentase data
+    persentase_data = dict(PERSENTASE_DEFAULT)
+
+    # Sheet Referensi (jika ada)
+    if SHEET_REFERENSI in sheets:
+        ref_df = sheets[SHEET_REFERENSI]
+
+        # Cari sel dengan nilai "0-12", "13-24", ">25"; persentasenya ada di baris berikutnya.
+        # Sel diproses berurutan per baris sehingga referensi yang lebih bawah menimpa yang atas.
+        for row, col, period in locate_cells(ref_df, list(PERSENTASE_DEFAULT), strip=True):
+            if row + 1 >= ref_df.shape[0]:
+                continue
+            try:
+                percentage = ref_df.iat[row + 1, col]
+                if isinstance(percentage, (int, float, np.integer, np.floating)):
+                    # Normalisasi persentase
+                    if percentage > 1:
+                        percentage = percentage / 100
+                    persentase_data[period] = float(percentage)
+                elif isinstance(percentage, str) and percentage.replace('.', '', 1).replace(',', '', 1).isdigit():
+                    # Konversi string ke float
+                    percentage = float(percentage.replace(',', '.'))
+                    if percentage > 1:
+                        percentage = percentage / 100
+                    persentase_data[period] = percentage
+            except (TypeError, ValueError):
+                pass
+
+    return persentase_data
+
+
+# Fungsi bantu untuk membaca angka bulan dari label ("12" atau "12,5")
+def _month_number(text):
+    return float(text.replace(',', '.'))
+
+
+# Fungsi bantu untuk mengubah label bracket menjadi interval bulan [awal, akhir); None jika bukan rentang
+def _bracket_interval(label):
+    match = _RANGE_PATTERN.match(str(label))
+    if match:
+        # "0-12" mencakup bulan 0 sampai sebelum bulan 13 (termasuk 12,5 bulan)
+        return _month_number(match.group(1)), _month_number(match.group(2)) + 1
+
+    match = _OPEN_PATTERN.match(str(label))
+    if match:
+        operator, number = match.group(1), _month_number(match.group(2))
+        if operator.startswith('>'):
+            # ">25" dimulai dari 25 agar tidak ada celah setelah bracket "13-24"
+            return number, np.inf
+        return -np.inf, number + 1 if operator == '<=' else number
+
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_brackets(items):
+    intervals = sorted(
+        (interval, label, percentage) for label, percentage in items
+        if (interval := _bracket_interval(label)) is not None
+    )
+    return BracketTable(
+        starts=np.array([interval[0] for interval, _, _ in intervals], dtype=float),
+        ends=np.array([interval[1] for interval, _, _ in intervals], dtype=float),
+        labels=np.array([label for _, label, _ in intervals], dtype=object),
+        percentages=np.array([percentage for _, _, percentage in intervals], dtype=float),
+    )
+
+
+# Fungsi untuk menyusun tabel interval bracket JML BULAN dari data persentase Referensi
+def compile_brackets(persentase_data):
+    """
+    Mengubah {label bracket: persentase} menjadi BracketTable terurut sehingga
+    jumlah bulan dapat dipetakan ke bracket dengan np.searchsorted. Label yang
+    bukan rentang bulan diabaikan. Hasil disimpan per isi persentase_data.
+    """
+    return _compile_brackets(tuple(persentase_data.items()))
+
+
+# Fungsi untuk mencari posisi bracket setiap jumlah bulan (-1 jika tidak masuk bracket mana pun)
+def bracket_positions(table, months):
+    months = np.asarray(months, dtype=float)
+    positions = np.searchsorted(table.starts, months, side='right') - 1
+    inside = (positions >= 0) & (months < table.ends[positions.clip(0)]) if len(table.starts) else \
+        np.zeros(months.shape, dtype=bool)
+    return np.where(inside, positions, -1)
+
+
+# Fungsi bantu untuk memetakan jumlah bulan ke persentase lewat tabel interval (NaN jika di luar bracket)
+def _month_percentages(persentase_data, months):
+    table = compile_brackets(persentase_data)
+    if not len(table.starts):
+        return np.full(months.shape, np.nan)
+    positions = bracket_positions(table, months)
+    return np.where(positions >= 0, table.percentages[positions.clip(0)], np.nan)
+
+
+# Fungsi untuk mendapatkan persentase banyak nilai JML BULAN sekaligus (label bracket atau angka bulan)
+def lookup_percentages(persentase_data, jml_bulan, default=1.0):
+    """
+    jml_bulan boleh berisi label bracket ("13-24") maupun jumlah bulan (18, "18",
+    "18,5"). Label dicocokkan langsung; angka dipetakan lewat tabel interval
+    compile_brackets dengan pencarian biner. Nilai yang tidak dikenali (atau
+    persentase kosong) diberi default, seperti get_percentage.
+    """
+    values = pd.Series(jml_bulan, copy=False) if not isinstance(jml_bulan, pd.Series) else jml_bulan
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        # Kolom angka murni: langsung ke tabel interval tanpa konversi teks
+        result = _month_percentages(persentase_data, values.to_numpy(dtype=float, na_value=np.nan))
+    else:
+        # Nilai teks biasanya berulang: hitung sekali per nilai unik lalu sebarkan lewat kode factorize
+        codes, uniques = pd.factorize(values)
+        labels = pd.Series(uniques, dtype=object).astype(str).str.strip()
+        per_unique = np.full(len(labels), np.nan)
+
+        by_label = labels.isin(list(persentase_data)).to_numpy()
+        per_unique[by_label] = labels[by_label].map(persentase_data).to_numpy(dtype=float)
+
+        months = pd.to_numeric(labels.str.replace(',', '.', regex=False), errors='coerce').to_numpy(dtype=float)
+        by_month = ~by_label & ~np.isnan(months)
+        per_unique[by_month] = _month_percentages(persentase_data, months[by_month])
+
+        result = np.append(per_unique, np.nan)[codes]
+
+    return np.where(np.isnan(result), default, result)
+
+
+# Fungsi untuk mendapatkan persentase berdasarkan JML BULAN
+def get_percentage(persentase_data, jml_bulan):
+    # Default persentase
+    default_percentage = 1.0
+
+    # Label bracket atau angka bulan; aturan sama dengan perhitungan massal (persentase kosong -> default)
+    if isinstance(persentase_data, dict) and isinstance(jml_bulan, (int, float, np.integer, np.floating, str)):
+        return float(lookup_percentages(persentase_data, [jml_bulan], default_percentage)[0])
+
+    return default_percentage
@@ -0,0 +1,391 @@
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+
+from .constants import JENIS_PELANGGARAN, LOOKUP_KEYS, MAKS_POIN_DEFAULT, STATUS_COLUMN, STATUS_OK, TARIF_COLUMNS
+from .fixedpoint import (_INT64_LIMIT, INDEKS_SCALE, PERSEN_SCALE, POIN_SCALE, SEN, from_fixed, price_fixed_rows,
+                         price_fixed_scalar, to_fixed, to_fixed_scalar)
+from .metrics import timed
+from .parsing import lookup_percentages
+
+logger = logging.getLogger(__name__)
+
+
+# Fungsi untuk mendapatkan MAKS POIN berdasarkan JENIS IZIN
+def get_maks_poin(jenis_izin):
+    jenis_izin = str(jenis_izin).strip().upper()
+    return MAKS_POIN_DEFAULT.get(jenis_izin, 0)
+
+
+# Fungsi bantu untuk mengambil kolom numerik sebagai array float (NaN jika kolom tidak ada)
+def _numeric_column(df, column):
+    if column in df.columns:
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+    return np.full(len(df), np.nan)
+
+
+# Fungsi bantu untuk mengambil satu nilai numerik dari baris (NaN jika tidak ada atau bukan angka)
+def _row_number(row, column):
+    value = row.get(column)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# Fungsi bantu untuk mengambil MAKS POIN default per baris dari kolom JENIS IZIN (0 jika tidak dikenal)
+def _default_maks_poin(jenis_izin):
+    if isinstance(jenis_izin.dtype, pd.CategoricalDtype):
+        # Kolom kategori (skema ringkas): normalisasi cukup dilakukan sekali per kategori
+        per_category = _default_maks_poin(pd.Series(jenis_izin.cat.categories))
+        return np.append(per_category, 0.0)[jenis_izin.cat.codes.to_numpy()]
+    jenis_izin = jenis_izin.astype(str).str.strip().str.upper()
+    return jenis_izin.map(MAKS_POIN_DEFAULT).fillna(0).to_numpy(dtype=float)
+
+
+# Fungsi bantu untuk mengganti NaN dengan 0 (skalar atau array)
+def _nan_to_zero(values):
+    if isinstance(values, float):
+        return 0.0 if math.isnan(values) else values
+    return np.where(np.isnan(values), 0.0, values)
+
+
+# Fungsi bantu aturan MAKS POIN: nilai data, fallback ke default JENIS IZIN, lalu ke 1 (skalar atau array)
+def _maks_poin_rule(maks_poin, default_maks_poin):
+    maks_poin = _nan_to_zero(maks_poin)
+    maks_poin = np.where(maks_poin == 0, default_maks_poin, maks_poin)
+    return np.where(maks_poin == 0, 1.0, maks_poin)
+
+
+# Fungsi bantu aturan INDEKS PELANGGARAN: selain "Pelanggaran Pertama" dianggap berulang (skalar atau array)
+def _indeks_rule(jenis_pelanggaran, indeks_pertama, indeks_berulang):
+    pertama = np.asarray(jenis_pelanggaran) == "Pelanggaran Pertama"
+    return _nan_to_zero(np.where(pertama, indeks_pertama, indeks_berulang))
+
+
+# Fungsi bantu aturan persentase: % dari data (dinormalisasi jika di atas 1), fallback ke parameter
+def _persentase_rule(percentage_data, persentase):
+    percentage_data = _nan_to_zero(percentage_data)
+    percentage_data = np.where(percentage_data > 1, percentage_data / 100, percentage_data)
+    return np.where(percentage_data > 0, percentage_data, np.asarray(persentase, dtype=float))
+
+
+# Pesan status per baris untuk jumlah yang tidak valid dan perkalian yang melewati batas int64
+_STATUS_JUMLAH = "{} tidak valid (harus bilangan bulat)"
+_STATUS_OVERFLOW = "Nilai terlalu besar untuk perhitungan fixed-point int64"
+
+
+# Fungsi bantu untuk memeriksa jumlah frekuensi/perangkat per baris: jumlah <= 0 dianggap 1, pecahan/kosong tidak valid
+def _whole_counts(jumlah):
+    """
+    Mengembalikan (jumlah int64, mask valid). Jumlah <= 0 dianggap 1 seperti
+    aturan lama; jumlah pecahan atau kosong (NaN) tidak diubah diam-diam: baris
+    itu ditandai tidak valid dan jumlahnya diganti 1 hanya agar perkalian array
+    tetap bisa dijalankan.
+    """
+    jumlah = np.asarray(jumlah)
+    if np.issubdtype(jumlah.dtype, np.integer):
+        valid = np.ones(jumlah.shape, dtype=bool)
+    else:
+        jumlah = jumlah.astype(float)
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(jumlah) & (jumlah == np.floor(jumlah)) & (jumlah < _INT64_LIMIT)
+    with np.errstate(invalid='ignore'):
+        return np.where(valid & (jumlah > 0), jumlah, 1).astype(np.int64), valid
+
+
+# Versi skalar _whole_counts untuk satu jumlah; ValueError jika tidak valid
+def _whole_count(jumlah, nama='JUMLAH'):
+    if isinstance(jumlah, (int, np.integer)) and not isinstance(jumlah, bool):
+        valid = True
+    else:
+        try:
+            jumlah = float(jumlah)
+        except (TypeError, ValueError):
+            raise ValueError(_STATUS_JUMLAH.format(nama) + f": {jumlah!r}") from None
+        valid = math.isfinite(jumlah) and jumlah.is_integer() and jumlah < _INT64_LIMIT
+    if not valid:
+        raise ValueError(_STATUS_JUMLAH.format(nama) + f": {jumlah!r}")
+    return int(jumlah) if jumlah > 0 else 1
+
+
+# Fungsi bantu untuk menyusun kolom status per baris dan mask baris yang gagal dihitung
+def _row_status(n, valid_frekuensi, valid_perangkat, overflow):
+    valid_frekuensi = np.broadcast_to(valid_frekuensi, (n,))
+    valid_perangkat = np.broadcast_to(valid_perangkat, (n,))
+    overflow = np.broadcast_to(overflow, (n,))
+
+    status = np.full(n, STATUS_OK, dtype=object)
+    status[overflow] = _STATUS_OVERFLOW
+    status[~valid_perangkat] = _STATUS_JUMLAH.format('JUMLAH PERANGKAT')
+    status[~valid_frekuensi] = _STATUS_JUMLAH.format('JUMLAH FREKUENSI')
+    return status, ~valid_frekuensi | ~valid_perangkat
+
+
+# Fungsi bantu untuk kolom JUMLAH hasil: jumlah bulat, atau nilai masukan asli jika ada baris yang tidak valid
+def _count_column(n, jumlah, counts, valid):
+    if np.all(valid):
+        return np.broadcast_to(counts, (n,))
+    return np.broadcast_to(np.where(valid, counts, np.asarray(jumlah, dtype=float)), (n,))
+
+
+# Fungsi untuk menghitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA untuk seluruh tabel sekaligus
+def calculate_denda_frame(df, jumlah_frekuensi, jumlah_perangkat, persentase=1.0, jenis_pelanggaran="Pelanggaran Pertama"):
+    """
+    Versi vektor dari calculate_denda: aturan yang sama diterapkan ke semua baris
+    df dengan operasi kolom NumPy, tanpa loop per baris.
+
+    jumlah_frekuensi, jumlah_perangkat, persentase dan jenis_pelanggaran boleh
+    berupa skalar atau array dengan panjang yang sama dengan df.
+
+    Mengembalikan salinan df dengan kolom INDEKS YANG DIGUNAKAN, PERSENTASE,
+    MAKS POIN, TOTAL POIN, TARIF DENDA, DENDA, JUMLAH FREKUENSI, JUMLAH PERANGKAT
+    dan TOTAL TAGIHAN DENDA terisi sesuai rumus. Rumus dihitung dalam fixed-point
+    int64 (lihat price_fixed); DENDA (SEN) dan TOTAL TAGIHAN DENDA (SEN) berisi
+    nilai uang eksak dalam sen.
+
+    Jumlah frekuensi/perangkat <= 0 dianggap 1. Baris dengan jumlah yang bukan
+    bilangan bulat atau yang perkaliannya melewati batas int64 tidak
+    menggagalkan tabel: kolom STATUS PERHITUNGAN berisi alasannya (OK untuk
+    baris lain), TOTAL TAGIHAN DENDA bernilai NaN dan kolom (SEN)-nya 0.
+    """
+    n = len(df)
+
+    # MAKS POIN dari data, fallback ke default JENIS IZIN, lalu ke 1
+    if 'JENIS IZIN' in df.columns:
+        default_maks_poin = _default_maks_poin(df['JENIS IZIN'])
+    else:
+        default_maks_poin = np.zeros(n)
+    maks_poin = _maks_poin_rule(_numeric_column(df, 'MAKS POIN'), default_maks_poin)
+
+    # INDEKS PELANGGARAN sesuai jenis pelanggaran
+    indeks = _indeks_rule(
+        np.broadcast_to(np.asarray(jenis_pelanggaran), (n,)),
+        _numeric_column(df, 'INDEKS PELANGGARAN PERTAMA'),
+        _numeric_column(df, 'INDEKS PELANGGARAN BERULANG')
+    )
+
+    # Persentase dari data, fallback ke parameter
+    percentage = _persentase_rule(_numeric_column(df, '%'), persentase)
+
+    tarif_denda = np.nan_to_num(_numeric_column(df, 'TARIF DENDA'), nan=0.0)
+
+    # Jumlah frekuensi/perangkat harus bilangan bulat (<= 0 dianggap 1); baris lain ditandai di STATUS PERHITUNGAN
+    counts_frekuensi, valid_frekuensi = _whole_counts(jumlah_frekuensi)
+    counts_perangkat, valid_perangkat = _whole_counts(jumlah_perangkat)
+
+    # Hitung dalam fixed-point int64 (poin per POIN_SCALE, uang dalam sen) agar hasil eksak;
+    # TOTAL POIN dan DENDA yang sudah ada di data dipakai jika bernilai positif
+    total_poin, denda, total_tagihan_denda, overflow = price_fixed_rows(
+        to_fixed(indeks, INDEKS_SCALE),
+        to_fixed(percentage, PERSEN_SCALE),
+        to_fixed(maks_poin, POIN_SCALE),
+        to_fixed(tarif_denda, SEN),
+        counts_frekuensi,
+        counts_perangkat,
+        total_poin=to_fixed(_numeric_column(df, 'TOTAL POIN'), POIN_SCALE),
+        denda=to_fixed(_numeric_column(df, 'DENDA'), SEN),
+    )
+    status, jumlah_invalid = _row_status(n, valid_frekuensi, valid_perangkat, overflow)
+    overflow = np.broadcast_to(overflow, (n,))
+    total_tagihan_denda = np.broadcast_to(total_tagihan_denda, (n,))
+
+    result_df = df.copy()
+    result_df['INDEKS YANG DIGUNAKAN'] = indeks
+    result_df['PERSENTASE'] = percentage
+    result_df['MAKS POIN'] = maks_poin
+    result_df['TOTAL POIN'] = np.where(overflow, np.nan, from_fixed(total_poin, POIN_SCALE))
+    result_df['TARIF DENDA'] = tarif_denda
+    result_df['DENDA'] = np.where(overflow, np.nan, from_fixed(denda, SEN))
+    result_df['JUMLAH FREKUENSI'] = _count_column(n, jumlah_frekuensi, counts_frekuensi, valid_frekuensi)
+    result_df['JUMLAH PERANGKAT'] = _count_column(n, jumlah_perangkat, counts_perangkat, valid_perangkat)
+    result_df['TOTAL TAGIHAN DENDA'] = np.where(overflow | jumlah_invalid, np.nan,
+                                                from_fixed(total_tagihan_denda, SEN))
+    # Nilai uang eksak dalam sen untuk penjumlahan dan perbandingan tanpa galat float (0 untuk baris gagal)
+    result_df['DENDA (SEN)'] = denda
+    result_df['TOTAL TAGIHAN DENDA (SEN)'] = np.where(jumlah_invalid, 0, total_tagihan_denda)
+    result_df[STATUS_COLUMN] = status
+
+    return result_df
+
+
+# Fungsi untuk menghitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA
+@timed('pricing')
+def calculate_denda(row, jumlah_frekuensi, jumlah_perangkat, persentase=1.0, jenis_pelanggaran="Pelanggaran Pertama"):
+    """
+    Menghitung TOTAL POIN, DENDA, dan TOTAL TAGIHAN DENDA berdasarkan rumus:
+    TOTAL POIN = INDEKS PELANGGARAN * % * MAKS POIN
+    DENDA = TOTAL POIN * TARIF DENDA
+    TOTAL TAGIHAN DENDA = DENDA * JUMLAH FREKUENSI * JUMLAH PERANGKAT
+    
+    Menggunakan MAKS POIN berdasarkan JENIS IZIN jika tersedia.
+    Jumlah frekuensi/perangkat <= 0 dianggap 1; jumlah yang bukan bilangan bulat
+    menghasilkan ValueError. Error perhitungan (mis. OverflowError) diteruskan
+    ke pemanggil.
+    """
+    # Aturan yang sama dengan calculate_denda_frame, dihitung untuk satu baris tanpa membuat DataFrame
+    maks_poin = float(_maks_poin_rule(_row_number(row, 'MAKS POIN'), get_maks_poin(row.get('JENIS IZIN', ''))))
+    kolom_indeks = 'INDEKS PELANGGARAN PERTAMA' if jenis_pelanggaran == "Pelanggaran Pertama" else \
+        'INDEKS PELANGGARAN BERULANG'
+    indeks = float(_nan_to_zero(_row_number(row, kolom_indeks)))
+    percentage = float(_persentase_rule(_row_number(row, '%'), persentase))
+    tarif_denda = float(_nan_to_zero(_row_number(row, 'TARIF DENDA')))
+
+    total_poin, denda, total_tagihan_denda = price_fixed_scalar(
+        to_fixed_scalar(indeks, INDEKS_SCALE),
+        to_fixed_scalar(percentage, PERSEN_SCALE),
+        to_fixed_scalar(maks_poin, POIN_SCALE),
+        to_fixed_scalar(tarif_denda, SEN),
+        _whole_count(jumlah_frekuensi, 'JUMLAH FREKUENSI'),
+        _whole_count(jumlah_perangkat, 'JUMLAH PERANGKAT'),
+        total_poin=to_fixed_scalar(_row_number(row, 'TOTAL POIN'), POIN_SCALE),
+        denda=to_fixed_scalar(_row_number(row, 'DENDA'), SEN),
+    )
+
+    # Return semua nilai untuk debugging dan visualisasi
+    return {
+        'indeks': indeks,
+        'persentase': percentage,
+        'maks_poin': maks_poin,
+        'total_poin': total_poin / POIN_SCALE,
+        'tarif_denda': tarif_denda,
+        'denda': denda / SEN,
+        'total_tagihan_denda': total_tagihan_denda / SEN
+    }
+
+
+# Fungsi untuk menyeragamkan daftar kasus pelanggaran sebelum dihitung massal
+def normalize_cases(cases_df):
+    cases_df = cases_df.copy()
+    cases_df.columns = [str(col).strip().upper() for col in cases_df.columns]
+
+    for column in ['DINAS', 'KATEGORI', 'BAND', 'JML BULAN']:
+        if column in cases_df.columns:
+            cases_df[column] = cases_df[column].astype(str).str.strip()
+    if 'JENIS IZIN' in cases_df.columns:
+        cases_df['JENIS IZIN'] = cases_df['JENIS IZIN'].astype(str).str.strip().str.upper()
+    if 'ZONA' in cases_df.columns:
+        cases_df['ZONA'] = pd.to_numeric(cases_df['ZONA'], errors='coerce')
+
+    # Jenis pelanggaran boleh ditulis singkat ("Pertama"/"Berulang")
+    if 'JENIS PELANGGARAN' in cases_df.columns:
+        berulang = cases_df['JENIS PELANGGARAN'].astype(str).str.lower().str.contains('berulang')
+        cases_df['JENIS PELANGGARAN'] = np.where(berulang, JENIS_PELANGGARAN[1], JENIS_PELANGGARAN[0])
+    else:
+        cases_df['JENIS PELANGGARAN'] = JENIS_PELANGGARAN[0]
+
+    for column in ['JUMLAH FREKUENSI', 'JUMLAH PERANGKAT']:
+        if column in cases_df.columns:
+            cases_df[column] = pd.to_numeric(cases_df[column], errors='coerce')
+        else:
+            cases_df[column] = 1
+
+    return cases_df
+
+
+# Kolom posisi baris tarif di tabel store yang dibawa lewat merge (hanya dipakai dengan unit_fines)
+_POSISI_TARIF = '_POSISI TARIF'
+
+
+# Fungsi bantu untuk menghitung kasus hasil merge dari DENDA satuan; baris lain dihitung dengan calculate_denda_frame
+def _calculate_from_unit_fines(merged_df, unit_fines, jumlah_frekuensi, jumlah_perangkat, persentase, jenis_pelanggaran):
+    from .unitfines import lookup_denda_columns, slot_positions
+
+    n = len(merged_df)
+    jumlah_frekuensi = np.broadcast_to(np.asarray(jumlah_frekuensi), (n,))
+    jumlah_perangkat = np.broadcast_to(np.asarray(jumlah_perangkat), (n,))
+    persentase = np.broadcast_to(np.asarray(persentase, dtype=float), (n,))
+    jenis_pelanggaran = np.broadcast_to(np.asarray(jenis_pelanggaran), (n,))
+
+    positions = merged_df.pop(_POSISI_TARIF).to_numpy(dtype=float, na_value=np.nan)
+    slots = slot_positions(unit_fines, persentase)
+    ready = ~np.isnan(positions) & (slots >= 0)
+
+    if not ready.any():
+        return calculate_denda_frame(merged_df, jumlah_frekuensi, jumlah_perangkat, persentase, jenis_pelanggaran)
+
+    columns = lookup_denda_columns(unit_fines, positions[ready].astype(np.intp), slots[ready],
+                                   jumlah_frekuensi[ready], jumlah_perangkat[ready], jenis_pelanggaran[ready])
+    if ready.all():
+        return merged_df.assign(**columns)
+
+    # Kasus tanpa tarif atau dengan persentase lain: hitung penuh lalu gabungkan sesuai urutan semula
+    rest = ~ready
+    fallback = calculate_denda_frame(merged_df[rest], jumlah_frekuensi[rest], jumlah_perangkat[rest],
+                                     persentase[rest], jenis_pelanggaran[rest])
+    return pd.concat([merged_df[ready].assign(**columns), fallback]).reindex(merged_df.index)
+
+
+# Fungsi untuk menghitung denda banyak kasus sekaligus dengan satu merge ke tabel FREK & ALAT
+@timed('pricing_batch')
+def price_cases(frek_alat_df, cases_df, persentase_data, unit_fines=None):
+    """
+    Menghitung denda untuk setiap baris cases_df (DINAS, KATEGORI, BAND, ZONA,
+    JENIS IZIN, JML BULAN, JENIS PELANGGARAN, JUMLAH FREKUENSI, JUMLAH PERANGKAT).
+
+    Kasus dicocokkan ke tabel FREK & ALAT dengan satu left merge pada kolom kunci;
+    seperti pada perhitungan tunggal, hanya baris tarif pertama per kunci yang dipakai.
+    Urutan baris hasil sama dengan urutan kasus.
+
+    unit_fines (dari store tarif, lihat precompute_unit_fines) membuat kasus yang
+    cocok cukup mengambil DENDA satuan lalu mengalikannya dengan jumlah frekuensi
+    dan perangkat. Label baris frek_alat_df harus berupa posisi baris di tabel
+    yang dipakai untuk unit_fines (tabel store atau irisan iloc darinya).
+
+    Setiap kolom kunci (LOOKUP_KEYS) yang ada di tabel tarif wajib ada di
+    cases_df; jika tidak, ValueError. Kasus dengan jumlah tidak valid atau
+    perkalian yang melewati batas int64 ditandai per baris di STATUS PERHITUNGAN.
+    """
+    cases_df = normalize_cases(cases_df)
+
+    # Kunci yang hilang membuat kasus cocok dengan baris tarif pertama yang kebetulan sama pada kunci lain
+    keys = [key for key in LOOKUP_KEYS if key in frek_alat_df.columns]
+    missing = [key for key in keys if key not in cases_df.columns]
+    if missing:
+        raise ValueError(f"Kolom kunci tidak ada di daftar kasus: {', '.join(missing)}")
+    tarif_columns = [col for col in TARIF_COLUMNS if col in frek_alat_df.columns and col not in cases_df.columns]
+
+    # DENDA satuan hanya berlaku jika semua kolom tarif berasal dari tabel (tidak ditimpa kolom kasus)
+    use_unit_fines = unit_fines is not None and \
+        len(tarif_columns) == len([col for col in TARIF_COLUMNS if col in frek_alat_df.columns])
+
+    tarif_df = frek_alat_df[keys + tarif_columns]
+    if use_unit_fines:
+        tarif_df = tarif_df.assign(**{_POSISI_TARIF: frek_alat_df.index.to_numpy()})
+    tarif_df = tarif_df.drop_duplicates(subset=keys, keep='first')
+    if 'ZONA' in keys:
+        tarif_df = tarif_df.assign(ZONA=pd.to_numeric(tarif_df['ZONA'], errors='coerce'))
+    tarif_df = tarif_df.assign(**{'DATA TARIF DITEMUKAN': True})
+
+    merged_df = cases_df.merge(tarif_df, on=keys, how='left', sort=False)
+    merged_df['DATA TARIF DITEMUKAN'] = merged_df['DATA TARIF DITEMUKAN'].fillna(False).astype(bool)
+
+    # Persentase per kasus dari JML BULAN (label bracket atau jumlah bulan), default 1.0 seperti get_percentage
+    if 'JML BULAN' in merged_df.columns:
+        persentase = lookup_percentages(persentase_data, merged_df['JML BULAN'])
+    else:
+        persentase = 1.0
+
+    # Jumlah kosong tetap NaN agar ditandai tidak valid di STATUS PERHITUNGAN
+    jumlah_frekuensi = merged_df['JUMLAH FREKUENSI'].to_numpy(dtype=float, na_value=np.nan)
+    jumlah_perangkat = merged_df['JUMLAH PERANGKAT'].to_numpy(dtype=float, na_value=np.nan)
+
+    if use_unit_fines:
+        return _calculate_from_unit_fines(
+            merged_df,
+            unit_fines,
+            jumlah_frekuensi,
+            jumlah_perangkat,
+            persentase,
+            merged_df['JENIS PELANGGARAN'].to_numpy()
+        )
+
+    return calculate_denda_frame(
+        merged_df,
+        jumlah_frekuensi,
+        jumlah_perangkat,
+        persentase,
+        merged_df['JENIS PELANGGARAN'].to_numpy()
+    )
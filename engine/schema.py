@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# Kolom dimensi (teks berulang) yang disimpan sebagai kode kategori
+DIMENSION_COLUMNS = ['JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'JML BULAN', 'SATUAN PELANGGARAN']
+
+
+# Fungsi bantu untuk memperkecil kolom numerik tanpa mengubah nilainya
+def _compact_numeric(column):
+    values = column.to_numpy(dtype=float, na_value=np.nan)
+    has_nan = np.isnan(values).any()
+
+    # Bilangan bulat tanpa NaN: tipe integer terkecil yang muat (mis. ZONA -> int8)
+    if not has_nan and np.all(values == np.round(values)):
+        return pd.to_numeric(column, downcast='integer')
+
+    # float32 hanya jika semua nilai tetap sama persis setelah dikonversi
+    as_float32 = values.astype(np.float32)
+    if np.array_equal(as_float32.astype(float), values, equal_nan=True):
+        return pd.Series(as_float32, index=column.index, name=column.name)
+
+    return column.astype(float)
+
+
+# Fungsi untuk mengubah tabel FREK & ALAT ke skema ringkas
+def compact_frek_alat(df):
+    """
+    Mengembalikan salinan df dengan kolom dimensi sebagai kategori dan kolom
+    numerik sebagai tipe terkecil yang tidak mengubah nilai (int8/int32,
+    float32 bila lossless). Kolom lain dibiarkan apa adanya.
+    """
+    compact_df = df.copy()
+    for column in compact_df.columns:
+        series = compact_df[column]
+        if column in DIMENSION_COLUMNS:
+            compact_df[column] = series.astype('category')
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            compact_df[column] = _compact_numeric(series)
+    return compact_df
+
+
+# Fungsi untuk membandingkan pemakaian memori tabel sebelum dan sesudah dipadatkan
+def memory_report(before_df, after_df):
+    before = int(before_df.memory_usage(deep=True).sum())
+    after = int(after_df.memory_usage(deep=True).sum())
+    return {
+        'bytes_before': before,
+        'bytes_after': after,
+        'ratio': after / before if before else 1.0,
+        'dtypes': {str(column): str(dtype) for column, dtype in after_df.dtypes.items()},
+    }
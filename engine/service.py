@@ -0,0 +1,534 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from .constants import CASE_COLUMNS, RESULT_COLUMNS, STATUS_COLUMN, STATUS_OK, TARIF_COLUMNS
+from .export import write_csv
+from .filtering import lookup_positions
+from .fixedpoint import SEN
+from .metrics import flush_metrics, timed
+from .pricing import normalize_cases, price_cases
+
+logger = logging.getLogger(__name__)
+
+# Alamat default layanan (dapat diubah lewat environment variable)
+SERVICE_HOST = os.environ.get("DENDA_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("DENDA_SERVICE_PORT", "8600"))
+
+# Jumlah kasus yang dihitung sekaligus pada job batch
+BATCH_CHUNK_ROWS = 50_000
+
+# Jumlah job batch yang disimpan; job selesai yang paling lama dihapus lebih dulu
+MAX_BATCH_JOBS = 100
+
+# Jumlah job batch yang boleh menunggu atau sedang dihitung; job baru ditolak (429) jika penuh
+MAX_PENDING_JOBS = 20
+
+# Batas ukuran body untuk /price (satu kasus)
+MAX_PRICE_BODY = 1 << 20
+
+_READ_BLOCK = 1 << 16
+
+# Kolom file hasil job batch: sama untuk setiap potongan, apa pun kolom yang ada di input
+BATCH_RESULT_COLUMNS = CASE_COLUMNS + TARIF_COLUMNS + RESULT_COLUMNS
+
+# Respons layanan: body berupa bytes atau iterable bytes (dikirim per potongan)
+Response = namedtuple('Response', ['status', 'content_type', 'body'])
+
+
+# Error saat antrean job batch sudah penuh
+class JobQueueFull(RuntimeError):
+    pass
+
+
+# Respons klien in-process dengan body lengkap
+class ClientResponse(namedtuple('ClientResponse', ['status', 'content_type', 'body'])):
+    def json(self):
+        return json.loads(self.body)
+
+
+# Fungsi bantu untuk membuat respons JSON
+def _json_response(status, payload):
+    return Response(status, 'application/json', json.dumps(payload).encode('utf-8'))
+
+
+# Fungsi bantu untuk mengubah hasil perhitungan menjadi list dict siap JSON (NaN -> null)
+def _records(priced_df):
+    return json.loads(priced_df.to_json(orient='records', double_precision=15))
+
+
+# Fungsi bantu untuk menyeragamkan body (bytes, str, file atau iterable bytes) menjadi iterable bytes
+def _as_blocks(body):
+    if body is None:
+        return iter(())
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if isinstance(body, (bytes, bytearray)):
+        return iter([bytes(body)])
+    if hasattr(body, 'read'):
+        return iter(lambda: body.read(_READ_BLOCK), b"")
+    return iter(body)
+
+
+# Fungsi bantu untuk membaca seluruh body kecil (dibatasi limit byte)
+def _read_all(blocks, limit=MAX_PRICE_BODY):
+    data = bytearray()
+    for block in blocks:
+        data.extend(block)
+        if len(data) > limit:
+            raise ValueError(f"Body lebih dari {limit} byte")
+    return bytes(data)
+
+
+# Fungsi bantu untuk menentukan format input batch dari Content-Type
+def _batch_format(content_type):
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type.endswith("csv"):
+        return "csv"
+    if content_type.endswith(("ndjson", "jsonl", "json-seq")):
+        return "ndjson"
+    if content_type.endswith("json"):
+        return "json"
+    raise ValueError("Content-Type batch harus text/csv, application/json atau application/x-ndjson")
+
+
+# Fungsi bantu untuk membaca file kasus batch sebagai potongan DataFrame
+def _read_case_chunks(path, fmt, chunk_size):
+    if os.path.getsize(path) == 0:
+        return
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == "ndjson":
+        # Kolom potongan pertama tetap ada di potongan berikutnya (kosong jika kasusnya tidak memuat kunci itu)
+        columns = None
+        with pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False) as reader:
+            for chunk in reader:
+                if columns is None:
+                    columns = list(chunk.columns)
+                else:
+                    columns = list(dict.fromkeys(columns + list(chunk.columns)))
+                    chunk = chunk.reindex(columns=columns)
+                yield chunk
+    else:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        cases = payload.get("cases") if isinstance(payload, dict) else payload
+        if not isinstance(cases, list):
+            raise ValueError("JSON batch harus berupa list kasus atau objek {\"cases\": [...]}")
+        # Kunci tiap kasus boleh berbeda; semua potongan memakai gabungan kunci seluruh kasus
+        columns = list(dict.fromkeys(key for case in cases if isinstance(case, dict) for key in case))
+        for start in range(0, len(cases), chunk_size):
+            yield pd.DataFrame.from_records(cases[start:start + chunk_size], columns=columns)
+
+
+class PricingService:
+    """
+    Layanan perhitungan denda yang menyimpan tabel tarif di memori.
+
+    store boleh berupa TariffStore atau fungsi tanpa argumen yang mengembalikan
+    store terbaru (mis. lambda: watcher.get(path)), sehingga versi baru workbook
+    langsung dipakai. Semua endpoint memakai aturan price_cases/calculate_denda.
+
+    handle() tidak bergantung pada socket: server HTTP dan ServiceClient sama-sama
+    memanggilnya. Job batch disimpan ke file sementara di work_dir dan dihitung
+    per potongan di thread latar belakang; paling banyak max_pending job boleh
+    menunggu atau berjalan sekaligus. Semua perubahan job dilakukan di bawah lock
+    yang sama dengan pembacanya.
+    """
+
+    def __init__(self, store, max_workers=1, chunk_size=BATCH_CHUNK_ROWS, max_jobs=MAX_BATCH_JOBS, work_dir=None,
+                 max_pending=MAX_PENDING_JOBS):
+        self._store = store if callable(store) else (lambda: store)
+        self.chunk_size = chunk_size
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.work_dir = tempfile.mkdtemp(prefix="denda-service-", dir=work_dir)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="denda-batch")
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+
+    # Hentikan worker batch dan hapus file sementara
+    def close(self):
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    # Ambil store tarif terbaru, None jika belum siap
+    def current_store(self):
+        store = self._store()
+        if store is None or store.frek_alat_df is None:
+            return None
+        return store
+
+    # Hitung denda satu kasus (dict kolom CASE_COLUMNS)
+    @timed('service_price')
+    def price(self, case, store=None):
+        store = store or self.current_store()
+        if not isinstance(case, dict) or not case:
+            raise ValueError("Kasus harus berupa objek JSON berisi kolom kasus")
+
+        cases_df = normalize_cases(pd.DataFrame([case]))
+
+        # Persempit tabel dengan indeks pencarian; urutan baris tetap sehingga baris pertama sama
+        tarif_df = store.frek_alat_df
+        if store.lookup_index is not None:
+            filters = {key: cases_df.at[0, key] for key in store.lookup_index['keys'] if key in cases_df.columns}
+            positions = lookup_positions(store.lookup_index, filters)
+            if positions is not None:
+                tarif_df = tarif_df.iloc[positions]
+
+        priced = price_cases(tarif_df, cases_df, store.persentase_data, store.unit_fines)
+        return _records(priced)[0]
+
+    # Simpan body batch ke file dan antrekan perhitungannya; kembalikan status job
+    def submit_batch(self, body, content_type):
+        fmt = _batch_format(content_type)
+        job_id = uuid.uuid4().hex
+        input_path = os.path.join(self.work_dir, f"{job_id}.input")
+
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'format': fmt,
+            'rows': 0,
+            'chunks': 0,
+            'not_found': 0,
+            'invalid': 0,
+            'total_tagihan_denda_sen': 0,
+            'error': None,
+            'input_path': input_path,
+            'result_path': os.path.join(self.work_dir, f"{job_id}.csv"),
+        }
+        # Tempat di antrean dipesan sebelum body disalin agar upload yang ditolak tidak ditulis ke disk
+        with self._jobs_lock:
+            pending = sum(1 for other in self._jobs.values() if other['status'] in ('queued', 'running'))
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"Antrean job batch penuh ({pending} job menunggu atau berjalan)")
+            self._jobs[job_id] = job
+            self._evict_jobs()
+
+        # Body disalin per blok sehingga memori tidak bergantung pada ukuran upload
+        try:
+            with open(input_path, "wb") as f:
+                for block in _as_blocks(body):
+                    f.write(block)
+        except BaseException:
+            with self._jobs_lock:
+                self._jobs.pop(job_id, None)
+            self._remove_job_files(job)
+            raise
+
+        self._executor.submit(self._run_batch, job)
+        return self.job_status(job_id)
+
+    # Hapus job selesai yang paling lama jika jumlah job melebihi max_jobs
+    def _evict_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in ('done', 'failed')]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            self._remove_job_files(self._jobs.pop(job_id))
+
+    @staticmethod
+    def _remove_job_files(job):
+        for path in (job['input_path'], job['result_path']):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Ubah kolom job di bawah lock agar job_status tidak membaca status/ringkasan setengah diperbarui
+    def _update_job(self, job, **changes):
+        with self._jobs_lock:
+            job.update(changes)
+
+    @timed('service_batch')
+    def _run_batch(self, job):
+        self._update_job(job, status='running')
+        try:
+            store = self.current_store()
+            if store is None:
+                raise RuntimeError("Tabel tarif belum siap")
+
+            # Ringkasan dihitung sambil potongan hasil diteruskan ke penulis file
+            def tally(chunks):
+                summary = {key: 0 for key in ('rows', 'chunks', 'not_found', 'invalid', 'total_tagihan_denda_sen')}
+                for cases_df in chunks:
+                    priced = price_cases(store.frek_alat_df, cases_df, store.persentase_data, store.unit_fines)
+                    summary['rows'] += len(priced)
+                    summary['chunks'] += 1
+                    summary['not_found'] += int((~priced['DATA TARIF DITEMUKAN']).sum())
+                    summary['invalid'] += int((priced[STATUS_COLUMN] != STATUS_OK).sum())
+                    summary['total_tagihan_denda_sen'] += int(priced['TOTAL TAGIHAN DENDA (SEN)'].sum())
+                    self._update_job(job, **summary)
+                    # Semua potongan ditulis dengan kolom yang sama agar sejajar dengan header CSV
+                    yield priced.reindex(columns=BATCH_RESULT_COLUMNS)
+
+            write_csv(tally(_read_case_chunks(job['input_path'], job['format'], self.chunk_size)),
+                      job['result_path'])
+            self._update_job(job, status='done')
+        except Exception as e:
+            logger.error("Job batch %s gagal: %s", job['job_id'], e)
+            self._update_job(job, status='failed', error=str(e))
+        finally:
+            if os.path.exists(job['input_path']):
+                os.remove(job['input_path'])
+
+    # Ambil status job (tanpa path internal), None jika job tidak ada
+    def job_status(self, job_id):
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = {key: value for key, value in job.items() if not key.endswith('_path')}
+        status['total_tagihan_denda'] = status['total_tagihan_denda_sen'] / SEN
+        status['status_url'] = f"/price/batch/{job_id}"
+        status['result_url'] = f"/price/batch/{job_id}/result"
+        return status
+
+    # Hapus job beserta filenya; False jika job tidak ada atau masih berjalan
+    def delete_job(self, job_id):
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in ('done', 'failed'):
+                return False
+            self._remove_job_files(self._jobs.pop(job_id))
+        return True
+
+    # Hasilkan isi hasil job per potongan: CSV apa adanya atau NDJSON
+    def job_result(self, job_id, fmt="csv"):
+        # Job dibaca dan file dibuka di bawah lock: job yang dihapus/dievict setelahnya tetap bisa dibaca sampai habis
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None or not os.path.exists(job['result_path']):
+                return iter(())
+            f = open(job['result_path'], "rb")
+        return self._iter_result(f, fmt)
+
+    # Baca file hasil yang sudah dibuka per blok (CSV) atau per potongan baris (NDJSON), lalu tutup
+    def _iter_result(self, f, fmt):
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            if fmt == "ndjson":
+                for chunk in pd.read_csv(f, chunksize=self.chunk_size):
+                    yield chunk.to_json(orient='records', lines=True, double_precision=15).encode('utf-8')
+                return
+            yield from iter(lambda: f.read(_READ_BLOCK), b"")
+
+    # Tangani satu request; dipakai oleh server HTTP maupun ServiceClient
+    def handle(self, method, path, headers=None, body=None):
+        headers = {str(key).lower(): value for key, value in (headers or {}).items()}
+        url = urlsplit(path)
+        parts = [part for part in url.path.split("/") if part]
+        query = dict(parse_qsl(url.query))
+
+        try:
+            if parts == ['health'] and method == 'GET':
+                store = self.current_store()
+                return _json_response(200 if store else 503, {
+                    'status': 'ok' if store else 'loading',
+                    'version': store.version if store else None,
+                    'rows': len(store.frek_alat_df) if store else 0,
+                })
+
+            if parts == ['price']:
+                if method not in ('GET', 'POST'):
+                    return _json_response(405, {'error': "Gunakan GET atau POST"})
+                store = self.current_store()
+                if store is None:
+                    return _json_response(503, {'error': "Tabel tarif belum siap"})
+                if method == 'GET':
+                    case = query
+                else:
+                    try:
+                        case = json.loads(_read_all(_as_blocks(body)) or b"{}")
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"JSON tidak valid: {e}") from e
+                return _json_response(200, self.price(case, store))
+
+            if parts == ['price', 'batch']:
+                if method != 'POST':
+                    return _json_response(405, {'error': "Gunakan POST"})
+                return _json_response(202, self.submit_batch(body, headers.get('content-type')))
+
+            if len(parts) in (3, 4) and parts[:2] == ['price', 'batch']:
+                job_id = parts[2]
+                status = self.job_status(job_id)
+                if status is None:
+                    return _json_response(404, {'error': f"Job {job_id} tidak ditemukan"})
+
+                if len(parts) == 3 and method == 'GET':
+                    return _json_response(200, status)
+                if len(parts) == 3 and method == 'DELETE':
+                    if not self.delete_job(job_id):
+                        return _json_response(409, {'error': "Job masih diproses", 'job': status})
+                    return _json_response(200, {'deleted': job_id})
+                if parts[3:] == ['result'] and method == 'GET':
+                    if status['status'] != 'done':
+                        return _json_response(409, {'error': "Hasil job belum tersedia", 'job': status})
+                    fmt = query.get('format', 'csv')
+                    if fmt not in ('csv', 'ndjson'):
+                        raise ValueError("format harus csv atau ndjson")
+                    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+                    return Response(200, content_type, self.job_result(job_id, fmt))
+                return _json_response(405, {'error': f"Metode {method} tidak didukung"})
+
+            return _json_response(404, {'error': f"Path {url.path} tidak dikenal"})
+
+        except ValueError as e:
+            return _json_response(400, {'error': str(e)})
+        except JobQueueFull as e:
+            return _json_response(429, {'error': str(e)})
+        except Exception as e:
+            logger.error("Error saat menangani %s %s: %s", method, path, e)
+            return _json_response(500, {'error': str(e)})
+
+
+class ServiceClient:
+    """
+    Klien in-process untuk PricingService: memanggil handle() langsung tanpa
+    socket, sehingga endpoint dapat diuji dan dipakai dari job Python lain.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    def request(self, method, path, body=None, content_type=None, headers=None):
+        headers = dict(headers or {})
+        if content_type:
+            headers['Content-Type'] = content_type
+        response = self.service.handle(method, path, headers, body)
+        data = response.body if isinstance(response.body, bytes) else b"".join(response.body)
+        return ClientResponse(response.status, response.content_type, data)
+
+    def get(self, path):
+        return self.request('GET', path)
+
+    def post(self, path, body=None, content_type=None, json_body=None):
+        if json_body is not None:
+            body, content_type = json.dumps(json_body), 'application/json'
+        return self.request('POST', path, body, content_type)
+
+    def delete(self, path):
+        return self.request('DELETE', path)
+
+    # Tunggu job batch selesai (done/failed) dan kembalikan statusnya
+    def wait(self, job_id, timeout=None, interval=0.05):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.get(f"/price/batch/{job_id}").json()
+            if status.get('status') in ('done', 'failed') or (deadline is not None and time.monotonic() >= deadline):
+                return status
+            time.sleep(interval)
+
+
+# Fungsi bantu untuk membaca body request HTTP per blok (Content-Length atau chunked)
+def _request_blocks(rfile, headers):
+    if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+        while True:
+            size = int(rfile.readline().split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Lewati trailer sampai baris kosong
+                while rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            remaining = size
+            while remaining:
+                block = rfile.read(min(remaining, _READ_BLOCK))
+                if not block:
+                    return
+                remaining -= len(block)
+                yield block
+            rfile.readline()
+    else:
+        remaining = int(headers.get('Content-Length') or 0)
+        while remaining:
+            block = rfile.read(min(remaining, _READ_BLOCK))
+            if not block:
+                return
+            remaining -= len(block)
+            yield block
+
+
+# Fungsi untuk membuat server HTTP (ThreadingHTTPServer) di atas PricingService
+def make_server(service, host=SERVICE_HOST, port=SERVICE_PORT):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "DendaPricing/1.0"
+
+        def _dispatch(self):
+            body = _request_blocks(self.rfile, self.headers)
+            response = service.handle(self.command, self.path, dict(self.headers), body)
+            # Habiskan sisa body agar koneksi keep-alive tetap sinkron
+            for _ in body:
+                pass
+
+            self.send_response(response.status)
+            self.send_header('Content-Type', response.content_type)
+            if isinstance(response.body, bytes):
+                self.send_header('Content-Length', str(len(response.body)))
+                self.end_headers()
+                self.wfile.write(response.body)
+                return
+
+            # Body streaming dikirim dengan chunked transfer encoding
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for block in response.body:
+                if block:
+                    self.wfile.write(f"{len(block):X}\r\n".encode('ascii') + block + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _dispatch_and_flush(self):
+            try:
+                self._dispatch()
+            finally:
+                # Agregat metrik ditulis ke file paling sering sekali per interval
+                flush_metrics()
+
+        do_GET = do_POST = do_DELETE = _dispatch_and_flush
+
+        def log_message(self, format, *args):
+            logger.info("%s %s", self.address_string(), format % args)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP perhitungan denda.")
+    parser.add_argument("workbook", help="File Excel tarif (berisi sheet FREK & ALAT dan Referensi)")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah thread job batch")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from .store import build_tariff_store
+
+    store = build_tariff_store(args.workbook)
+    if store.frek_alat_df is None:
+        parser.error(f"Sheet FREK & ALAT tidak ditemukan atau tidak valid di {args.workbook}")
+
+    service = PricingService(store, max_workers=args.workers)
+    server = make_server(service, args.host, args.port)
+    logger.info("Layanan denda berjalan di http://%s:%d (versi tarif %s)", args.host, server.server_port, store.version)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
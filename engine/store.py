@@ -0,0 +1,71 @@
+from collections import namedtuple
+from types import MappingProxyType
+
+from .cache import file_fingerprint, load_workbook
+from .facets import build_facet_tree
+from .filtering import build_lookup_index
+from .metrics import timed
+from .schema import compact_frek_alat, memory_report
+from .unitfines import precompute_unit_fines
+from .validation import validate_frek_alat
+
+# Data tarif satu versi workbook beserta struktur turunannya.
+# Satu objek dipakai bersama oleh semua sesi dan tidak boleh diubah.
+TariffStore = namedtuple('TariffStore', [
+    'version', 'file_path', 'sheet_names', 'frek_alat_df', 'persentase_data', 'lookup_index', 'facet_tree',
+    'memory_report', 'unit_fines', 'validation',
+])
+
+
+# Fungsi bantu untuk mengunci array NumPy di dalam indeks agar tidak dapat diubah
+def _freeze_index(index):
+    for positions in index['exact'].values():
+        positions.flags.writeable = False
+    for column_index in index['columns'].values():
+        for positions in column_index.values():
+            positions.flags.writeable = False
+    return MappingProxyType(index)
+
+
+# Fungsi untuk membangun store tarif read-only untuk satu versi workbook
+@timed('tariff_store')
+def build_tariff_store(file_path, fingerprint=None, cache_dir=None):
+    """
+    Memuat workbook (lewat cache parsing) dan menyiapkan indeks pencarian, pohon
+    facet, DENDA satuan per baris dan laporan validasi data. version adalah sidik
+    jari file; sesi cukup menyimpan (file_path, version) dan mengambil store yang
+    sama dari cache bersama.
+    """
+    fingerprint = fingerprint or file_fingerprint(file_path)
+    frek_alat_df, persentase_data, sheet_names = load_workbook(file_path, cache_dir, fingerprint)
+
+    lookup_index = facet_tree = memory = unit_fines = validation = None
+    if frek_alat_df is not None:
+        # Validasi dijalankan pada tabel hasil parsing, sebelum skema diringkas
+        validation = validate_frek_alat(frek_alat_df)
+
+        # Simpan tabel dalam skema ringkas (kategori, int8/int32, float32 bila lossless)
+        compact_df = compact_frek_alat(frek_alat_df)
+        memory = memory_report(frek_alat_df, compact_df)
+        frek_alat_df = compact_df
+
+        # Hasil filter/iloc dari tabel bersama aman diubah: pandas (Copy-on-Write)
+        # menyalin data saat ditulis, sehingga frek_alat_df sendiri tidak ikut berubah
+        lookup_index = _freeze_index(build_lookup_index(frek_alat_df))
+        facet_tree = MappingProxyType(build_facet_tree(frek_alat_df))
+
+        # DENDA satuan per baris untuk semua jenis pelanggaran dan bracket JML BULAN
+        unit_fines = precompute_unit_fines(frek_alat_df, persentase_data)
+
+    return TariffStore(
+        version=fingerprint,
+        file_path=file_path,
+        sheet_names=tuple(sheet_names),
+        frek_alat_df=frek_alat_df,
+        persentase_data=dict(persentase_data),
+        lookup_index=lookup_index,
+        facet_tree=facet_tree,
+        memory_report=memory,
+        unit_fines=unit_fines,
+        validation=validation,
+    )
@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .constants import JENIS_PELANGGARAN, STATUS_COLUMN, STATUS_OK
+from .fixedpoint import SEN, _checked_product, from_fixed
+from .metrics import timed
+from .parsing import lookup_percentages
+from .pricing import calculate_denda_frame
+
+# Hasil simulasi skenario dalam bentuk ringkas: DENDA (sen, int64) dan persentase per
+# (jenis pelanggaran, bracket) beserta ukuran sumbu. TOTAL TAGIHAN DENDA setiap kombinasi
+# adalah DENDA * JUMLAH FREKUENSI * JUMLAH PERANGKAT dan baru dihitung saat dibutuhkan.
+SweepResult = namedtuple('SweepResult', ['jenis_pelanggaran', 'brackets', 'persentase', 'denda', 'max_frekuensi',
+                                         'max_perangkat'])
+
+
+# Fungsi untuk menghitung denda satu baris tarif untuk seluruh kombinasi skenario
+@timed('sweep')
+def sweep_denda(row, persentase_data, max_frekuensi, max_perangkat):
+    """
+    Menghitung DENDA untuk setiap kombinasi jenis pelanggaran dan bracket JML
+    BULAN dengan aturan calculate_denda_frame. Skenario JUMLAH FREKUENSI
+    1..max_frekuensi dan JUMLAH PERANGKAT 1..max_perangkat tidak disimpan satu
+    per satu: gunakan sweep_matrix (heatmap) atau sweep_frame (tabel panjang).
+    OverflowError jika DENDA salah satu kombinasi tidak dapat dihitung.
+    """
+    brackets = list(persentase_data)
+    n_jenis, n_bracket = len(JENIS_PELANGGARAN), len(brackets)
+
+    # Satu baris per (jenis pelanggaran, bracket)
+    base_df = pd.DataFrame([row]).iloc[np.zeros(n_jenis * n_bracket, dtype=int)].reset_index(drop=True)
+    jenis = np.repeat(JENIS_PELANGGARAN, n_bracket)
+    persentase = np.tile(lookup_percentages(persentase_data, brackets), n_jenis)
+    priced = calculate_denda_frame(base_df, 1, 1, persentase, jenis)
+    failed = priced[STATUS_COLUMN] != STATUS_OK
+    if failed.any():
+        raise OverflowError(priced.loc[failed, STATUS_COLUMN].iloc[0])
+
+    return SweepResult(
+        jenis_pelanggaran=tuple(JENIS_PELANGGARAN),
+        brackets=tuple(brackets),
+        persentase=priced['PERSENTASE'].to_numpy().reshape(n_jenis, n_bracket),
+        denda=priced['DENDA (SEN)'].to_numpy().reshape(n_jenis, n_bracket),
+        max_frekuensi=int(max_frekuensi),
+        max_perangkat=int(max_perangkat),
+    )
+
+
+# Fungsi bantu untuk mengambil sumbu JUMLAH FREKUENSI dan JUMLAH PERANGKAT
+def _sweep_axes(sweep):
+    return np.arange(1, sweep.max_frekuensi + 1), np.arange(1, sweep.max_perangkat + 1)
+
+
+# Fungsi untuk menyusun matriks frekuensi x perangkat satu (jenis pelanggaran, bracket) untuk heatmap
+def sweep_matrix(sweep, jenis_pelanggaran, jml_bulan):
+    j = sweep.jenis_pelanggaran.index(jenis_pelanggaran)
+    b = sweep.brackets.index(jml_bulan)
+    frekuensi, perangkat = _sweep_axes(sweep)
+
+    total = _checked_product(sweep.denda[j, b], frekuensi[:, None], perangkat[None, :])
+    return pd.DataFrame(
+        from_fixed(total, SEN),
+        index=pd.Index(frekuensi, name='JUMLAH FREKUENSI'),
+        columns=pd.Index(perangkat, name='JUMLAH PERANGKAT'),
+    )
+
+
+# Fungsi untuk menyusun tabel panjang semua kombinasi skenario (untuk download)
+def sweep_frame(sweep):
+    frekuensi, perangkat = _sweep_axes(sweep)
+
+    # (jenis, bracket, frekuensi, perangkat), dalam sen (int64, eksak)
+    total = _checked_product(sweep.denda[:, :, None, None], frekuensi[None, None, :, None],
+                             perangkat[None, None, None, :])
+
+    j, b, f, p = np.indices(total.shape).reshape(4, -1)
+    return pd.DataFrame({
+        'JENIS PELANGGARAN': np.asarray(sweep.jenis_pelanggaran)[j],
+        'JML BULAN': np.asarray(sweep.brackets)[b],
+        'PERSENTASE': sweep.persentase[j, b],
+        'DENDA': from_fixed(sweep.denda[j, b], SEN),
+        'JUMLAH FREKUENSI': frekuensi[f],
+        'JUMLAH PERANGKAT': perangkat[p],
+        'TOTAL TAGIHAN DENDA': from_fixed(total.ravel(), SEN),
+    })
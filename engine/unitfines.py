@@ -0,0 +1,165 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from .constants import JENIS_PELANGGARAN, PRICING_COLUMNS, STATUS_COLUMN, STATUS_OK
+from .fixedpoint import _INT64_LIMIT, POIN_SCALE, SEN, _masked_product, from_fixed, to_fixed
+from .metrics import timed
+from .parsing import lookup_percentages
+from .pricing import _count_column, _row_status, _whole_count, _whole_counts, calculate_denda_frame
+
+# Persentase yang dipakai jika JML BULAN tidak dipilih atau tidak dikenali (lihat get_percentage)
+_PERSENTASE_FALLBACK = 1.0
+
+# Hasil perhitungan per baris tarif yang tidak bergantung pada input pengguna.
+# slots: persentase yang sudah dihitung (terurut); indeks: (jenis, baris);
+# persentase: (slot, baris); total_poin dan denda: (jenis, slot, baris) dalam int64 fixed-point;
+# overflow: (jenis, slot, baris) True jika DENDA satuan sendiri melewati batas int64 (total_poin/denda 0).
+UnitFines = namedtuple('UnitFines', ['slots', 'indeks', 'persentase', 'maks_poin', 'tarif_denda', 'total_poin',
+                                     'denda', 'overflow'])
+
+
+# Fungsi untuk menghitung TOTAL POIN dan DENDA satuan setiap baris tarif untuk semua jenis pelanggaran dan bracket
+@timed('unit_fines')
+def precompute_unit_fines(frek_alat_df, persentase_data):
+    """
+    Menjalankan calculate_denda_frame sekali per (jenis pelanggaran, persentase
+    bracket Referensi, termasuk persentase 1.0 untuk JML BULAN "Semua") atas
+    seluruh tabel, dengan 1 frekuensi dan 1 perangkat. Perhitungan berikutnya
+    cukup mengambil DENDA satuan dengan indeks lalu mengalikannya dengan jumlah
+    frekuensi dan perangkat. Baris yang DENDA satuannya sudah melewati batas
+    int64 ditandai di overflow dan tetap dilaporkan gagal oleh lookup.
+
+    Array sejajar dengan posisi baris frek_alat_df. Mengembalikan None jika kolom
+    INDEKS PELANGGARAN tidak ada (aplikasi mengisinya dengan nilai default sendiri).
+    """
+    if not {'INDEKS PELANGGARAN PERTAMA', 'INDEKS PELANGGARAN BERULANG'}.issubset(frek_alat_df.columns):
+        return None
+
+    slots = np.unique(np.append(lookup_percentages(persentase_data, list(persentase_data)), _PERSENTASE_FALLBACK))
+    base_df = frek_alat_df[[column for column in PRICING_COLUMNS if column in frek_alat_df.columns]]
+
+    n = len(base_df)
+    indeks = np.zeros((len(JENIS_PELANGGARAN), n))
+    persentase = np.zeros((len(slots), n))
+    total_poin = np.zeros((len(JENIS_PELANGGARAN), len(slots), n), dtype=np.int64)
+    denda = np.zeros((len(JENIS_PELANGGARAN), len(slots), n), dtype=np.int64)
+    overflow = np.zeros((len(JENIS_PELANGGARAN), len(slots), n), dtype=bool)
+    maks_poin = tarif_denda = None
+
+    for j, jenis_pelanggaran in enumerate(JENIS_PELANGGARAN):
+        for s, slot in enumerate(slots):
+            priced = calculate_denda_frame(base_df, 1, 1, slot, jenis_pelanggaran)
+            total_poin[j, s] = to_fixed(priced['TOTAL POIN'].to_numpy(), POIN_SCALE)
+            denda[j, s] = priced['DENDA (SEN)'].to_numpy()
+            overflow[j, s] = priced[STATUS_COLUMN].to_numpy() != STATUS_OK
+            persentase[s] = priced['PERSENTASE'].to_numpy()
+        indeks[j] = priced['INDEKS YANG DIGUNAKAN'].to_numpy()
+        maks_poin = priced['MAKS POIN'].to_numpy()
+        tarif_denda = priced['TARIF DENDA'].to_numpy()
+
+    for array in (slots, indeks, persentase, maks_poin, tarif_denda, total_poin, denda, overflow):
+        array.flags.writeable = False
+
+    return UnitFines(slots, indeks, persentase, maks_poin, tarif_denda, total_poin, denda, overflow)
+
+
+# Fungsi untuk mencari slot persentase yang sudah dihitung (-1 jika persentase tidak ada di slots)
+def slot_positions(unit_fines, persentase):
+    persentase = np.asarray(persentase, dtype=float)
+    slots = unit_fines.slots
+    finite = slots[~np.isnan(slots)]
+
+    positions = np.searchsorted(finite, persentase).clip(0, max(len(finite) - 1, 0))
+    found = (positions < len(finite)) & (finite[positions] == persentase) if len(finite) else \
+        np.zeros(persentase.shape, dtype=bool)
+    result = np.where(found, positions, -1)
+
+    # Persentase kosong (NaN) hanya cocok dengan slot NaN
+    if len(finite) < len(slots):
+        result = np.where(np.isnan(persentase), len(slots) - 1, result)
+    return result
+
+
+# Fungsi untuk menghitung kolom hasil dari DENDA satuan: satu pengambilan indeks dan satu perkalian
+def lookup_denda_columns(unit_fines, positions, slots, jumlah_frekuensi, jumlah_perangkat, jenis_pelanggaran):
+    """
+    positions dan slots harus valid (>= 0). Mengembalikan dict kolom dengan nama
+    dan nilai yang sama seperti hasil calculate_denda_frame, termasuk STATUS
+    PERHITUNGAN dan nilai kosong untuk baris yang DENDA satuannya overflow.
+    """
+    jenis = np.where(np.asarray(jenis_pelanggaran) == JENIS_PELANGGARAN[0], 0, 1)
+    counts_frekuensi, valid_frekuensi = _whole_counts(jumlah_frekuensi)
+    counts_perangkat, valid_perangkat = _whole_counts(jumlah_perangkat)
+
+    n = len(positions)
+    denda = unit_fines.denda[jenis, slots, positions]
+    total_tagihan_denda, overflow = _masked_product(denda, counts_frekuensi, counts_perangkat)
+    # Sama dengan calculate_denda_frame: overflow di langkah mana pun mengosongkan TOTAL POIN dan DENDA
+    overflow = np.broadcast_to(overflow, (n,)) | unit_fines.overflow[jenis, slots, positions]
+    status, jumlah_invalid = _row_status(n, valid_frekuensi, valid_perangkat, overflow)
+    gagal = overflow | jumlah_invalid
+    total_tagihan_denda = np.where(gagal, 0, np.broadcast_to(total_tagihan_denda, (n,)))
+    total_poin = unit_fines.total_poin[jenis, slots, positions]
+    denda = np.where(overflow, 0, denda)
+
+    return {
+        'INDEKS YANG DIGUNAKAN': unit_fines.indeks[jenis, positions],
+        'PERSENTASE': unit_fines.persentase[slots, positions],
+        'MAKS POIN': unit_fines.maks_poin[positions],
+        'TOTAL POIN': np.where(overflow, np.nan, from_fixed(total_poin, POIN_SCALE)),
+        'TARIF DENDA': unit_fines.tarif_denda[positions],
+        'DENDA': np.where(overflow, np.nan, from_fixed(denda, SEN)),
+        'JUMLAH FREKUENSI': _count_column(n, jumlah_frekuensi, counts_frekuensi, valid_frekuensi),
+        'JUMLAH PERANGKAT': _count_column(n, jumlah_perangkat, counts_perangkat, valid_perangkat),
+        'TOTAL TAGIHAN DENDA': np.where(gagal, np.nan, from_fixed(total_tagihan_denda, SEN)),
+        'DENDA (SEN)': denda,
+        'TOTAL TAGIHAN DENDA (SEN)': total_tagihan_denda,
+        STATUS_COLUMN: status,
+    }
+
+
+# Fungsi bantu untuk mencari slot satu persentase (versi skalar slot_positions, -1 jika tidak ada)
+def _slot_position(unit_fines, persentase):
+    persentase = float(persentase)
+    slots = unit_fines.slots.tolist()
+    if math.isnan(persentase):
+        return len(slots) - 1 if slots and math.isnan(slots[-1]) else -1
+    for slot, value in enumerate(slots):
+        if value == persentase:
+            return slot
+    return -1
+
+
+# Fungsi untuk menghitung denda satu baris tarif dari DENDA satuan (None jika persentase belum dihitung)
+def lookup_denda(unit_fines, position, jumlah_frekuensi, jumlah_perangkat, persentase=1.0,
+                 jenis_pelanggaran="Pelanggaran Pertama"):
+    """
+    Versi cepat calculate_denda untuk baris ke-position tabel tarif store:
+    mengembalikan dict yang sama, atau None jika persentase tidak termasuk
+    bracket yang sudah dihitung sehingga pemanggil perlu memakai calculate_denda.
+    OverflowError seperti calculate_denda jika DENDA satuan atau totalnya
+    melewati batas int64. Nilai diambil langsung dengan indeks skalar dan dikalikan dengan int Python.
+    """
+    jumlah_frekuensi = _whole_count(jumlah_frekuensi, 'JUMLAH FREKUENSI')
+    jumlah_perangkat = _whole_count(jumlah_perangkat, 'JUMLAH PERANGKAT')
+    slot = _slot_position(unit_fines, persentase)
+    if slot < 0 or not 0 <= position < len(unit_fines.maks_poin):
+        return None
+
+    jenis = 0 if jenis_pelanggaran == JENIS_PELANGGARAN[0] else 1
+    denda = int(unit_fines.denda[jenis, slot, position])
+    total_tagihan_denda = denda * jumlah_frekuensi * jumlah_perangkat
+    if unit_fines.overflow[jenis, slot, position] or abs(total_tagihan_denda) >= _INT64_LIMIT:
+        raise OverflowError("Nilai terlalu besar untuk perhitungan fixed-point int64")
+
+    return {
+        'indeks': float(unit_fines.indeks[jenis, position]),
+        'persentase': float(unit_fines.persentase[slot, position]),
+        'maks_poin': float(unit_fines.maks_poin[position]),
+        'total_poin': int(unit_fines.total_poin[jenis, slot, position]) / POIN_SCALE,
+        'tarif_denda': float(unit_fines.tarif_denda[position]),
+        'denda': denda / SEN,
+        'total_tagihan_denda': total_tagihan_denda / SEN
+    }
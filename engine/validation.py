@@ -0,0 +1,158 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .constants import LOOKUP_KEYS, MAKS_POIN_DEFAULT, RAW_VALUES_ATTR
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Tingkat masalah: ERROR menghasilkan denda yang salah, PERINGATAN memakai nilai pengganti
+TINGKAT_ERROR = 'ERROR'
+TINGKAT_PERINGATAN = 'PERINGATAN'
+
+# Kolom laporan validasi (kolom kunci ikut ditampilkan agar baris mudah dicari di workbook)
+VALIDATION_COLUMNS = ['BARIS', 'TINGKAT', 'PEMERIKSAAN', 'KOLOM', 'NILAI', 'KETERANGAN'] + LOOKUP_KEYS
+
+
+# Fungsi bantu untuk mengambil kolom sebagai angka (NaN jika kolom tidak ada atau bukan angka)
+def _numeric(df, column):
+    if column in df.columns:
+        return pd.to_numeric(df[column], errors='coerce')
+    return pd.Series(np.nan, index=df.index)
+
+
+# Fungsi untuk memeriksa seluruh tabel FREK & ALAT sekaligus dan menyusun laporan masalah data
+@timed('validation')
+def validate_frek_alat(frek_alat_df):
+    """
+    Menjalankan semua pemeriksaan sebagai operasi kolom atas seluruh tabel:
+    TARIF DENDA kosong/nol/negatif, JENIS IZIN tidak dikenal, ZONA kosong atau
+    bukan angka, kunci pencarian ganda, % di luar rentang, dan MAKS POIN kosong
+    yang diganti nilai default.
+
+    Mengembalikan DataFrame satu baris per (baris tarif, masalah) dengan kolom
+    VALIDATION_COLUMNS. BARIS adalah nomor baris data (1 = baris pertama setelah
+    header). NILAI adalah isi sel di workbook: untuk sel numerik yang bukan angka
+    dipakai teks aslinya dari attrs[RAW_VALUES_ATTR] (lihat process_frek_alat_data).
+    Laporan kosong berarti tidak ada masalah.
+    """
+    if frek_alat_df is None or frek_alat_df.empty:
+        return pd.DataFrame(columns=VALIDATION_COLUMNS)
+
+    checks = []
+
+    def add(mask, tingkat, pemeriksaan, kolom, keterangan):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            checks.append((mask, tingkat, pemeriksaan, kolom, keterangan))
+
+    tarif_denda = _numeric(frek_alat_df, 'TARIF DENDA')
+    add(tarif_denda.isna(), TINGKAT_ERROR, 'TARIF DENDA kosong', 'TARIF DENDA',
+        "TARIF DENDA kosong atau bukan angka; dihitung sebagai 0 sehingga DENDA = 0")
+    add(tarif_denda == 0, TINGKAT_ERROR, 'TARIF DENDA nol', 'TARIF DENDA', "TARIF DENDA bernilai 0 sehingga DENDA = 0")
+    add(tarif_denda < 0, TINGKAT_ERROR, 'TARIF DENDA negatif', 'TARIF DENDA', "TARIF DENDA bernilai negatif")
+
+    jenis_izin = None
+    if 'JENIS IZIN' in frek_alat_df.columns:
+        jenis_izin = frek_alat_df['JENIS IZIN'].astype(str).str.strip().str.upper()
+        add(~jenis_izin.isin(list(MAKS_POIN_DEFAULT)), TINGKAT_PERINGATAN, 'JENIS IZIN tidak dikenal', 'JENIS IZIN',
+            f"JENIS IZIN bukan salah satu dari {', '.join(MAKS_POIN_DEFAULT)}; tidak ada MAKS POIN default")
+
+    # MAKS POIN kosong diganti default JENIS IZIN, lalu 1 jika JENIS IZIN tidak dikenal (lihat calculate_denda_frame)
+    maks_poin = _numeric(frek_alat_df, 'MAKS POIN').fillna(0)
+    known = jenis_izin.isin(list(MAKS_POIN_DEFAULT)) if jenis_izin is not None else False
+    add((maks_poin == 0) & known, TINGKAT_PERINGATAN, 'MAKS POIN default', 'MAKS POIN',
+        "MAKS POIN kosong atau 0; memakai MAKS POIN default JENIS IZIN")
+    add((maks_poin == 0) & ~known, TINGKAT_ERROR, 'MAKS POIN kosong', 'MAKS POIN',
+        "MAKS POIN kosong atau 0 dan JENIS IZIN tidak dikenal; dihitung sebagai 1")
+
+    if 'ZONA' in frek_alat_df.columns:
+        add(_numeric(frek_alat_df, 'ZONA').isna(), TINGKAT_ERROR, 'ZONA bukan angka', 'ZONA',
+            "ZONA kosong atau bukan angka; baris tidak dapat dipilih lewat filter ZONA")
+
+    keys = [key for key in LOOKUP_KEYS if key in frek_alat_df.columns]
+    if keys:
+        duplicated = frek_alat_df.duplicated(subset=keys, keep='first').to_numpy()
+        add(duplicated, TINGKAT_PERINGATAN, 'Kunci ganda', ', '.join(keys),
+            "Kombinasi kunci sama dengan baris sebelumnya; hanya baris tarif pertama yang dipakai")
+
+    persen = _numeric(frek_alat_df, '%')
+    add((persen < 0) | (persen > 100), TINGKAT_ERROR, '% di luar rentang', '%',
+        "% harus antara 0 dan 1 (atau 0 dan 100 jika ditulis sebagai persen)")
+
+    if not checks:
+        return pd.DataFrame(columns=VALIDATION_COLUMNS)
+
+    # Gabungkan semua pemeriksaan menjadi satu tabel panjang: posisi dikumpulkan dulu,
+    # lalu kolom kunci diambil sekali dan kolom teks per pemeriksaan disebar lewat indeks
+    positions = [np.flatnonzero(mask) for mask, *_ in checks]
+    check_ids = np.repeat(np.arange(len(checks)), [len(part) for part in positions])
+    positions = np.concatenate(positions)
+    order = np.argsort(positions, kind='stable')
+    positions, check_ids = positions[order], check_ids[order]
+
+    raw_values = frek_alat_df.attrs.get(RAW_VALUES_ATTR, {})
+    nilai = np.full(len(positions), '', dtype=object)
+    for check_id, (_, _, _, kolom, _) in enumerate(checks):
+        if kolom in frek_alat_df.columns:
+            selected = check_ids == check_id
+            values = frek_alat_df[kolom].iloc[positions[selected]]
+            values = values.astype(object).where(values.notna(), '').astype(str)
+            # Sel yang sudah menjadi NaN saat parsing ditampilkan dengan teks aslinya
+            if raw_values.get(kolom):
+                raw = pd.Series(values.index.astype(str), index=values.index).map(raw_values[kolom])
+                values = raw.where(raw.notna(), values)
+            nilai[selected] = values.to_numpy()
+
+    def per_check(field):
+        return np.asarray([check[field] for check in checks], dtype=object)[check_ids]
+
+    rows = frek_alat_df.iloc[positions]
+    return pd.DataFrame({
+        'BARIS': positions + 1,
+        'TINGKAT': per_check(1),
+        'PEMERIKSAAN': per_check(2),
+        'KOLOM': per_check(3),
+        'NILAI': nilai,
+        'KETERANGAN': per_check(4),
+        **{key: rows[key].to_numpy() for key in keys},
+    }).reindex(columns=VALIDATION_COLUMNS)
+
+
+# Fungsi untuk meringkas laporan validasi: jumlah baris per pemeriksaan
+def validation_summary(report):
+    return report.groupby(['TINGKAT', 'PEMERIKSAAN'], sort=True).size().rename('JUMLAH BARIS').reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Periksa kualitas data sheet FREK & ALAT sebuah workbook tarif.")
+    parser.add_argument("workbook", help="File Excel tarif")
+    parser.add_argument("--output", default=None, help="Simpan laporan lengkap ke file .csv atau .xlsx")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from .cache import load_workbook
+    from .export import write_csv, write_excel
+
+    frek_alat_df, _, _ = load_workbook(args.workbook)
+    if frek_alat_df is None:
+        parser.error(f"Sheet FREK & ALAT tidak ditemukan atau tidak valid di {args.workbook}")
+
+    report = validate_frek_alat(frek_alat_df)
+    for row in validation_summary(report).itertuples(index=False):
+        logger.info("%s - %s: %d baris", row.TINGKAT, row.PEMERIKSAAN, row[2])
+    logger.info("Selesai: %d masalah pada %d baris tarif", len(report), report['BARIS'].nunique())
+
+    if args.output:
+        if args.output.lower().endswith('.xlsx'):
+            write_excel(report, args.output)
+        else:
+            write_csv(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+
+from .loader import find_excel_files
+from .store import build_tariff_store
+
+logger = logging.getLogger(__name__)
+
+# Interval default pemeriksaan folder Data (detik)
+WATCH_INTERVAL = float(os.environ.get("DENDA_WATCH_INTERVAL", "5"))
+
+
+# Fungsi bantu untuk mengambil (ukuran, mtime) file; None jika file tidak dapat dibaca
+def _file_stat(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class TariffWatcher:
+    """
+    Thread latar belakang yang memantau folder Data berdasarkan ukuran dan mtime
+    file, lalu memparsing ulang hanya workbook yang berubah.
+
+    Store tarif terbaru per file disimpan dalam dictionary yang diganti utuh
+    setiap ada perubahan, sehingga pembaca (sesi Streamlit) selalu melihat versi
+    lama atau versi baru secara lengkap tanpa perlu lock. Perubahan yang muncul
+    setelah pemindaian pertama baru diparsing jika ukuran dan mtime sudah sama
+    pada dua pemeriksaan berturut-turut (file tidak sedang disalin).
+    """
+
+    def __init__(self, data_folder="Data", interval=WATCH_INTERVAL, cache_dir=None):
+        self.data_folder = data_folder
+        self.interval = interval
+        self.cache_dir = cache_dir
+        self._stores = {}
+        self._stats = {}
+        self._pending = {}
+        self._errors = {}
+        self._scanned = False
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._poll_lock = threading.Lock()
+        self._thread = None
+
+    # Mulai thread pemantau (tidak memblokir pemanggil)
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="denda-tariff-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    # Hentikan thread pemantau
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error("Error saat memantau folder %s: %s", self.data_folder, e)
+            self._ready.set()
+            self._stop.wait(self.interval)
+
+    # Periksa folder sekali; kembalikan daftar file yang versinya diganti atau dihapus
+    def poll_once(self):
+        with self._poll_lock:
+            first_scan = not self._scanned
+            current = {file_path: _file_stat(file_path) for file_path in find_excel_files(self.data_folder)}
+            current = {file_path: stat for file_path, stat in current.items() if stat is not None}
+
+            changed = []
+            stores = dict(self._stores)
+            for file_path, stat in current.items():
+                if self._stats.get(file_path) == stat:
+                    continue
+
+                # Tunggu sampai ukuran dan mtime stabil, kecuali saat pemindaian pertama
+                if not first_scan and self._pending.get(file_path) != stat:
+                    self._pending[file_path] = stat
+                    continue
+
+                try:
+                    stores[file_path] = build_tariff_store(file_path, cache_dir=self.cache_dir)
+                except Exception as e:
+                    # Versi lama (jika ada) tetap dipakai; file dicoba lagi setelah berubah lagi
+                    logger.error("Error saat memuat ulang %s: %s", file_path, e)
+                    self._errors[file_path] = str(e)
+                    self._stats[file_path] = stat
+                    self._pending.pop(file_path, None)
+                    continue
+
+                self._stats[file_path] = stat
+                self._pending.pop(file_path, None)
+                self._errors.pop(file_path, None)
+                changed.append(file_path)
+                logger.info("Versi tarif %s diperbarui: %s", file_path, stores[file_path].version)
+
+            for file_path in set(stores) - set(current):
+                del stores[file_path]
+                changed.append(file_path)
+                logger.info("File %s dihapus dari folder, versi tarif dilepas", file_path)
+            for file_path in (set(self._stats) | set(self._pending) | set(self._errors)) - set(current):
+                self._stats.pop(file_path, None)
+                self._pending.pop(file_path, None)
+                self._errors.pop(file_path, None)
+
+            # Ganti dictionary secara utuh (atomik bagi pembaca)
+            if changed:
+                self._stores = stores
+            self._scanned = True
+            return changed
+
+    # Tunggu pemindaian pertama selesai (untuk CLI/pengujian); True jika sudah siap
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    # Ambil store tarif terbaru untuk file_path, None jika belum selesai diparsing
+    def get(self, file_path):
+        return self._stores.get(file_path)
+
+    # Ambil salinan dictionary {file_path: store} saat ini
+    def stores(self):
+        return dict(self._stores)
+
+    # Ambil pasangan (file_path, versi) semua store saat ini, terurut; berubah setiap ada versi baru
+    def versions(self):
+        return tuple(sorted((file_path, store.version) for file_path, store in self._stores.items()))
+
+    # Ambil pesan error pemuatan terakhir untuk file_path (None jika tidak ada)
+    def error(self, file_path):
+        return self._errors.get(file_path)
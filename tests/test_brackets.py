@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.constants import LOOKUP_KEYS, PERSENTASE_DEFAULT
+from engine.exposure import exposure_frame
+from engine.parsing import bracket_positions, compile_brackets, get_percentage, lookup_percentages
+from engine.pricing import calculate_denda, price_cases
+from engine.store import build_tariff_store
+from engine.sweep import sweep_denda, sweep_matrix
+from engine.unitfines import lookup_denda
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+
+# Batas bracket default: "0-12" = [0, 13), "13-24" = [13, 25), ">25" = [25, inf)
+EDGES = [
+    (0, 1.0),
+    (12, 1.0),
+    (12.5, 1.0),
+    (12.99, 1.0),
+    (13, 0.5),
+    (24, 0.5),
+    (24.9, 0.5),
+    (25, 0.25),
+    (25.5, 0.25),
+    (120, 0.25),
+]
+
+
+def test_compile_brackets_sorts_intervals():
+    table = compile_brackets({'>25': 0.25, '13-24': 0.5, '0-12': 1.0})
+
+    assert table.labels.tolist() == ['0-12', '13-24', '>25']
+    assert table.starts.tolist() == [0.0, 13.0, 25.0]
+    assert table.ends.tolist() == [13.0, 25.0, np.inf]
+    assert table.percentages.tolist() == [1.0, 0.5, 0.25]
+
+
+def test_bracket_positions_at_edges():
+    table = compile_brackets(PERSENTASE_DEFAULT)
+    months = [-1, 0, 12, 12.5, 13, 24.9, 25, 1000]
+    assert bracket_positions(table, months).tolist() == [-1, 0, 0, 0, 1, 1, 2, 2]
+
+
+@pytest.mark.parametrize("months, expected", EDGES)
+def test_month_edges_map_to_bracket(months, expected):
+    assert lookup_percentages(PERSENTASE_DEFAULT, [months])[0] == expected
+    assert get_percentage(PERSENTASE_DEFAULT, months) == expected
+
+
+@pytest.mark.parametrize("months, expected", EDGES)
+def test_month_text_maps_like_numbers(months, expected):
+    text = str(months).replace('.', ',')
+    assert lookup_percentages(PERSENTASE_DEFAULT, [text])[0] == expected
+    assert get_percentage(PERSENTASE_DEFAULT, text) == expected
+
+
+def test_numeric_and_text_columns_agree():
+    months = [months for months, _ in EDGES]
+    numeric = lookup_percentages(PERSENTASE_DEFAULT, pd.Series(months, dtype=float))
+    text = lookup_percentages(PERSENTASE_DEFAULT, pd.Series([str(value) for value in months], dtype=object))
+    assert numeric.tolist() == text.tolist() == [expected for _, expected in EDGES]
+
+
+def test_labels_unknown_values_and_empty_percentages():
+    persentase_data = {'0-12': 0.33, '13-24': 0.67, '>25': np.nan}
+    values = pd.Series(['13-24', ' 0-12 ', 'abc', None, '30', 30.0], dtype=object)
+
+    # Label dicocokkan langsung; nilai tidak dikenal, kosong atau persentase NaN memakai default
+    assert lookup_percentages(persentase_data, values, default=1.0).tolist() == [0.67, 0.33, 1.0, 1.0, 1.0, 1.0]
+    assert get_percentage(persentase_data, -3) == 1.0
+
+
+@pytest.mark.filterwarnings("ignore:Data Validation extension")
+def test_shipped_empty_bracket_prices_the_same_everywhere(tmp_path):
+    store = build_tariff_store(WORKBOOK, cache_dir=str(tmp_path))
+    assert np.isnan(store.persentase_data['>25'])
+
+    # Bracket dengan persentase kosong memakai default 1.0 di semua jalur
+    assert get_percentage(store.persentase_data, '>25') == 1.0
+    assert get_percentage(store.persentase_data, 30) == 1.0
+    assert lookup_percentages(store.persentase_data, ['>25', 30]).tolist() == [1.0, 1.0]
+
+    row = store.frek_alat_df.iloc[0].copy()
+    row['%'] = np.nan
+    expected = calculate_denda(row, 2, 3, 1.0, "Pelanggaran Berulang")
+    single = calculate_denda(row, 2, 3, get_percentage(store.persentase_data, '>25'), "Pelanggaran Berulang")
+    assert single == expected
+    assert lookup_denda(store.unit_fines, 0, 2, 3, get_percentage(store.persentase_data, '>25'),
+                        "Pelanggaran Berulang") == calculate_denda(store.frek_alat_df.iloc[0], 2, 3, 1.0,
+                                                                   "Pelanggaran Berulang")
+
+    cases = store.frek_alat_df[LOOKUP_KEYS].iloc[[0, 0]].astype(object)
+    cases = cases.assign(**{'JML BULAN': ['>25', 30], 'JUMLAH FREKUENSI': 2, 'JUMLAH PERANGKAT': 3,
+                            'JENIS PELANGGARAN': "Pelanggaran Berulang"})
+    batch = price_cases(store.frek_alat_df, cases, store.persentase_data)
+    batch_lookup = price_cases(store.frek_alat_df, cases, store.persentase_data, store.unit_fines)
+    single_row = calculate_denda(store.frek_alat_df.iloc[0], 2, 3, 1.0, "Pelanggaran Berulang")
+    assert batch['TOTAL TAGIHAN DENDA'].tolist() == batch_lookup['TOTAL TAGIHAN DENDA'].tolist() == \
+        [single_row['total_tagihan_denda']] * 2
+
+    sweep = sweep_denda(row, store.persentase_data, 2, 3)
+    assert sweep_matrix(sweep, "Pelanggaran Berulang", '>25').loc[2, 3] == expected['total_tagihan_denda']
+    long_df = exposure_frame(store.frek_alat_df, store.persentase_data)
+    exposure = long_df[(long_df['JML BULAN'] == '>25') & (long_df['JENIS PELANGGARAN'] == "Pelanggaran Berulang")]
+    assert exposure['DENDA'].iloc[0] == single_row['denda']
@@ -0,0 +1,104 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine.cache as cache
+from engine.cache import file_fingerprint, load_workbook, normalize_frame, read_cache, write_cache
+from engine.constants import SHEET_FREK_ALAT
+from engine.loader import load_excel
+from engine.parsing import process_frek_alat_data
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "tarif.xlsx"
+    shutil.copy(WORKBOOK, path)
+    return str(path)
+
+
+def test_cold_and_warm_loads_return_identical_frames(workbook, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+
+    cold_df, cold_persen, cold_sheets = load_workbook(workbook, cache_dir)
+    fingerprint = file_fingerprint(workbook)
+    assert read_cache(fingerprint, cache_dir) is not None
+
+    # Start berikutnya tidak membaca Excel sama sekali
+    monkeypatch.setattr(cache, "load_excel", lambda *args, **kwargs: pytest.fail("workbook dibaca ulang"))
+    warm_df, warm_persen, warm_sheets = load_workbook(workbook, cache_dir)
+
+    pd.testing.assert_frame_equal(warm_df, cold_df)
+    assert warm_sheets == cold_sheets
+    assert warm_persen.keys() == cold_persen.keys()
+
+
+def test_parsed_frame_matches_fresh_parse_except_normalized_types(workbook, tmp_path):
+    parsed_df = process_frek_alat_data(load_excel(workbook)[SHEET_FREK_ALAT])
+    frek_alat_df, _, _ = load_workbook(workbook, str(tmp_path / "cache"))
+
+    # TOTAL TAGIHAN DENDA di sheet berisi angka dalam kolom object
+    assert parsed_df['TOTAL TAGIHAN DENDA'].dtype == object
+    assert frek_alat_df['TOTAL TAGIHAN DENDA'].dtype == np.int64
+    pd.testing.assert_frame_equal(frek_alat_df, normalize_frame(parsed_df))
+
+
+def test_changed_file_is_a_cache_miss(workbook, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    load_workbook(workbook, cache_dir)
+    old_fingerprint = file_fingerprint(workbook)
+
+    stat = os.stat(workbook)
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    new_fingerprint = file_fingerprint(workbook)
+    assert new_fingerprint != old_fingerprint
+    assert read_cache(new_fingerprint, cache_dir) is None
+
+    load_workbook(workbook, cache_dir)
+    assert read_cache(new_fingerprint, cache_dir) is not None
+    # Entri versi lama dari file yang sama dihapus
+    assert not os.path.exists(os.path.join(cache_dir, old_fingerprint))
+
+
+def test_fingerprint_hashes_only_when_stat_changes(workbook, monkeypatch):
+    calls = []
+    sha256 = cache.hashlib.sha256
+    monkeypatch.setattr(cache.hashlib, "sha256", lambda *args: calls.append(1) or sha256(*args))
+
+    first = file_fingerprint(workbook)
+    assert file_fingerprint(workbook) == first
+    assert len(calls) == 1
+
+    stat = os.stat(workbook)
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert file_fingerprint(workbook) != first
+    assert len(calls) == 2
+
+
+def test_normalize_frame_makes_mixed_columns_storable(tmp_path):
+    df = pd.DataFrame({
+        'ANGKA': pd.Series([1, 2.5, None], dtype=object),
+        'CAMPURAN': pd.Series(['A', 7, None], dtype=object),
+        'TEKS': ['x', 'y', 'z'],
+    })
+
+    normalized = normalize_frame(df)
+
+    assert normalized['ANGKA'].dtype == np.float64
+    assert normalized['CAMPURAN'].tolist()[:2] == ['A', '7']
+    assert pd.isna(normalized['CAMPURAN'].iloc[2])
+    write_cache("v0-entry", normalized, {}, [SHEET_FREK_ALAT], cache_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(read_cache("v0-entry", str(tmp_path))[0], normalized)
+
+
+def test_frame_that_does_not_round_trip_fails_loudly(tmp_path):
+    # Kolom object campuran tanpa normalisasi tidak dapat disimpan apa adanya
+    df = pd.DataFrame({'CAMPURAN': pd.Series(['A', 7], dtype=object)})
+
+    with pytest.raises((TypeError, ValueError)):
+        write_cache("v0-entry", df, {}, [SHEET_FREK_ALAT], cache_dir=str(tmp_path))
+    assert read_cache("v0-entry", str(tmp_path)) is None
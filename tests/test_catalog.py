@@ -0,0 +1,59 @@
+import os
+import shutil
+
+import pytest
+
+from engine.cache import load_workbook
+from engine.catalog import catalog_sources, ingest_folder, query_catalog
+from engine.filtering import filter_data
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+pytestmark = pytest.mark.filterwarnings("ignore:Data Validation extension")
+
+
+@pytest.fixture
+def folder(tmp_path):
+    data_folder = tmp_path / "Data"
+    data_folder.mkdir()
+    for name in ("a.xlsx", "b.xlsx"):
+        shutil.copy(WORKBOOK, data_folder / name)
+    return str(data_folder), str(tmp_path / "catalog.sqlite"), str(tmp_path / "cache")
+
+
+def test_ingest_is_incremental(folder):
+    data_folder, catalog_path, cache_dir = folder
+    a, b = (os.path.normpath(os.path.join(data_folder, name)) for name in ("a.xlsx", "b.xlsx"))
+
+    assert sorted(ingest_folder(data_folder, catalog_path, cache_dir)['ingested']) == [a, b]
+    assert sorted(ingest_folder(data_folder, catalog_path, cache_dir)['skipped']) == [a, b]
+
+    stat = os.stat(a)
+    os.utime(a, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    os.remove(b)
+    summary = ingest_folder(data_folder, catalog_path, cache_dir)
+
+    assert summary['ingested'] == [a]
+    assert summary['removed'] == [b]
+    sources = catalog_sources(catalog_path)
+    assert sources['source'].tolist() == [a]
+    assert sources['rows'].tolist() == [len(query_catalog({}, catalog_path))]
+
+
+def test_query_matches_filter_data_per_workbook(folder):
+    data_folder, catalog_path, cache_dir = folder
+    ingest_folder(data_folder, catalog_path, cache_dir)
+    frek_alat_df = load_workbook(WORKBOOK, cache_dir)[0]
+
+    for filters in ({}, {'DINAS': frek_alat_df['DINAS'].iloc[0], 'ZONA': '2'},
+                    {'JENIS IZIN': 'ISR', 'BAND': 'Semua'}, {'DINAS': 'TIDAK ADA'}):
+        expected = filter_data(frek_alat_df, filters)
+        result = query_catalog(filters, catalog_path)
+
+        assert len(result) == 2 * len(expected), filters
+        for source, rows in result.groupby('source'):
+            assert rows['ZONA'].tolist() == expected['ZONA'].tolist()
+            assert rows['TARIF DENDA'].tolist() == expected['TARIF DENDA'].tolist()
+
+    only_a = query_catalog({}, catalog_path, sources=[os.path.normpath(os.path.join(data_folder, "a.xlsx"))])
+    assert len(only_a) == len(frek_alat_df)
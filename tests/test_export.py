@@ -0,0 +1,50 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+import xlsxwriter
+
+from engine.export import SHEET_HASIL, _write_row, iter_csv_chunks, to_csv, to_excel, write_excel
+
+HASIL_DF = pd.DataFrame({
+    'ID KASUS': [f"K-{i}" for i in range(10)],
+    'JUMLAH FREKUENSI': np.arange(10) + 1,
+    'TOTAL TAGIHAN DENDA': np.where(np.arange(10) == 3, np.nan, np.arange(10) * 1.5),
+})
+
+
+def test_csv_chunks_match_single_write():
+    chunks = [HASIL_DF.iloc[:4], HASIL_DF.iloc[4:7][['TOTAL TAGIHAN DENDA', 'ID KASUS']], HASIL_DF.iloc[7:]]
+
+    # Potongan dengan urutan kolom lain disusun ulang ke header potongan pertama
+    assert b''.join(iter_csv_chunks(chunks)).decode('utf-8').splitlines()[5] == "K-4,,6.0"
+    assert to_csv(HASIL_DF) == b''.join(iter_csv_chunks(HASIL_DF, chunk_size=3))
+
+
+def test_excel_round_trip():
+    excel_data, ok = to_excel(HASIL_DF)
+
+    assert ok
+    pd.testing.assert_frame_equal(pd.read_excel(BytesIO(excel_data), sheet_name=SHEET_HASIL), HASIL_DF)
+
+
+def test_excel_continues_on_new_sheet_when_full():
+    output = BytesIO()
+
+    sheet_count = write_excel(HASIL_DF, output, chunk_size=4, max_rows=4)
+
+    sheets = pd.read_excel(output, sheet_name=None)
+    assert sheet_count == 4
+    assert list(sheets) == [SHEET_HASIL] + [f"{SHEET_HASIL} ({n})" for n in (2, 3, 4)]
+    assert [len(sheet) for sheet in sheets.values()] == [3, 3, 3, 1]
+    pd.testing.assert_frame_equal(pd.concat(sheets.values(), ignore_index=True), HASIL_DF)
+
+
+def test_rows_past_the_sheet_limit_raise():
+    workbook = xlsxwriter.Workbook(BytesIO(), {'constant_memory': True})
+    worksheet = workbook.add_worksheet()
+
+    with pytest.raises(ValueError):
+        _write_row(worksheet, 1_048_576, ["x"])
+    workbook.close()
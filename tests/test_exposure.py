@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.constants import JENIS_PELANGGARAN
+from engine.exposure import exposure_frame, exposure_report, exposure_summary
+from engine.pricing import calculate_denda
+from engine.unitfines import precompute_unit_fines
+
+PERSENTASE_DATA = {'0-12': 1.0, '13-24': 0.5, '>25': 0.25}
+
+TARIF_DF = pd.DataFrame({
+    'JENIS IZIN': ['ISR', 'ISR', 'IPFR', 'ISR', 'APT'],
+    'DINAS': ['TETAP', 'TETAP', 'BERGERAK', 'SIARAN', 'SIARAN'],
+    'KATEGORI': ['A', 'B', 'A', 'A', 'A'],
+    'BAND': ['VHF', 'UHF', 'SHF', 'VHF', 'VHF'],
+    'ZONA': [1, 2, 3, 4, 5],
+    'MAKS POIN': [7000, 7000, 600000, 7000, 5000],
+    'INDEKS PELANGGARAN PERTAMA': [0.0028, 0.00285, 0.0011, 0.0037, 0.5],
+    'INDEKS PELANGGARAN BERULANG': [0.0042, 0.0043, 0.0017, 0.0055, 0.75],
+    '%': [np.nan, np.nan, 0.5, np.nan, np.nan],
+    'TARIF DENDA': [1234.55, 10_000.0, 333.33, 77.77, 15.5],
+})
+
+
+def test_exposure_frame_matches_calculate_denda():
+    long_df = exposure_frame(TARIF_DF, PERSENTASE_DATA)
+
+    assert len(long_df) == len(TARIF_DF) * len(JENIS_PELANGGARAN) * len(PERSENTASE_DATA)
+    for jenis in JENIS_PELANGGARAN:
+        for jml_bulan, persentase in PERSENTASE_DATA.items():
+            part = long_df[(long_df['JENIS PELANGGARAN'] == jenis) & (long_df['JML BULAN'] == jml_bulan)]
+            expected = [calculate_denda(row, 1, 1, persentase, jenis)['denda'] for _, row in TARIF_DF.iterrows()]
+            assert part['DENDA'].tolist() == expected
+
+
+def test_unit_fines_give_the_same_report():
+    unit_fines = precompute_unit_fines(TARIF_DF, PERSENTASE_DATA)
+
+    pd.testing.assert_frame_equal(exposure_report(TARIF_DF, PERSENTASE_DATA, unit_fines=unit_fines),
+                                  exposure_report(TARIF_DF, PERSENTASE_DATA))
+
+
+@pytest.mark.parametrize("dimensions", [['JENIS IZIN'], ['DINAS', 'BAND']])
+def test_report_groups_and_proportions(dimensions):
+    long_df = exposure_frame(TARIF_DF, PERSENTASE_DATA, dimensions)
+
+    report = exposure_report(TARIF_DF, PERSENTASE_DATA, dimensions)
+
+    expected = long_df.groupby(dimensions + ['JENIS PELANGGARAN', 'JML BULAN'])['DENDA'].agg(['size', 'sum'])
+    assert report['JUMLAH TARIF'].tolist() == expected['size'].tolist()
+    np.testing.assert_allclose(report['TOTAL DENDA'], expected['sum'])
+    np.testing.assert_allclose(report.groupby(['JENIS PELANGGARAN', 'JML BULAN'])['PROPORSI'].sum(), 1.0)
+
+    summary = exposure_summary(report)
+    assert summary.shape == (len(JENIS_PELANGGARAN), len(PERSENTASE_DATA))
+    np.testing.assert_allclose(summary.loc['Pelanggaran Pertama', '0-12'],
+                               long_df.loc[(long_df['JENIS PELANGGARAN'] == 'Pelanggaran Pertama') &
+                                           (long_df['JML BULAN'] == '0-12'), 'DENDA'].sum())
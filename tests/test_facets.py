@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from engine.facets import SEMUA, build_facet_tree, facet_options
+
+TARIF_DF = pd.DataFrame({
+    'JENIS IZIN': ['ISR', 'isr ', 'IPFR', 'ISR', 'KHUSUS', 'ISR'],
+    'DINAS': ['TETAP', 'TETAP', 'BERGERAK', 'SIARAN', 'SIARAN', np.nan],
+    'KATEGORI': ['A', 'B', 'A', 'A', np.nan, 'A'],
+    'BAND': ['VHF', 'UHF', 'SHF', 'VHF', 'VHF', 'VHF'],
+    'ZONA': [1.0, 2.0, 3.0, 10.0, 5.0, 1.0],
+})
+
+
+# Cara lama: pilihan setiap level dihitung dengan menyaring tabel sesuai pilihan di atasnya
+def _masked_options(df, column, **selected):
+    mask = np.ones(len(df), dtype=bool)
+    for selected_column, value in selected.items():
+        if value != SEMUA:
+            mask &= (df[selected_column] == value).to_numpy()
+    return df.loc[mask, column].dropna().unique()
+
+
+def test_cascading_options_match_masked_scans():
+    tree = build_facet_tree(TARIF_DF)
+    dinas_choices = facet_options(tree, 'DINAS')
+    assert dinas_choices == [SEMUA] + sorted(TARIF_DF['DINAS'].dropna().unique())
+
+    for dinas in dinas_choices:
+        kategori_choices = facet_options(tree, 'KATEGORI', dinas)
+        assert kategori_choices == [SEMUA] + sorted(_masked_options(TARIF_DF, 'KATEGORI', DINAS=dinas))
+        for kategori in kategori_choices:
+            band_choices = facet_options(tree, 'BAND', dinas, kategori)
+            expected = _masked_options(TARIF_DF, 'BAND', DINAS=dinas, KATEGORI=kategori)
+            assert band_choices == ([SEMUA] + sorted(expected)), (dinas, kategori)
+            for band in band_choices:
+                zona = _masked_options(TARIF_DF, 'ZONA', DINAS=dinas, KATEGORI=kategori, BAND=band)
+                assert facet_options(tree, 'ZONA', dinas, kategori, band) == \
+                    [SEMUA] + [str(int(value)) for value in sorted(zona)], (dinas, kategori, band)
+
+
+def test_jenis_izin_is_normalized_and_includes_defaults():
+    tree = build_facet_tree(TARIF_DF)
+
+    assert facet_options(tree, 'JENIS IZIN') == [SEMUA, 'APT', 'IPFR', 'ISR', 'KHUSUS']
+
+
+def test_unknown_selection_falls_back_to_semua():
+    tree = build_facet_tree(TARIF_DF)
+
+    assert facet_options(tree, 'KATEGORI', 'TIDAK ADA') == [SEMUA]
+    assert facet_options(tree, 'ZONA', 'TETAP', 'B', 'VHF') == [SEMUA]
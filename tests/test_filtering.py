@@ -0,0 +1,64 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.filtering import build_lookup_index, filter_data, lookup_positions
+
+TARIF_DF = pd.DataFrame({
+    'JENIS IZIN': ['ISR', 'ISR', 'IPFR', 'ISR', 'APT', 'ISR'],
+    'DINAS': ['TETAP', 'TETAP', 'BERGERAK', 'SIARAN', 'SIARAN', 'TETAP'],
+    'KATEGORI': ['A', 'B', 'A', 'A', 'A', 'A'],
+    'BAND': ['VHF', 'UHF', 'SHF', 'VHF', 'VHF', 'VHF'],
+    'ZONA': [1, 2, 3, 1, 5, 1],
+    'TARIF DENDA': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+})
+
+
+# Kombinasi filter: "Semua", nilai yang ada, nilai yang tidak ada dan ZONA berupa teks
+FILTER_CHOICES = {
+    'JENIS IZIN': ["Semua", "ISR", "APT"],
+    'DINAS': ["Semua", "TETAP", "SIARAN", "TIDAK ADA"],
+    'KATEGORI': ["Semua", "A", "B"],
+    'BAND': ["Semua", "VHF", "UHF"],
+    'ZONA': ["Semua", 1, 3, "1", "abc"],
+}
+
+
+def _filter_combinations():
+    for values in itertools.product(*FILTER_CHOICES.values()):
+        yield dict(zip(FILTER_CHOICES, values))
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_indexed_filter_matches_sequential_masks(compact):
+    df = TARIF_DF.astype({'DINAS': 'category', 'BAND': 'category'}) if compact else TARIF_DF
+    index = build_lookup_index(df)
+
+    for filters in _filter_combinations():
+        expected = filter_data(df, filters)
+        result = filter_data(df, filters, index)
+        assert result.index.tolist() == expected.index.tolist(), filters
+        assert result.columns.equals(df.columns)
+
+
+def test_full_key_uses_exact_entry_and_keeps_duplicates():
+    index = build_lookup_index(TARIF_DF)
+
+    positions = lookup_positions(index, {'JENIS IZIN': 'ISR', 'DINAS': 'TETAP', 'KATEGORI': 'A', 'BAND': 'VHF',
+                                         'ZONA': '1'})
+
+    assert positions.tolist() == [0, 5]
+    assert lookup_positions(index, {'DINAS': 'Semua'}) is None
+    assert len(lookup_positions(index, {'ZONA': 'abc', 'DINAS': 'TETAP'})) == 3
+
+
+def test_non_key_filters_are_applied_after_the_index():
+    index = build_lookup_index(TARIF_DF)
+
+    result = filter_data(TARIF_DF, {'DINAS': 'TETAP', 'TARIF DENDA': 6.0}, index)
+
+    assert result.index.tolist() == [5]
+    assert filter_data(TARIF_DF, {'ZONA': 'abc'}).equals(TARIF_DF)
+    assert isinstance(lookup_positions(index, {'DINAS': 'TIDAK ADA'}), np.ndarray)
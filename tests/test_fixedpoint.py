@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from engine.fixedpoint import (INDEKS_SCALE, PERSEN_SCALE, POIN_SCALE, SEN, price_fixed, price_fixed_rows,
+                               price_fixed_scalar, round_div, round_div_scalar, to_fixed, to_fixed_scalar)
+
+
+# Pembulatan setengah menjauhi nol, termasuk nilai yang di float sedikit di bawah .5
+@pytest.mark.parametrize("value, scale, expected", [
+    (2.5, 1, 3),
+    (-2.5, 1, -3),
+    (2.4999, 1, 2),
+    (0.00285, INDEKS_SCALE, 285_000),
+    (-0.00285, INDEKS_SCALE, -285_000),
+    (0.12345678, INDEKS_SCALE, 12_345_678),
+    (0.33, PERSEN_SCALE, 3300),
+    (1234.565, SEN, 123457),
+    (float('nan'), SEN, 0),
+    (7, SEN, 700),
+])
+def test_to_fixed_rounds_half_away_from_zero(value, scale, expected):
+    assert to_fixed(np.array([value]), scale)[0] == expected
+    assert to_fixed_scalar(value, scale) == expected
+
+
+@pytest.mark.parametrize("numerator, denominator, expected", [
+    (5, 10, 1),
+    (-5, 10, -1),
+    (4, 10, 0),
+    (-4, 10, 0),
+    (15, 10, 2),
+    (-15, 10, -2),
+    (149_999_999, 100_000_000, 1),
+    (150_000_000, 100_000_000, 2),
+])
+def test_round_div_rounds_half_away_from_zero(numerator, denominator, expected):
+    assert round_div(np.array([numerator]), denominator)[0] == expected
+    assert round_div_scalar(numerator, denominator) == expected
+
+
+def test_round_div_scalar_matches_vector():
+    numerators = np.arange(-2_000, 2_001)
+    expected = round_div(numerators, 100)
+    assert [round_div_scalar(int(n), 100) for n in numerators] == expected.tolist()
+
+
+def test_price_fixed_rounds_each_step():
+    # TOTAL POIN = 0.0001 * 1.0 * 1.5 = 0.00015 poin -> 0.0002 poin (2 unit)
+    # DENDA dihitung dari TOTAL POIN yang sudah dibulatkan: 0.0002 * Rp 33.33 = 0.67 sen -> 1 sen
+    # (tanpa pembulatan per langkah: 0.00015 * Rp 33.33 = 0.5 sen kurang sedikit -> 0)
+    total_poin, denda, total = price_fixed(
+        np.array([INDEKS_SCALE // 10_000]), np.array([PERSEN_SCALE]), np.array([15_000]), np.array([3_333]), 3, 2
+    )
+    assert total_poin.tolist() == [2]
+    assert denda.tolist() == [1]
+    assert total.tolist() == [6]
+
+
+def test_price_fixed_keeps_indeks_digits():
+    # 0.00285 * 0.33 * 7000 = 6.5835 poin; indeks tidak dibulatkan ke 0.0029 sebelum dikalikan
+    total_poin, denda, total = price_fixed(
+        to_fixed(np.array([0.00285]), INDEKS_SCALE), to_fixed(np.array([0.33]), PERSEN_SCALE),
+        to_fixed(np.array([7000]), POIN_SCALE), to_fixed(np.array([10_000.0]), SEN), 1, 1
+    )
+    assert total_poin.tolist() == [65_835]
+    assert denda.tolist() == [6_583_500]
+    assert price_fixed_scalar(285_000, 3_300, 7000 * POIN_SCALE, 10_000 * SEN, 1, 1) == (65_835, 6_583_500, 6_583_500)
+
+
+def test_price_fixed_uses_positive_values_from_data():
+    total_poin, denda, total = price_fixed(
+        np.array([INDEKS_SCALE, INDEKS_SCALE]), np.array([PERSEN_SCALE] * 2), np.array([POIN_SCALE] * 2),
+        np.array([100 * SEN] * 2), 1, 1,
+        total_poin=np.array([0, 5 * POIN_SCALE]), denda=np.array([0, 0]),
+    )
+    assert total_poin.tolist() == [POIN_SCALE, 5 * POIN_SCALE]
+    assert denda.tolist() == [100 * SEN, 500 * SEN]
+
+
+def test_price_fixed_scalar_matches_vector():
+    rng = np.random.default_rng(21)
+    n = 500
+    args = [
+        rng.integers(0, 3 * INDEKS_SCALE, n),  # indeks
+        rng.integers(0, PERSEN_SCALE + 1, n),  # persentase
+        rng.integers(1, 600_000 * POIN_SCALE, n, endpoint=True),
+        rng.integers(0, 10_000_000, n),        # tarif denda (sen)
+        rng.integers(1, 100, n),
+        rng.integers(1, 100, n),
+    ]
+    total_poin, denda, total = price_fixed(*args)
+    for i in range(n):
+        assert price_fixed_scalar(*(int(arg[i]) for arg in args)) == (total_poin[i], denda[i], total[i])
+
+
+def test_price_fixed_rows_flags_overflow_per_row():
+    big = 2 ** 40
+    total_poin, denda, total, overflow = price_fixed_rows(
+        np.array([INDEKS_SCALE, INDEKS_SCALE]), np.array([PERSEN_SCALE] * 2), np.array([POIN_SCALE] * 2),
+        np.array([100 * SEN] * 2), np.array([1, big]), np.array([1, big])
+    )
+    assert overflow.tolist() == [False, True]
+    assert total.tolist() == [100 * SEN, 0]
+
+    with pytest.raises(OverflowError):
+        price_fixed(np.array([INDEKS_SCALE]), np.array([PERSEN_SCALE]), np.array([POIN_SCALE]),
+                    np.array([100 * SEN]), big, big)
+    with pytest.raises(OverflowError):
+        price_fixed_scalar(INDEKS_SCALE, PERSEN_SCALE, POIN_SCALE, 100 * SEN, big, big)
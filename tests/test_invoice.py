@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.constants import STATUS_COLUMN, STATUS_OK
+from engine.invoice import invoice_labels, invoice_subtotals, invoice_total, price_selection
+from engine.unitfines import precompute_unit_fines
+
+PERSENTASE_DATA = {'0-12': 1.0, '13-24': 0.5, '>25': 0.25}
+
+TARIF_DF = pd.DataFrame({
+    'JENIS IZIN': ['ISR', 'ISR', 'IPFR', 'ISR', 'APT'],
+    'DINAS': ['TETAP', 'TETAP', 'BERGERAK', 'SIARAN', 'SIARAN'],
+    'KATEGORI': ['A', 'B', 'A', 'A', 'A'],
+    'BAND': ['VHF', 'UHF', 'SHF', 'VHF', 'VHF'],
+    'ZONA': [1, 2, 3, 4, 5],
+    'MAKS POIN': [7000, 7000, 600000, 7000, 5000],
+    'INDEKS PELANGGARAN PERTAMA': [0.0028, 0.00285, 0.0011, 0.0037, 0.5],
+    'INDEKS PELANGGARAN BERULANG': [0.0042, 0.0043, 0.0017, 0.0055, 0.75],
+    '%': [np.nan] * 5,
+    'TARIF DENDA': [1234.55, 10_000.0, 333.33, 77.77, 15.5],
+})
+
+
+@pytest.fixture(scope="module")
+def unit_fines():
+    return precompute_unit_fines(TARIF_DF, PERSENTASE_DATA)
+
+
+def _faktur(unit_fines=None, jumlah_frekuensi=(1, 3, 2, 5, 1), jumlah_perangkat=(1, 2, 4, 1, 7)):
+    selected = TARIF_DF.iloc[[0, 1, 2, 3, 4]]
+    return price_selection(selected, np.array(jumlah_frekuensi), np.array(jumlah_perangkat), 0.5,
+                           "Pelanggaran Berulang", unit_fines)
+
+
+def test_price_selection_with_and_without_unit_fines(unit_fines):
+    pd.testing.assert_frame_equal(_faktur(unit_fines), _faktur(None), check_like=True)
+
+
+def test_subtotals_are_exact_sums_in_sen(unit_fines):
+    faktur_df = _faktur(unit_fines)
+
+    subtotals = invoice_subtotals(faktur_df)
+
+    assert subtotals[['JENIS IZIN', 'BAND']].values.tolist() == [
+        ['APT', 'VHF'], ['IPFR', 'SHF'], ['ISR', 'UHF'], ['ISR', 'VHF']
+    ]
+    assert subtotals['JUMLAH BARIS'].tolist() == [1, 1, 1, 2]
+    isr_vhf = faktur_df[(faktur_df['JENIS IZIN'] == 'ISR') & (faktur_df['BAND'] == 'VHF')]
+    assert subtotals['JUMLAH FREKUENSI'].tolist()[3] == 6
+    assert subtotals['TOTAL TAGIHAN DENDA (SEN)'].tolist()[3] == isr_vhf['TOTAL TAGIHAN DENDA (SEN)'].sum()
+
+    # Subtotal dan total faktur sama persis karena dijumlahkan dalam sen
+    assert subtotals['TOTAL TAGIHAN DENDA (SEN)'].sum() == faktur_df['TOTAL TAGIHAN DENDA (SEN)'].sum()
+    assert invoice_total(faktur_df) == subtotals['TOTAL TAGIHAN DENDA (SEN)'].sum() / 100
+    assert (subtotals['TOTAL TAGIHAN DENDA'] * 100).round().astype(np.int64).tolist() == \
+        subtotals['TOTAL TAGIHAN DENDA (SEN)'].tolist()
+
+
+def test_subtotals_fall_back_to_first_lookup_key():
+    faktur_df = _faktur().drop(columns=['JENIS IZIN', 'BAND'])
+
+    subtotals = invoice_subtotals(faktur_df)
+
+    assert list(subtotals.columns[:1]) == ['DINAS']
+    assert subtotals['DINAS'].tolist() == ['BERGERAK', 'SIARAN', 'TETAP']
+
+
+def test_invalid_rows_are_excluded_from_totals(unit_fines):
+    faktur_df = _faktur(unit_fines, jumlah_frekuensi=(1, 1.5, 2, 5, 1))
+
+    assert faktur_df[STATUS_COLUMN].tolist()[1] != STATUS_OK
+    valid = faktur_df[faktur_df[STATUS_COLUMN] == STATUS_OK]
+    assert invoice_total(faktur_df) == valid['TOTAL TAGIHAN DENDA (SEN)'].sum() / 100
+    subtotals = invoice_subtotals(faktur_df)
+    assert subtotals['TOTAL TAGIHAN DENDA (SEN)'].sum() == valid['TOTAL TAGIHAN DENDA (SEN)'].sum()
+    # Baris gagal tidak ikut dihitung sebagai baris, frekuensi atau perangkat
+    assert subtotals['JUMLAH BARIS'].sum() == len(valid) == 4
+    assert subtotals['JUMLAH FREKUENSI'].sum() == valid['JUMLAH FREKUENSI'].sum()
+    assert subtotals['JUMLAH PERANGKAT'].sum() == valid['JUMLAH PERANGKAT'].sum()
+    assert subtotals.notna().all().all()
+
+
+def test_subtotals_without_dimension_columns_are_one_total_row(unit_fines):
+    faktur_df = _faktur(unit_fines).drop(columns=['JENIS IZIN', 'DINAS', 'KATEGORI', 'BAND', 'ZONA'])
+
+    subtotals = invoice_subtotals(faktur_df)
+
+    assert subtotals['JUMLAH BARIS'].tolist() == [5]
+    assert subtotals['TOTAL TAGIHAN DENDA (SEN)'].tolist() == [faktur_df['TOTAL TAGIHAN DENDA (SEN)'].sum()]
+    assert invoice_subtotals(faktur_df.iloc[:0])['JUMLAH BARIS'].tolist() == [0]
+
+
+def test_invoice_labels_number_rows_with_key_columns():
+    labels = invoice_labels(_faktur())
+    assert labels.tolist()[:2] == ['1. TETAP A VHF 1', '2. TETAP B UHF 2']
@@ -0,0 +1,51 @@
+import os
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from engine.constants import SHEET_FREK_ALAT, SHEET_REFERENSI
+from engine.loader import load_excel
+from engine.parsing import process_frek_alat_data, process_referensi_data
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+pytestmark = pytest.mark.filterwarnings("ignore:Data Validation extension")
+
+
+def test_only_required_sheets_are_read():
+    assert list(load_excel(WORKBOOK)) == [SHEET_FREK_ALAT, SHEET_REFERENSI]
+    assert set(load_excel(WORKBOOK, sheet_names=None)) == set(pd.ExcelFile(WORKBOOK).sheet_names)
+
+
+def test_streamed_sheets_parse_like_read_excel():
+    streamed = load_excel(WORKBOOK)
+    full = pd.read_excel(WORKBOOK, sheet_name=None, header=None)
+
+    pd.testing.assert_frame_equal(process_frek_alat_data(streamed[SHEET_FREK_ALAT]),
+                                  process_frek_alat_data(full[SHEET_FREK_ALAT]))
+    pd.testing.assert_series_equal(pd.Series(process_referensi_data(streamed)),
+                                   pd.Series(process_referensi_data(full)))
+
+
+def test_preamble_and_trailing_empty_rows_are_dropped(tmp_path):
+    path = tmp_path / "tarif.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = SHEET_FREK_ALAT
+    sheet.append(["JUDUL TABEL"])
+    sheet.append([])
+    sheet.append(["DINAS", "KATEGORI", "BAND", "ZONA"])
+    sheet.append(["TETAP", "A", "VHF", 1])
+    sheet.append(["TETAP", "B", "UHF", 2])
+    sheet.append([None, None, None, None])
+    workbook.create_sheet("LAIN").append(["tidak dibaca"])
+    workbook.save(path)
+
+    sheets = load_excel(str(path))
+
+    assert list(sheets) == [SHEET_FREK_ALAT]
+    assert sheets[SHEET_FREK_ALAT].values.tolist() == [
+        ["DINAS", "KATEGORI", "BAND", "ZONA"], ["TETAP", "A", "VHF", 1], ["TETAP", "B", "UHF", 2]
+    ]
+    assert process_frek_alat_data(sheets[SHEET_FREK_ALAT])['ZONA'].tolist() == [1, 2]
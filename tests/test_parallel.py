@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.constants import LOOKUP_KEYS, STATUS_COLUMN, STATUS_OK
+from engine.parallel import price_chunks_parallel, price_file_parallel
+from engine.pricing import price_cases
+from engine.store import build_tariff_store
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+pytestmark = pytest.mark.filterwarnings("ignore:Data Validation extension")
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    return build_tariff_store(WORKBOOK, cache_dir=str(tmp_path_factory.mktemp("cache")))
+
+
+@pytest.fixture(scope="module")
+def cases_df(store):
+    positions = np.arange(50) % len(store.frek_alat_df)
+    cases = store.frek_alat_df[LOOKUP_KEYS].iloc[positions].astype(object).reset_index(drop=True)
+    cases['JUMLAH FREKUENSI'] = (np.arange(50) % 4 + 1).astype(float)
+    cases['JUMLAH PERANGKAT'] = 2
+    cases['JML BULAN'] = np.where(np.arange(50) % 2, '13-24', '0-12')
+    # Satu kasus tidak valid tetap dihitung sebagai baris
+    cases.loc[7, 'JUMLAH FREKUENSI'] = 0.5
+    return cases
+
+
+def _chunks(df, size):
+    return (df.iloc[start:start + size] for start in range(0, len(df), size))
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_parallel_chunks_keep_order_and_match_serial_pricing(store, cases_df, max_workers):
+    results = list(price_chunks_parallel(store.frek_alat_df, store.persentase_data, _chunks(cases_df, 7),
+                                         max_workers, store.unit_fines))
+
+    assert [len(result) for result in results] == [7] * 7 + [1]
+    expected = price_cases(store.frek_alat_df, cases_df, store.persentase_data)
+    pd.testing.assert_frame_equal(pd.concat(results, ignore_index=True), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".xlsx"])
+def test_price_file_counts_every_row(store, cases_df, tmp_path, suffix):
+    input_path = tmp_path / f"kasus{suffix}"
+    output_path = tmp_path / f"hasil{suffix}"
+    if suffix == ".csv":
+        cases_df.to_csv(input_path, index=False)
+    else:
+        cases_df.to_excel(input_path, index=False)
+
+    summary = price_file_parallel(store.frek_alat_df, store.persentase_data, str(input_path), str(output_path),
+                                  chunk_size=8, max_workers=2, unit_fines=store.unit_fines)
+
+    hasil = pd.read_csv(output_path) if suffix == ".csv" else pd.read_excel(output_path)
+    expected = price_cases(store.frek_alat_df, cases_df, store.persentase_data)
+    assert summary['rows'] == len(hasil) == len(cases_df)
+    assert summary['chunks'] == 7
+    assert summary['invalid'] == int((expected[STATUS_COLUMN] != STATUS_OK).sum()) == 1
+    assert summary['total_tagihan_denda_sen'] == expected['TOTAL TAGIHAN DENDA (SEN)'].sum()
+    assert hasil['TOTAL TAGIHAN DENDA (SEN)'].sum() == summary['total_tagihan_denda_sen']
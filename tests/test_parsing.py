@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.constants import HEADER_VALUES, SHEET_REFERENSI
+from engine.parsing import find_header_row, locate_cells, process_referensi_data
+
+
+# Cara lama: periksa baris satu per satu dengan iterrows
+def _find_header_row_iterrows(df, header_values):
+    for i, row in df.iterrows():
+        if all(value in row.values for value in header_values):
+            return i
+    return None
+
+
+SHEETS = [
+    pd.DataFrame([["JUDUL", None, None], [None, None, None], ["DINAS", "KATEGORI", "BAND"], ["TETAP", "A", "VHF"]]),
+    pd.DataFrame([["BAND", "DINAS", "X"], ["DINAS", "KATEGORI", "BAND"], ["DINAS", "KATEGORI", "BAND"]]),
+    pd.DataFrame([["DINAS", None, None], [None, "KATEGORI", "BAND"]]),
+    pd.DataFrame([[1, 2.5, np.nan], ["x", "DINAS", "KATEGORI"]]),
+    pd.DataFrame(),
+]
+
+
+@pytest.mark.parametrize("df", SHEETS)
+def test_find_header_row_matches_iterrows_scan(df):
+    assert find_header_row(df, HEADER_VALUES) == _find_header_row_iterrows(df, HEADER_VALUES)
+
+
+def test_locate_cells_is_ordered_by_row_then_column():
+    df = pd.DataFrame([["b", " a ", "a"], [1, "a", "b"]])
+
+    assert locate_cells(df, ["a", "b"]) == [(0, 0, "b"), (0, 2, "a"), (1, 1, "a"), (1, 2, "b")]
+    assert locate_cells(df, ["a"], strip=True) == [(0, 1, "a"), (0, 2, "a"), (1, 1, "a")]
+
+
+def test_referensi_percentages_are_read_from_the_row_below():
+    ref_df = pd.DataFrame([
+        ["JML BULAN", " 0-12 ", "13-24", ">25"],
+        ["PERSENTASE", 33, "0,67", "x"],
+        [None, None, None, None],
+        [None, None, "13-24", None],
+        [None, None, 0.5, None],
+    ])
+
+    # Referensi yang lebih bawah menimpa yang atas; nilai bukan angka memakai default
+    assert process_referensi_data({SHEET_REFERENSI: ref_df}) == {"0-12": 0.33, "13-24": 0.5, ">25": 0.25}
+
+
+def test_missing_referensi_sheet_uses_defaults():
+    assert process_referensi_data({}) == {"0-12": 1.0, "13-24": 0.5, ">25": 0.25}
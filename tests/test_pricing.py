@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.constants import STATUS_COLUMN, STATUS_OK
+from engine.exposure import exposure_frame
+from engine.pricing import calculate_denda, calculate_denda_frame
+from engine.unitfines import lookup_denda, lookup_denda_columns, precompute_unit_fines, slot_positions
+
+TARIF_DF = pd.DataFrame({
+    'JENIS IZIN': ['ISR', 'IPFR', 'APT'],
+    'MAKS POIN': [0, np.nan, 5000],
+    'INDEKS PELANGGARAN PERTAMA': [0.0028, 0.00285, 1.0],
+    'INDEKS PELANGGARAN BERULANG': [0.0042, 0.0043, 1.5],
+    '%': [np.nan, 50, 0.25],
+    'TARIF DENDA': [1234.5, 10_000, 33.33],
+})
+
+
+@pytest.mark.parametrize("jenis_pelanggaran", ["Pelanggaran Pertama", "Pelanggaran Berulang"])
+def test_calculate_denda_matches_frame(jenis_pelanggaran):
+    frame = calculate_denda_frame(TARIF_DF, 3, 2, 0.5, jenis_pelanggaran)
+    for i, row in TARIF_DF.iterrows():
+        hasil = calculate_denda(row, 3, 2, 0.5, jenis_pelanggaran)
+        assert hasil['maks_poin'] == frame['MAKS POIN'][i]
+        assert hasil['total_poin'] == frame['TOTAL POIN'][i]
+        assert hasil['denda'] == frame['DENDA'][i]
+        assert hasil['total_tagihan_denda'] == frame['TOTAL TAGIHAN DENDA'][i]
+    assert (frame[STATUS_COLUMN] == STATUS_OK).all()
+
+
+def test_frame_flags_invalid_counts_per_row():
+    frame = calculate_denda_frame(TARIF_DF, np.array([2.5, np.nan, 4.0]), np.array([1, 1, 0.5]))
+
+    assert frame[STATUS_COLUMN].tolist() == [
+        "JUMLAH FREKUENSI tidak valid (harus bilangan bulat)",
+        "JUMLAH FREKUENSI tidak valid (harus bilangan bulat)",
+        "JUMLAH PERANGKAT tidak valid (harus bilangan bulat)",
+    ]
+    assert frame['TOTAL TAGIHAN DENDA'].isna().all()
+    assert frame['TOTAL TAGIHAN DENDA (SEN)'].tolist() == [0, 0, 0]
+    # Nilai masukan ditampilkan apa adanya, tidak dibulatkan atau diganti 1
+    assert frame['JUMLAH FREKUENSI'].tolist()[0] == 2.5
+    assert frame['JUMLAH PERANGKAT'].tolist()[2] == 0.5
+
+
+def test_counts_up_to_zero_are_treated_as_one():
+    frame = calculate_denda_frame(TARIF_DF, np.array([0, -3, 2]), np.array([1, 0.0, -1.0]))
+    expected = calculate_denda_frame(TARIF_DF, np.array([1, 1, 2]), 1)
+
+    assert (frame[STATUS_COLUMN] == STATUS_OK).all()
+    assert frame['TOTAL TAGIHAN DENDA (SEN)'].tolist() == expected['TOTAL TAGIHAN DENDA (SEN)'].tolist()
+    for jumlah in (0, -1, 0.0, -2.0):
+        assert calculate_denda(TARIF_DF.iloc[0], jumlah, jumlah) == calculate_denda(TARIF_DF.iloc[0], 1, 1)
+
+
+def test_frame_flags_overflow_without_failing_other_rows():
+    frame = calculate_denda_frame(TARIF_DF, np.array([1, 10 ** 12, 1]), np.array([1, 10 ** 9, 1]))
+
+    assert frame[STATUS_COLUMN].tolist() == [
+        STATUS_OK, "Nilai terlalu besar untuk perhitungan fixed-point int64", STATUS_OK
+    ]
+    assert frame['TOTAL TAGIHAN DENDA (SEN)'][1] == 0
+    assert frame['TOTAL TAGIHAN DENDA'][[0, 2]].notna().all()
+
+
+@pytest.mark.parametrize("jumlah", [1.5, -0.5, float('nan'), "dua"])
+def test_calculate_denda_rejects_invalid_counts(jumlah):
+    with pytest.raises(ValueError):
+        calculate_denda(TARIF_DF.iloc[0], jumlah, 1)
+    with pytest.raises(ValueError):
+        calculate_denda(TARIF_DF.iloc[0], 1, jumlah)
+
+
+def test_calculate_denda_accepts_whole_float_counts():
+    assert calculate_denda(TARIF_DF.iloc[0], 3.0, 2)['total_tagihan_denda'] == \
+        calculate_denda(TARIF_DF.iloc[0], 3, 2)['total_tagihan_denda']
+
+
+@pytest.mark.parametrize("jenis_pelanggaran", ["Pelanggaran Pertama", "Pelanggaran Berulang"])
+def test_lookup_denda_matches_calculate_denda(jenis_pelanggaran):
+    unit_fines = precompute_unit_fines(TARIF_DF, {'0-12': 1.0, '13-24': 0.5, '>25': 0.25})
+    for position, row in TARIF_DF.iterrows():
+        for persentase in (1.0, 0.5, 0.25):
+            assert lookup_denda(unit_fines, position, 3, 2, persentase, jenis_pelanggaran) == \
+                calculate_denda(row, 3, 2, persentase, jenis_pelanggaran)
+    # Persentase di luar bracket yang sudah dihitung: pemanggil memakai calculate_denda
+    assert lookup_denda(unit_fines, 0, 3, 2, 0.4, jenis_pelanggaran) is None
+
+
+def test_unit_fines_report_overflow_like_the_full_formula():
+    # Baris kedua: DENDA satuan sendiri sudah melewati batas int64
+    tarif_df = TARIF_DF.assign(**{'TARIF DENDA': [1234.5, 1e13, 33.33]})
+    persentase_data = {'0-12': 1.0, '13-24': 0.5}
+    unit_fines = precompute_unit_fines(tarif_df, persentase_data)
+
+    columns = lookup_denda_columns(unit_fines, np.arange(3), slot_positions(unit_fines, [0.5] * 3), 3, 2,
+                                   np.array(["Pelanggaran Pertama"] * 3))
+    expected = calculate_denda_frame(tarif_df, 3, 2, 0.5)
+    assert expected[STATUS_COLUMN].tolist()[1] != STATUS_OK
+    for name, values in columns.items():
+        np.testing.assert_array_equal(np.asarray(values), expected[name].to_numpy(), err_msg=name)
+
+    with pytest.raises(OverflowError):
+        calculate_denda(tarif_df.iloc[1], 3, 2, 0.5)
+    with pytest.raises(OverflowError):
+        lookup_denda(unit_fines, 1, 3, 2, 0.5)
+
+    pd.testing.assert_frame_equal(exposure_frame(tarif_df, persentase_data, unit_fines=unit_fines),
+                                  exposure_frame(tarif_df, persentase_data))
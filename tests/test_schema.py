@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.cache import load_workbook
+from engine.pricing import calculate_denda_frame
+from engine.schema import DIMENSION_COLUMNS, compact_frek_alat, memory_report
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+
+@pytest.fixture(scope="module")
+def frek_alat_df(tmp_path_factory):
+    return load_workbook(WORKBOOK, str(tmp_path_factory.mktemp("cache")))[0]
+
+
+def test_compact_table_holds_the_same_values(frek_alat_df):
+    compact_df = compact_frek_alat(frek_alat_df)
+
+    for column in frek_alat_df.columns:
+        if column in DIMENSION_COLUMNS:
+            assert isinstance(compact_df[column].dtype, pd.CategoricalDtype)
+        pd.testing.assert_series_equal(compact_df[column].astype(frek_alat_df[column].dtype), frek_alat_df[column])
+    assert compact_df['ZONA'].dtype == np.int8
+
+    report = memory_report(frek_alat_df, compact_df)
+    assert report['bytes_after'] < report['bytes_before']
+
+
+def test_float32_only_when_lossless():
+    df = pd.DataFrame({
+        'EXACT': [0.5, 0.25, np.nan],
+        'LOSSY': [0.1, 0.2, 0.3],
+        'BULAT': [1.0, 2.0, 300.0],
+    })
+
+    compact_df = compact_frek_alat(df)
+
+    assert compact_df['EXACT'].dtype == np.float32
+    assert compact_df['LOSSY'].dtype == np.float64
+    assert compact_df['BULAT'].dtype == np.int16
+
+
+def test_pricing_is_unchanged_on_the_compact_table(frek_alat_df):
+    compact_df = compact_frek_alat(frek_alat_df)
+
+    for jenis_pelanggaran in ("Pelanggaran Pertama", "Pelanggaran Berulang"):
+        expected = calculate_denda_frame(frek_alat_df, 3, 2, 0.5, jenis_pelanggaran)
+        result = calculate_denda_frame(compact_df, 3, 2, 0.5, jenis_pelanggaran)
+        for column in ['TOTAL POIN', 'DENDA', 'TOTAL TAGIHAN DENDA', 'TOTAL TAGIHAN DENDA (SEN)']:
+            np.testing.assert_array_equal(result[column].to_numpy(dtype=float),
+                                          expected[column].to_numpy(dtype=float), err_msg=column)
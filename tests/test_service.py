@@ -0,0 +1,147 @@
+import io
+import json
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from engine.constants import LOOKUP_KEYS, STATUS_COLUMN, STATUS_OK
+from engine.pricing import calculate_denda
+from engine.service import BATCH_RESULT_COLUMNS, PricingService, ServiceClient
+from engine.store import build_tariff_store
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    return build_tariff_store(WORKBOOK, cache_dir=str(tmp_path_factory.mktemp("cache")))
+
+
+@pytest.fixture
+def service(store):
+    service = PricingService(store, chunk_size=2, max_jobs=2)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def client(service):
+    return ServiceClient(service)
+
+
+# Kasus dengan kolom kunci dari baris tarif ke-position (tipe JSON biasa)
+def _case(store, position, **extra):
+    case = json.loads(store.frek_alat_df[LOOKUP_KEYS].iloc[[position]].to_json(orient='records'))[0]
+    case.update({'JENIS PELANGGARAN': 'Pelanggaran Berulang', 'JUMLAH FREKUENSI': 3, 'JUMLAH PERANGKAT': 2})
+    case.update(extra)
+    return case
+
+
+def test_price_single_case(store, client):
+    response = client.post("/price", json_body=_case(store, 0, **{'JML BULAN': '13-24'}))
+
+    assert response.status == 200
+    hasil = response.json()
+    expected = calculate_denda(store.frek_alat_df.iloc[0], 3, 2, store.persentase_data['13-24'],
+                               'Pelanggaran Berulang')
+    assert hasil['TOTAL TAGIHAN DENDA'] == expected['total_tagihan_denda']
+    assert hasil['TOTAL TAGIHAN DENDA (SEN)'] == round(expected['total_tagihan_denda'] * 100)
+    assert hasil['DATA TARIF DITEMUKAN'] is True
+    assert hasil[STATUS_COLUMN] == STATUS_OK
+
+
+def test_price_single_case_without_lookup_key(store, client):
+    case = _case(store, 0)
+    del case['ZONA']
+
+    response = client.post("/price", json_body=case)
+
+    assert response.status == 400
+    assert 'ZONA' in response.json()['error']
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson"])
+def test_batch_with_uneven_keys_across_chunks(store, client, fmt):
+    # chunk_size=2: potongan kedua tidak memuat JML BULAN sama sekali, hanya kasus pertama punya ID KASUS
+    cases = [
+        _case(store, 0, **{'JML BULAN': '13-24', 'ID KASUS': 'A-1'}),
+        _case(store, 1, **{'JML BULAN': '0-12'}),
+        _case(store, 2),
+        _case(store, 3),
+        _case(store, 4, **{'JML BULAN': '>25'}),
+    ]
+    del cases[4]['JUMLAH PERANGKAT']
+
+    if fmt == "json":
+        response = client.post("/price/batch", json_body={'cases': cases})
+    else:
+        body = "\n".join(json.dumps(case) for case in cases)
+        response = client.post("/price/batch", body=body, content_type="application/x-ndjson")
+    assert response.status == 202
+
+    status = client.wait(response.json()['job_id'], timeout=30)
+    assert status['status'] == 'done', status.get('error')
+    assert (status['rows'], status['chunks'], status['invalid']) == (5, 3, 1)
+
+    result = client.get(status['result_url'])
+    assert result.status == 200
+    result_df = pd.read_csv(io.BytesIO(result.body))
+    assert list(result_df.columns) == BATCH_RESULT_COLUMNS
+    assert len(result_df) == 5
+
+    # Setiap baris sama dengan perhitungan kasus tunggal yang sama
+    for i, case in enumerate(cases[:4]):
+        single = client.post("/price", json_body=case).json()
+        assert result_df['TOTAL TAGIHAN DENDA (SEN)'][i] == single['TOTAL TAGIHAN DENDA (SEN)']
+        assert result_df[STATUS_COLUMN][i] == STATUS_OK
+    assert result_df[STATUS_COLUMN][4] == "JUMLAH PERANGKAT tidak valid (harus bilangan bulat)"
+    assert status['total_tagihan_denda_sen'] == result_df['TOTAL TAGIHAN DENDA (SEN)'].sum()
+
+
+def test_finished_jobs_are_evicted(store, service, client):
+    job_ids = []
+    for position in range(3):
+        response = client.post("/price/batch", json_body=[_case(store, position, **{'JML BULAN': '0-12'})])
+        job_ids.append(response.json()['job_id'])
+        assert client.wait(job_ids[-1], timeout=30)['status'] == 'done'
+
+    # max_jobs=2: job paling lama dihapus beserta file hasilnya
+    assert client.get(f"/price/batch/{job_ids[0]}").status == 404
+    assert client.get(f"/price/batch/{job_ids[0]}/result").status == 404
+    assert [client.get(f"/price/batch/{job_id}").status for job_id in job_ids[1:]] == [200, 200]
+    assert sorted(os.listdir(service.work_dir)) == sorted(f"{job_id}.csv" for job_id in job_ids[1:])
+
+
+def test_result_stream_survives_job_deletion(store, service, client):
+    response = client.post("/price/batch", json_body=[_case(store, 0, **{'JML BULAN': '0-12'})])
+    job_id = response.json()['job_id']
+    assert client.wait(job_id, timeout=30)['status'] == 'done'
+
+    # Hasil yang sudah diminta tetap terbaca utuh walaupun job dihapus sebelum body dibaca
+    streamed = service.handle('GET', f"/price/batch/{job_id}/result")
+    assert client.delete(f"/price/batch/{job_id}").status == 200
+    result_df = pd.read_csv(io.BytesIO(b"".join(streamed.body)))
+    assert len(result_df) == 1
+
+
+def test_batch_queue_is_capped(store):
+    ready = threading.Event()
+    service = PricingService(lambda: store if ready.wait(timeout=30) else None, chunk_size=2, max_pending=1)
+    client = ServiceClient(service)
+    try:
+        first = client.post("/price/batch", json_body=[_case(store, 0)])
+        assert first.status == 202
+
+        # Job pertama masih menunggu store: job berikutnya ditolak tanpa menyimpan body-nya
+        rejected = client.post("/price/batch", json_body=[_case(store, 1)])
+        assert rejected.status == 429
+        assert os.listdir(service.work_dir) == [f"{first.json()['job_id']}.input"]
+
+        ready.set()
+        assert client.wait(first.json()['job_id'], timeout=30)['status'] == 'done'
+        assert client.post("/price/batch", json_body=[_case(store, 1)]).status == 202
+    finally:
+        ready.set()
+        service.close()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.constants import JENIS_PELANGGARAN
+from engine.pricing import calculate_denda
+from engine.sweep import sweep_denda, sweep_frame, sweep_matrix
+
+PERSENTASE_DATA = {'0-12': 1.0, '13-24': 0.5, '>25': 0.25}
+
+ROW = pd.Series({
+    'JENIS IZIN': 'ISR',
+    'DINAS': 'TETAP',
+    'MAKS POIN': 7000,
+    'INDEKS PELANGGARAN PERTAMA': 0.0028,
+    'INDEKS PELANGGARAN BERULANG': 0.0042,
+    '%': np.nan,
+    'TARIF DENDA': 1234.5,
+})
+
+
+def test_sweep_matches_calculate_denda_for_every_scenario():
+    sweep = sweep_denda(ROW, PERSENTASE_DATA, 4, 3)
+
+    for jenis in JENIS_PELANGGARAN:
+        for bracket, persentase in PERSENTASE_DATA.items():
+            matrix = sweep_matrix(sweep, jenis, bracket)
+            assert matrix.shape == (4, 3)
+            for frekuensi in matrix.index:
+                for perangkat in matrix.columns:
+                    expected = calculate_denda(ROW, frekuensi, perangkat, persentase, jenis)
+                    assert matrix.loc[frekuensi, perangkat] == expected['total_tagihan_denda']
+
+
+def test_sweep_frame_lists_every_combination():
+    sweep = sweep_denda(ROW, PERSENTASE_DATA, 4, 3)
+
+    frame = sweep_frame(sweep)
+
+    assert len(frame) == len(JENIS_PELANGGARAN) * len(PERSENTASE_DATA) * 4 * 3
+    assert not frame.duplicated(['JENIS PELANGGARAN', 'JML BULAN', 'JUMLAH FREKUENSI', 'JUMLAH PERANGKAT']).any()
+    row = frame[(frame['JENIS PELANGGARAN'] == 'Pelanggaran Berulang') & (frame['JML BULAN'] == '13-24') &
+                (frame['JUMLAH FREKUENSI'] == 4) & (frame['JUMLAH PERANGKAT'] == 2)].iloc[0]
+    expected = calculate_denda(ROW, 4, 2, 0.5, 'Pelanggaran Berulang')
+    assert row['DENDA'] == expected['denda']
+    assert row['TOTAL TAGIHAN DENDA'] == expected['total_tagihan_denda']
+
+
+def test_sweep_raises_when_denda_overflows():
+    with pytest.raises(OverflowError):
+        sweep_denda(ROW.replace({1234.5: 1e13}), PERSENTASE_DATA, 2, 2)
+
+
+def test_sweep_matrix_raises_when_total_overflows():
+    sweep = sweep_denda(ROW.replace({1234.5: 1e9}), PERSENTASE_DATA, 10 ** 7, 2)
+
+    with pytest.raises(OverflowError):
+        sweep_matrix(sweep, 'Pelanggaran Pertama', '0-12')
+    assert sweep_matrix(sweep._replace(max_frekuensi=2), 'Pelanggaran Pertama', '0-12').notna().all().all()
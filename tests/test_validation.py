@@ -0,0 +1,101 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from engine.constants import SHEET_FREK_ALAT
+from engine.store import build_tariff_store
+from engine.validation import (TINGKAT_ERROR, TINGKAT_PERINGATAN, VALIDATION_COLUMNS, validate_frek_alat,
+                               validation_summary)
+
+
+def _tarif_df(**overrides):
+    df = pd.DataFrame({
+        'JENIS IZIN': ['ISR', 'ISR', 'IPFR', 'APT'],
+        'DINAS': ['TETAP', 'TETAP', 'BERGERAK', 'SIARAN'],
+        'KATEGORI': ['A', 'B', 'A', 'A'],
+        'BAND': ['VHF', 'UHF', 'SHF', 'VHF'],
+        'ZONA': [1, 2, 3, 4],
+        'MAKS POIN': [7000, 7000, 600000, 5000],
+        '%': [0.33, 0.5, 50, 1],
+        'TARIF DENDA': [1000.0, 2000.0, 3000.0, 4000.0],
+    })
+    for column, values in overrides.items():
+        df[column] = values
+    return df
+
+
+def test_clean_table_has_empty_report():
+    report = validate_frek_alat(_tarif_df())
+
+    assert report.empty
+    assert list(report.columns) == VALIDATION_COLUMNS
+
+
+def test_each_check_flags_its_rows():
+    df = _tarif_df(**{
+        'TARIF DENDA': [np.nan, 0.0, -5.0, 4000.0],
+        'JENIS IZIN': ['ISR', 'ISR', 'IPFR', 'XYZ'],
+        'MAKS POIN': [np.nan, 7000, 600000, 0],
+        'ZONA': [1, 'dua', 3, 4],
+        '%': [0.33, 0.5, 150, -1],
+    })
+    df.loc[1, ['DINAS', 'KATEGORI', 'BAND']] = df.loc[0, ['DINAS', 'KATEGORI', 'BAND']].to_numpy()
+    df.loc[1, 'ZONA'] = 1
+
+    report = validate_frek_alat(df)
+
+    found = set(zip(report['BARIS'], report['PEMERIKSAAN'], report['TINGKAT']))
+    assert found == {
+        (1, 'TARIF DENDA kosong', TINGKAT_ERROR),
+        (1, 'MAKS POIN default', TINGKAT_PERINGATAN),
+        (2, 'TARIF DENDA nol', TINGKAT_ERROR),
+        (2, 'Kunci ganda', TINGKAT_PERINGATAN),
+        (3, 'TARIF DENDA negatif', TINGKAT_ERROR),
+        (3, '% di luar rentang', TINGKAT_ERROR),
+        (4, 'JENIS IZIN tidak dikenal', TINGKAT_PERINGATAN),
+        (4, 'MAKS POIN kosong', TINGKAT_ERROR),
+        (4, '% di luar rentang', TINGKAT_ERROR),
+    }
+    # Baris laporan terurut per baris tarif dan membawa nilai sel serta kolom kunci
+    assert report['BARIS'].is_monotonic_increasing
+    assert report.loc[report['PEMERIKSAAN'] == 'TARIF DENDA negatif', 'NILAI'].tolist() == ['-5.0']
+    assert report.loc[report['PEMERIKSAAN'] == 'TARIF DENDA kosong', 'NILAI'].tolist() == ['']
+    assert report.loc[report['BARIS'] == 4, 'JENIS IZIN'].unique().tolist() == ['XYZ']
+
+
+def test_non_numeric_zona_is_flagged():
+    report = validate_frek_alat(_tarif_df(ZONA=[1, 'dua', None, 4]))
+
+    assert report[['BARIS', 'PEMERIKSAAN', 'NILAI']].values.tolist() == [
+        [2, 'ZONA bukan angka', 'dua'],
+        [3, 'ZONA bukan angka', ''],
+    ]
+
+
+def test_validation_summary_counts_rows_per_check():
+    report = validate_frek_alat(_tarif_df(**{'TARIF DENDA': [0.0, 0.0, np.nan, 4000.0]}))
+
+    summary = validation_summary(report)
+    assert summary.values.tolist() == [
+        [TINGKAT_ERROR, 'TARIF DENDA kosong', 1],
+        [TINGKAT_ERROR, 'TARIF DENDA nol', 2],
+    ]
+
+
+def test_report_shows_raw_workbook_values(tmp_path):
+    path = tmp_path / "tarif.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = SHEET_FREK_ALAT
+    sheet.append(["JENIS IZIN", "DINAS", "KATEGORI", "BAND", "ZONA", "MAKS POIN", "TARIF DENDA"])
+    sheet.append(["ISR", "TETAP", "A", "VHF", 1, 7000, 1000])
+    sheet.append(["ISR", "TETAP", "B", "UHF", "dua", 7000, "seribu"])
+    workbook.save(path)
+
+    # Nilai asli tetap tersedia setelah parsing dan setelah tabel dibaca dari cache
+    for _ in range(2):
+        report = build_tariff_store(str(path), cache_dir=str(tmp_path / "cache")).validation
+        assert report[['BARIS', 'PEMERIKSAAN', 'NILAI']].values.tolist() == [
+            [2, 'TARIF DENDA kosong', 'seribu'],
+            [2, 'ZONA bukan angka', 'dua'],
+        ]
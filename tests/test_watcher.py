@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import pytest
+
+from engine.watcher import TariffWatcher
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "SIMULASI PERHITUNGAN DENDA data.xlsx")
+
+pytestmark = pytest.mark.filterwarnings("ignore:Data Validation extension")
+
+
+def _touch(path, seconds=1):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    data_folder = tmp_path / "Data"
+    data_folder.mkdir()
+    shutil.copy(WORKBOOK, data_folder / "tarif.xlsx")
+    return TariffWatcher(str(data_folder), interval=0.05, cache_dir=str(tmp_path / "cache"))
+
+
+def test_changed_workbook_is_reloaded_once_stable(watcher):
+    path = os.path.join(watcher.data_folder, "tarif.xlsx")
+
+    assert watcher.poll_once() == [path]
+    store = watcher.get(path)
+    assert store is not None and store.frek_alat_df is not None
+    assert watcher.poll_once() == []
+
+    # Perubahan baru dimuat setelah ukuran dan mtime sama pada dua pemeriksaan
+    _touch(path)
+    assert watcher.poll_once() == []
+    assert watcher.get(path) is store
+    assert watcher.poll_once() == [path]
+    assert watcher.get(path).version != store.version
+    assert watcher.versions() == ((path, watcher.get(path).version),)
+
+
+def test_broken_workbook_keeps_previous_version(watcher):
+    path = os.path.join(watcher.data_folder, "tarif.xlsx")
+    watcher.poll_once()
+    store = watcher.get(path)
+
+    with open(path, "wb") as f:
+        f.write(b"bukan file excel")
+    watcher.poll_once()
+    assert watcher.poll_once() == []
+    assert watcher.get(path) is store
+    assert watcher.error(path)
+
+    os.remove(path)
+    assert watcher.poll_once() == [path]
+    assert watcher.get(path) is None
+    assert watcher.error(path) is None
+
+
+def test_background_thread_loads_new_files(watcher):
+    watcher.start()
+    try:
+        assert watcher.wait_ready(timeout=30)
+        assert len(watcher.stores()) == 1
+    finally:
+        watcher.stop(timeout=5)